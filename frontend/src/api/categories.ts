@@ -15,8 +15,23 @@ export interface CategoryProps {
 //   Authorization: `Bearer ${localStorage.getItem("token")}`,
 // });
 
-export const getCategories = async () => {
-  const res = await api.get(BASE_PATH);
+// details: false skips cash_books_details, returning cash book ids only;
+// cash_book limits the list to the categories usable in that cash book
+export const getCategories = async (
+  params: { details?: boolean; cash_book?: number } = {}
+): Promise<CategoryProps[]> => {
+  const res = await api.get(BASE_PATH, { params });
+  return res.data;
+};
+
+export interface CategoryCashBookMap {
+  cash_books: Record<string, number[]>;
+  // categories usable in every cash book
+  unrestricted: number[];
+}
+
+export const getCategoryCashBookMap = async (): Promise<CategoryCashBookMap> => {
+  const res = await api.get(`${BASE_PATH}cash_book_map/`);
   return res.data;
 };
 
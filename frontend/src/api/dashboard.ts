@@ -0,0 +1,44 @@
+import api from "src/utils/api";
+
+export interface DashboardFigures {
+  today_in: number;
+  today_out: number;
+  month_in: number;
+  month_out: number;
+  balance: number;
+}
+
+export interface DashboardCashBook extends DashboardFigures {
+  id: number;
+  name: string;
+  campus_id: number | null;
+}
+
+export interface DashboardCampus extends DashboardFigures {
+  id: number | null;
+  name: string | null;
+  cash_books: DashboardCashBook[];
+}
+
+export interface DashboardTopCategory {
+  category_id: number;
+  category_name: string;
+  total_in: number;
+  total_out: number;
+  total: number;
+  count: number;
+}
+
+export interface Dashboard {
+  date: string;
+  month_start: string;
+  totals: DashboardFigures;
+  campuses: DashboardCampus[];
+  top_categories: DashboardTopCategory[];
+}
+
+// KPIs for the visible cash books, computed from the server's rollup tables
+export const getDashboard = async (params: { campus?: number; top?: number } = {}): Promise<Dashboard> => {
+  const res = await api.get("transactions/dashboard/", { params });
+  return res.data;
+};
@@ -0,0 +1,28 @@
+import api from "src/utils/api";
+
+const BASE_PATH = "transactions/parties/";
+
+export interface Party {
+  name: string;
+  mobile_number: string | null;
+  usage_count: number;
+  last_used: string | null;
+}
+
+export interface PartyPage {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: Party[];
+}
+
+// Party autocomplete: prefix match on name (or mobile), most used first
+export const searchParties = async (
+  q: string,
+  field: "name" | "mobile" = "name",
+  page = 1,
+  pageSize = 20
+): Promise<PartyPage> => {
+  const res = await api.get(BASE_PATH, { params: { q, field, page, page_size: pageSize } });
+  return res.data;
+};
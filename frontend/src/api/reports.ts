@@ -0,0 +1,63 @@
+import api from "src/utils/api";
+
+const BASE_PATH = "transactions/report_jobs/";
+
+export interface ReportJob {
+  id: number;
+  format: "excel" | "pdf";
+  filters: Record<string, any>;
+  status: "PENDING" | "RUNNING" | "DONE" | "FAILED";
+  row_count: number | null;
+  error: string;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+// Queue a report (same payload as generate_report)
+export const createReportJob = async (filters: Record<string, any>): Promise<ReportJob> => {
+  const res = await api.post(BASE_PATH, filters);
+  return res.data;
+};
+
+export const getReportJob = async (id: number): Promise<ReportJob> => {
+  const res = await api.get(`${BASE_PATH}${id}/`);
+  return res.data;
+};
+
+export const downloadReportJob = async (id: number): Promise<Blob> => {
+  const res = await api.get(`${BASE_PATH}${id}/download/`, { responseType: "blob" });
+  return res.data;
+};
+
+// Render a report in the request itself (no worker needed)
+export const generateReport = async (filters: Record<string, any>): Promise<Blob> => {
+  const res = await api.post("transactions/generate_report/", filters, { responseType: "blob" });
+  return res.data;
+};
+
+// Queue a report and poll until the worker has rendered it. Falls back to
+// generateReport when no worker picks the job up within `queueTimeout` or
+// the rendered file cannot be read (e.g. the worker writes to another disk).
+export const waitForReport = async (
+  filters: Record<string, any>,
+  { interval = 2000, timeout = 10 * 60 * 1000, queueTimeout = 30 * 1000 } = {}
+): Promise<Blob> => {
+  let job = await createReportJob(filters);
+  const started = Date.now();
+
+  while (job.status === "PENDING" || job.status === "RUNNING") {
+    if (job.status === "PENDING" && Date.now() - started > queueTimeout) return generateReport(filters);
+    if (Date.now() - started > timeout) throw new Error("Report generation timed out");
+    await new Promise((resolve) => setTimeout(resolve, interval));
+    job = await getReportJob(job.id);
+  }
+
+  if (job.status === "FAILED") throw new Error("Report generation failed");
+  try {
+    return await downloadReportJob(job.id);
+  } catch (err: any) {
+    if (err?.response?.status === 410) return generateReport(filters);
+    throw err;
+  }
+};
@@ -20,11 +20,61 @@ export interface TransactionProps {
   transaction_label?: string;
   party_name?: string;
   party_mobile_number?: string;
+  updated_at?: string;
 }
 
-// get all transactions
-export const getTransactions = async () => {
-  const res = await api.get(BASE_PATH);
+export type NamedDateRange = "today" | "yesterday" | "this_month" | "last_month";
+
+// Server-side filters accepted by the list, ledger and summary endpoints.
+// `__in` filters take comma separated ids ("1,4"); dates are YYYY-MM-DD.
+export interface TransactionFilters {
+  transaction_type?: "IN" | "OUT";
+  category?: number;
+  payment_mode?: number;
+  cash_book?: number;
+  user?: number;
+  campus?: number;
+  category__in?: string;
+  payment_mode__in?: string;
+  cash_book__in?: string;
+  user__in?: string;
+  date?: string;
+  date_range?: NamedDateRange;
+  date_from?: string;
+  date_to?: string;
+  amount_min?: number;
+  amount_max?: number;
+  party_name?: string;
+  party_name__contains?: string;
+  party_mobile_number?: string;
+  party_mobile_number__startswith?: string;
+  has_party?: boolean;
+  search?: string;
+}
+
+// get transactions, optionally filtered on the server
+export const getTransactions = async (params: TransactionFilters = {}) => {
+  const res = await api.get(BASE_PATH, { params });
+  return res.data;
+};
+
+export interface TransactionPage {
+  next: string | null;
+  next_cursor: string | null;
+  page_size: number;
+  results: TransactionProps[];
+}
+
+// Get one page of transactions, newest first ("load more" / infinite scroll).
+// Pass the previous page's next_cursor to continue; keep the same filters.
+export const getTransactionsPage = async (
+  params: TransactionFilters = {},
+  cursor: string | null = null,
+  pageSize = 50
+): Promise<TransactionPage> => {
+  const res = await api.get(BASE_PATH, {
+    params: { ...params, page_size: pageSize, ...(cursor ? { cursor } : {}) },
+  });
   return res.data;
 };
 
@@ -35,6 +85,27 @@ export const createTransaction = async (data: TransactionProps) => {
   return res.data;
 };
 
+export interface ImportReport {
+  valid: number;
+  created: number;
+  error_count: number;
+  errors: { row: number; errors: Record<string, string> }[];
+  dry_run: boolean;
+}
+
+// Bulk import from a CSV / XLSX / JSON file. Rows with errors are skipped
+// and listed in the report; dryRun only validates.
+export const importTransactions = async (file: File, dryRun = false): Promise<ImportReport> => {
+  const form = new FormData();
+  form.append("file", file);
+  const res = await api.post(`${BASE_PATH}import/`, form, {
+    params: dryRun ? { dry_run: true } : {},
+    headers: { "Content-Type": "multipart/form-data" },
+  });
+  if (!dryRun) window.dispatchEvent(new Event("transaction-update"));
+  return res.data;
+};
+
 // Edit transaction
 export const updateTransaction = async (id: number, data: TransactionProps) => {
   const res = await api.put(`${BASE_PATH}${id}/`, data);
@@ -47,4 +118,110 @@ export const deleteTransaction = async (id: number) => {
   const res = await api.delete(`${BASE_PATH}${id}/`);
   window.dispatchEvent(new Event("transaction-update"));
   return res.data;
-};
\ No newline at end of file
+};
+
+// Target rows of a bulk action: explicit ids or the list filters
+export type BulkTarget = { ids: number[] } | { filters: TransactionFilters };
+
+export type BulkChanges = Partial<
+  Pick<
+    TransactionProps,
+    | "transaction_type"
+    | "category"
+    | "payment_mode"
+    | "cash_book"
+    | "date"
+    | "time"
+    | "remarks"
+    | "party_name"
+    | "party_mobile_number"
+  >
+>;
+
+// Update many transactions in one request (one refetch event)
+export const bulkUpdateTransactions = async (
+  target: BulkTarget,
+  changes: BulkChanges
+): Promise<{ updated: number }> => {
+  const res = await api.post(`${BASE_PATH}bulk_update/`, { ...target, changes });
+  window.dispatchEvent(new Event("transaction-update"));
+  return res.data;
+};
+
+// Delete many transactions in one request (one refetch event)
+export const bulkDeleteTransactions = async (target: BulkTarget): Promise<{ deleted: number }> => {
+  const res = await api.post(`${BASE_PATH}bulk_delete/`, target);
+  window.dispatchEvent(new Event("transaction-update"));
+  return res.data;
+};
+
+export interface LedgerParams extends TransactionFilters {
+  include_ob?: boolean;
+  page?: number;
+  page_size?: number;
+}
+
+export interface LedgerEntry extends TransactionProps {
+  running_balance: string;
+}
+
+export interface LedgerPage {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: LedgerEntry[];
+  opening_balance: number;
+  total_in: number;
+  total_out: number;
+  net_balance: number;
+}
+
+// Get one page of the ledger with server-computed running balances
+export const getLedger = async (params: LedgerParams = {}): Promise<LedgerPage> => {
+  const res = await api.get(`${BASE_PATH}ledger/`, { params });
+  return res.data;
+};
+
+export type SummaryGroup = "cash_book" | "category" | "payment_mode" | "user" | "day";
+
+export interface SummaryTotals {
+  total_in: number;
+  total_out: number;
+  count_in: number;
+  count_out: number;
+  net: number;
+  count: number;
+}
+
+export interface TransactionSummary {
+  totals: SummaryTotals;
+  groups: (SummaryTotals & Record<string, any>)[];
+}
+
+// Get totals grouped in the database (no rows are transferred)
+export const getTransactionSummary = async (
+  groupBy: SummaryGroup[] = [],
+  params: Omit<LedgerParams, "page" | "page_size" | "include_ob"> = {}
+): Promise<TransactionSummary> => {
+  const res = await api.get("transactions/summary/", {
+    params: { ...params, group_by: groupBy.join(",") || undefined },
+  });
+  return res.data;
+};
+
+export interface SyncPage {
+  changed: TransactionProps[];
+  deleted: number[];
+  sync_token: string;
+  has_more: boolean;
+  // the visible cash books changed: drop local rows, this is a full sync
+  reset: boolean;
+}
+
+// Changes since the previous sync_token (omit it for a full sync); call
+// again with the new token while has_more is true. Upsert changed rows by id
+// and remove deleted ones (rows that left the user's cash books included).
+export const syncTransactions = async (since?: string, limit?: number): Promise<SyncPage> => {
+  const res = await api.get(`${BASE_PATH}sync/`, { params: { since, limit } });
+  return res.data;
+};
@@ -16,8 +16,9 @@ export interface UserProps {
 
 const BASE_PATH = "accounts/users/";
 
-export const getUsers = async () => {
-  const res = await api.get(BASE_PATH);
+// fields: comma separated subset, e.g. "id,name" for an id -> name map
+export const getUsers = async (params: { fields?: string } = {}) => {
+  const res = await api.get(BASE_PATH, { params });
   return res.data;
 };
 
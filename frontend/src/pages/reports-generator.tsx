@@ -24,6 +24,7 @@ import { getCashBooks } from "../api/cash-book";
 import { getOffCampuses } from "../api/offCampus";
 import { getCategories } from "../api/categories";
 import { getPaymentModes } from "../api/payment-modes";
+import { waitForReport } from "../api/reports";
 
 export default function ReportGenerator() {
   const isMobile = useMediaQuery("(max-width:600px)");
@@ -59,9 +60,9 @@ export default function ReportGenerator() {
       try {
         setLoading(true);
         const [cats, mods, usrs, camps] = await Promise.all([
-          getCategories(),
+          getCategories({ details: false }),
           getPaymentModes(),
-          getUsers(),
+          getUsers({ fields: "id,name" }),
           getOffCampuses(),
         ]);
         setCategoryOptions(cats);
@@ -90,11 +91,6 @@ export default function ReportGenerator() {
   }, [selectedCampus]);
 
   // --- Function to download report ---
-  const BASE_URL = `${import.meta.env.VITE_API_BASE_URL}`;
-
-  const getAuthHeaders = () => ({
-    Authorization: `Bearer ${localStorage.getItem("token")}`,
-  });
   const downloadReport = async (format: "pdf" | "excel") => {
     if (!selectedCashBook) {
       alert("Select a cash book first");
@@ -114,18 +110,7 @@ export default function ReportGenerator() {
     };
 
     try {
-      const res = await fetch(`${BASE_URL}transactions/generate_report/`, {
-        method: "POST",
-        body: JSON.stringify(filters),
-        headers: {
-          "Content-Type": "application/json",
-          ...getAuthHeaders(),
-        },
-      });
-
-      if (!res.ok) throw new Error("Failed to generate report");
-
-      const blob = await res.blob();
+      const blob = await waitForReport(filters);
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement("a");
       a.href = url;
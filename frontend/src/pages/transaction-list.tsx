@@ -130,10 +130,10 @@ const TransactionList = () => {
       try {
         const [txns, cats, modes, books, usrs, obs] = await Promise.all([
           getTransactions(),
-          getCategories(),
+          getCategories({ details: false }),
           getPaymentModes(),
           getCashBooks(),
-          getUsers(),
+          getUsers({ fields: "id,name" }),
           getOpeningBalances(),
         ]);
 
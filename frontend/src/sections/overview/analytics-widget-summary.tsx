@@ -19,10 +19,10 @@ import { Chart, useChart } from 'src/components/chart';
 type Props = CardProps & {
   title: string;
   total: number;
-  percent: number;
+  percent?: number;
   color?: PaletteColorKey;
   icon: React.ReactNode;
-  chart: {
+  chart?: {
     series: number[];
     categories: string[];
     options?: ChartOptions;
@@ -46,7 +46,7 @@ export function AnalyticsWidgetSummary({
   const chartOptions = useChart({
     chart: { sparkline: { enabled: true } },
     colors: chartColors,
-    xaxis: { categories: chart.categories },
+    xaxis: { categories: chart?.categories },
     grid: {
       padding: {
         top: 6,
@@ -61,10 +61,10 @@ export function AnalyticsWidgetSummary({
     markers: {
       strokeWidth: 0,
     },
-    ...chart.options,
+    ...chart?.options,
   });
 
-  const renderTrending = () => (
+  const renderTrending = (change: number) => (
     <Box
       sx={{
         top: 16,
@@ -75,10 +75,10 @@ export function AnalyticsWidgetSummary({
         alignItems: 'center',
       }}
     >
-      <Iconify width={20} icon={percent < 0 ? 'eva:trending-down-fill' : 'eva:trending-up-fill'} />
+      <Iconify width={20} icon={change < 0 ? 'eva:trending-down-fill' : 'eva:trending-up-fill'} />
       <Box component="span" sx={{ typography: 'subtitle2' }}>
-        {percent > 0 && '+'}
-        {fPercent(percent)}
+        {change > 0 && '+'}
+        {fPercent(change)}
       </Box>
     </Box>
   );
@@ -100,7 +100,7 @@ export function AnalyticsWidgetSummary({
     >
       <Box sx={{ width: 48, height: 48, mb: 3 }}>{icon}</Box>
 
-      {renderTrending()}
+      {percent !== undefined && renderTrending(percent)}
 
       <Box
         sx={{
@@ -116,12 +116,14 @@ export function AnalyticsWidgetSummary({
           <Box sx={{ typography: 'h4' }}>{fShortenNumber(total)}</Box>
         </Box>
 
-        <Chart
-          type="line"
-          series={[{ data: chart.series }]}
-          options={chartOptions}
-          sx={{ width: 84, height: 56 }}
-        />
+        {chart && (
+          <Chart
+            type="line"
+            series={[{ data: chart.series }]}
+            options={chartOptions}
+            sx={{ width: 84, height: 56 }}
+          />
+        )}
       </Box>
 
       <SvgColor
@@ -1,125 +1,106 @@
+import type { Dashboard } from 'src/api/dashboard';
+
 import { useEffect, useState } from 'react';
 
+import Box from '@mui/material/Box';
 import Grid from '@mui/material/Grid';
 import Typography from '@mui/material/Typography';
+import CircularProgress from '@mui/material/CircularProgress';
 
+import { getDashboard } from 'src/api/dashboard';
 import { DashboardContent } from 'src/layouts/dashboard';
-import { _posts, _tasks, _traffic, _timeline } from 'src/_mock';
 
-import { AnalyticsNews } from '../analytics-news';
-import { AnalyticsTasks } from '../analytics-tasks';
 import { AnalyticsCurrentVisits } from '../analytics-current-visits';
-import { AnalyticsOrderTimeline } from '../analytics-order-timeline';
-import { AnalyticsWebsiteVisits } from '../analytics-website-visits';
 import { AnalyticsWidgetSummary } from '../analytics-widget-summary';
-import { AnalyticsTrafficBySite } from '../analytics-traffic-by-site';
-import { AnalyticsCurrentSubject } from '../analytics-current-subject';
-import { AnalyticsConversionRates } from '../analytics-conversion-rates';
 
 // ----------------------------------------------------------------------
 
+// KPIs of the cash books the signed-in user can see, from the server's
+// rollup tables (GET transactions/dashboard/) rather than the transaction list
 export function OverviewAnalyticsView() {
+  const [dashboard, setDashboard] = useState<Dashboard | null>(null);
+
+  useEffect(() => {
+    getDashboard()
+      .then(setDashboard)
+      .catch((err) => console.error('Error loading dashboard:', err));
+  }, []);
+
+  if (!dashboard) {
+    return (
+      <Box display="flex" justifyContent="center" alignItems="center" height="70vh">
+        <CircularProgress />
+      </Box>
+    );
+  }
+
+  const { totals, campuses, top_categories } = dashboard;
+  const byCampus = (field: 'month_in' | 'month_out') =>
+    campuses.map((campus) => ({ label: campus.name ?? 'No campus', value: Number(campus[field]) }));
 
   return (
     <DashboardContent maxWidth="xl">
-      <Typography variant="h4" sx={{ mb: { xs: 3, md: 5 } }}>
+      <Typography variant="h4" sx={{ mb: 1 }}>
         Hi, Welcome 👋
       </Typography>
+      <Typography variant="subtitle1" sx={{ mb: { xs: 3, md: 5 }, color: 'text.secondary' }}>
+        Balance: ₹ {Number(totals.balance).toLocaleString()}
+      </Typography>
 
       <Grid container spacing={3}>
         <Grid size={{ xs: 12, sm: 6, md: 3 }}>
           <AnalyticsWidgetSummary
-            title="Total Receipts"
-            percent={2.6}
-            total={500}
-            icon={<img alt="Total Receipts" src="/assets/icons/glass/ic-glass-bag.svg" />}
-            chart={{
-              categories: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug'],
-              series: [22, 8, 35, 50, 82, 84, 77, 12],
-            }}
+            title="Today's Receipts"
+            total={Number(totals.today_in)}
+            icon={<img alt="Today's Receipts" src="/assets/icons/glass/ic-glass-bag.svg" />}
           />
         </Grid>
 
         <Grid size={{ xs: 12, sm: 6, md: 3 }}>
           <AnalyticsWidgetSummary
-            title="Total Payments"
-            percent={-0.1}
-            total={50}
+            title="Today's Payments"
+            total={Number(totals.today_out)}
             color="secondary"
-            icon={<img alt="Total Payments" src="/assets/icons/glass/ic-glass-users.svg" />}
-            chart={{
-              categories: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug'],
-              series: [22, 8, 35, 50, 82, 84, 77, 12],
-            }}
+            icon={<img alt="Today's Payments" src="/assets/icons/glass/ic-glass-users.svg" />}
           />
         </Grid>
 
         <Grid size={{ xs: 12, sm: 6, md: 3 }}>
           <AnalyticsWidgetSummary
-            title="Total Students"
-            percent={2.8}
-            total={1240}
+            title="Receipts This Month"
+            total={Number(totals.month_in)}
             color="warning"
-            icon={<img alt="Total Students" src="/assets/icons/glass/ic-glass-buy.svg" />}
-            chart={{
-              categories: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug'],
-              series: [40, 70, 50, 28, 70, 75, 7, 64],
-            }}
+            icon={<img alt="Receipts This Month" src="/assets/icons/glass/ic-glass-buy.svg" />}
           />
         </Grid>
 
         <Grid size={{ xs: 12, sm: 6, md: 3 }}>
           <AnalyticsWidgetSummary
-            title="Total Staff"
-            percent={3.6}
-            total={234}
+            title="Payments This Month"
+            total={Number(totals.month_out)}
             color="error"
-            icon={<img alt="Total Staff" src="/assets/icons/glass/ic-glass-message.svg" />}
-            chart={{
-              categories: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug'],
-              series: [56, 30, 23, 54, 47, 40, 62, 73],
-            }}
+            icon={<img alt="Payments This Month" src="/assets/icons/glass/ic-glass-message.svg" />}
           />
         </Grid>
 
         <Grid size={{ xs: 12, md: 6, lg: 4 }}>
-          <AnalyticsCurrentVisits
-            title="Total Receipts"
-            chart={{
-              series: [
-                { label: 'Ajmer', value: 6500 },
-                { label: 'Karnataka', value: 4500 },
-                { label: 'Chennai', value: 1500 },
-              ],
-            }}
-          />
+          <AnalyticsCurrentVisits title="Receipts This Month" chart={{ series: byCampus('month_in') }} />
         </Grid>
         <Grid size={{ xs: 12, md: 6, lg: 4 }}>
-          <AnalyticsCurrentVisits
-            title="Total Payments"
-            chart={{
-              series: [
-                { label: 'Ajmer', value: 6500 },
-                { label: 'Karnataka', value: 4500 },
-                { label: 'Chennai', value: 1500 },
-              ],
-            }}
-          />
+          <AnalyticsCurrentVisits title="Payments This Month" chart={{ series: byCampus('month_out') }} />
         </Grid>
         <Grid size={{ xs: 12, md: 6, lg: 4 }}>
           <AnalyticsCurrentVisits
-            title="Total Students"
+            title="Top Categories This Month"
             chart={{
-              series: [
-                { label: 'Ajmer', value: 300 },
-                { label: 'Karnataka', value: 300 },
-                { label: 'Chennai', value: 200 },
-                { label: 'Online', value: 400 },
-              ],
+              series: top_categories.map((category) => ({
+                label: category.category_name,
+                value: Number(category.total),
+              })),
             }}
           />
         </Grid>
       </Grid>
     </DashboardContent>
   );
-}
\ No newline at end of file
+}
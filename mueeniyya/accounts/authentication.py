@@ -0,0 +1,54 @@
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from . import tokens
+from .scope import UserScope
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from access token claims, without a database row.
+    `name`, `role` (the role's name, not a Role) and `is_superuser` read the
+    claims; get_scope() returns the scope the token carries.
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        claims = token[tokens.SCOPE_CLAIM]
+        self._scope = UserScope(
+            is_admin=claims["admin"],
+            campus_ids=frozenset(claims["campuses"]),
+            cash_book_ids=frozenset(claims["cash_books"]),
+        )
+
+    @cached_property
+    def name(self):
+        return self.token.get("name", "")
+
+    @cached_property
+    def role(self):
+        return self.token.get("role")
+
+
+class ScopeClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the User query on reads: GET, HEAD and
+    OPTIONS requests with current scope claims (see accounts.tokens) get a
+    ClaimsUser. Writes, tokens without the claims and tokens whose scope
+    version has moved on load the User row as usual.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in SAFE_METHODS and tokens.is_current(validated_token):
+            return ClaimsUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,175 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=id,name` on read requests limits each object to the listed
+    serializer fields; `?omit=remarks,created_at` drops the listed ones.
+
+    When every remaining field maps to a model column, a column of a
+    related row or a queryset annotation, lists are read with values() on
+    just those columns and rendered by the fields' own to_representation,
+    so no model instances, unneeded joins, nested serializers or
+    prefetches are built. Other fields are served by the serializer with
+    the unlisted fields dropped.
+    """
+    fields_param = "fields"
+    omit_param = "omit"
+
+    def requested_fields(self, serializer_class=None):
+        """
+        The requested field names, in serializer order, or None when every
+        field is wanted.
+        """
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        params = self.request.query_params
+        fields, omit = _names(params.get(self.fields_param)), _names(params.get(self.omit_param))
+        if not fields and not omit:
+            return None
+
+        available = self.readable_fields(serializer_class)
+        unknown = (fields | omit) - set(available)
+        if unknown:
+            raise ValidationError({"error": f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return [name for name in available if (not fields or name in fields) and name not in omit]
+
+    def readable_fields(self, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        cache = self.__dict__.setdefault("_readable_fields", {})
+        if serializer_class not in cache:
+            serializer = serializer_class(context=self.get_serializer_context())
+            cache[serializer_class] = {
+                name: field for name, field in serializer.fields.items() if not field.write_only
+            }
+        return cache[serializer_class]
+
+    def get_serializer(self, *args, **kwargs):
+        return self.trim_serializer(super().get_serializer(*args, **kwargs))
+
+    def trim_serializer(self, serializer):
+        target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+        fields = self.requested_fields(type(target))
+        if fields is not None:
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+    def list(self, request, *args, **kwargs):
+        projection = None
+        if self.requested_fields():
+            projection = self.projection(self.filter_queryset(self.get_queryset()))
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(projection.queryset)
+        rows = projection.represent(page if page is not None else projection.queryset)
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
+
+    def projection(self, queryset, serializer_class=None, paginator=None):
+        """
+        A Projection of `queryset` onto the requested fields, or None when
+        no fields were requested or one of them is not a column.
+        """
+        serializer_class = serializer_class or self.get_serializer_class()
+        fields = self.requested_fields(serializer_class)
+        if not fields or not _projectable(serializer_class, queryset):
+            return None
+        available = self.readable_fields(serializer_class)
+        annotations = set(queryset.query.annotations)
+        columns = {name: model_column(available[name], queryset.model, annotations) for name in fields}
+        if None in columns.values():
+            return None
+
+        # keyset paginators read their cursor from these columns of the last row
+        paginator = paginator or self.paginator
+        extra = [name for name in getattr(paginator, "position_fields", ()) if name not in columns.values()]
+        values = queryset.prefetch_related(None).values(*dict.fromkeys(columns.values()), *extra)
+        return Projection(values, [(name, columns[name], available[name]) for name in fields])
+
+
+class Projection:
+    """
+    A values() queryset and how to render its rows as serializer output.
+    """
+
+    def __init__(self, queryset, columns):
+        self.queryset = queryset
+        self.formatters = [(name, column, _formatter(field)) for name, column, field in columns]
+
+    def represent(self, rows):
+        formatters = self.formatters
+        return [
+            {
+                name: None if row[column] is None else format_(row[column])
+                for name, column, format_ in formatters
+            }
+            for row in rows
+        ]
+
+
+def model_column(field, model, annotations=()):
+    """
+    The values() lookup (e.g. `campus__name`) that serializer `field`
+    reads on `model`, or None when it is not a single column.
+    """
+    if isinstance(field, (
+        serializers.BaseSerializer, serializers.ManyRelatedField,
+        serializers.SerializerMethodField, serializers.HiddenField,
+    )) or field.source == "*":
+        return None
+    if field.source in annotations:
+        return field.source
+
+    path = []
+    model_field = None
+    for attr in field.source_attrs:
+        if model_field is not None:
+            if not model_field.is_relation:
+                return None
+            model = model_field.related_model
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many or model_field.one_to_many:
+            return None
+        path.append(attr)
+
+    if model_field is None:
+        return None
+    # a relation is one column when read as its key (`user_id` or a PK field)
+    read_as_key = path[-1] == model_field.attname or isinstance(field, serializers.PrimaryKeyRelatedField)
+    if model_field.is_relation and not read_as_key:
+        return None
+    return "__".join(path)
+
+
+def _projectable(serializer_class, queryset):
+    # Plain serializers may read anything, and the columns of grouped or
+    # values() querysets cannot be re-selected on their own
+    query = queryset.query
+    return (
+        issubclass(serializer_class, serializers.ModelSerializer)
+        and query.group_by is None
+        and not query.values_select
+        and not any(getattr(expr, "contains_aggregate", False) for expr in query.annotations.values())
+    )
+
+
+def _names(param):
+    return {name.strip() for name in (param or "").split(",") if name.strip()}
+
+
+def _formatter(field):
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return lambda pk: field.to_representation(PKOnlyObject(pk=pk))
+    return field.to_representation
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with the cost taken from settings.PASSWORD_ARGON2. Hashes made
+    with other parameters are upgraded on the next successful login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2["time_cost"]
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2["memory_cost"]
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2["parallelism"]
@@ -0,0 +1,81 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+from accounts.models import User
+
+PASSWORD = "bench-Password-123"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures hash and verify time and authenticate() login throughput for each password "
+        "hasher, using a temporary user that is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hasher", action="append", dest="hashers",
+            help="Dotted path of a hasher to measure (can be repeated; default: settings.PASSWORD_HASHERS).",
+        )
+        parser.add_argument("--logins", type=int, default=50, help="Logins per hasher (default: 50).")
+        parser.add_argument("--threads", type=int, default=1, help="Concurrent logins (default: 1).")
+        parser.add_argument("--force", action="store_true", help="Allow running when DEBUG is off.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Refusing to create benchmark users with DEBUG off; pass --force to override.")
+        self.options = options
+        self.stdout.write(f"{'hasher':<28} {'hash ms':>9} {'verify ms':>10} {'logins/s':>9}")
+        for path in options["hashers"] or settings.PASSWORD_HASHERS:
+            try:
+                import_string(path)().encode(PASSWORD, "benchsalt1234567")
+            except (ImportError, ValueError) as exc:
+                self.stdout.write(f"{path.rsplit('.', 1)[-1]:<28} unavailable: {exc}")
+                continue
+            with override_settings(PASSWORD_HASHERS=[path]):
+                self.measure(path)
+
+    def measure(self, path):
+        hasher = get_hasher()
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        hash_ms = self.median_ms(lambda: hasher.encode(PASSWORD, hasher.salt()))
+        verify_ms = self.median_ms(lambda: hasher.verify(PASSWORD, encoded))
+
+        # Committed, so concurrent logins on other connections can see it
+        user = User.objects.create(mobile=f"bench{time.time_ns() % 10 ** 10}", name="Bench User", password=encoded)
+        try:
+            logins = self.options["logins"]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(self.options["threads"]) as pool:
+                results = list(pool.map(lambda _: self.login(user.mobile), range(logins)))
+            elapsed = time.perf_counter() - started
+        finally:
+            user.delete()
+        if not all(results):
+            raise CommandError(f"Login failed with {path}")
+
+        name = path.rsplit(".", 1)[-1]
+        self.stdout.write(f"{name:<28} {hash_ms:>9.1f} {verify_ms:>10.1f} {logins / elapsed:>9.1f}")
+
+    def login(self, mobile):
+        try:
+            return authenticate(mobile=mobile, password=PASSWORD) is not None
+        finally:
+            close_old_connections()
+
+    def median_ms(self, run, repeat=5):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .scope import get_scope
+
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+VERSION_KEY = "response-cache:version:{}"
+
+
+def namespace_version(namespace):
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock rather than 1 (as in accounts.scope), so a
+        # version lost with the cache never brings back older entries
+        cache.add(key, time.time_ns() // 1000, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(*namespaces):
+    """
+    Drops every cached response of the given namespaces by bumping their
+    version; stale entries simply expire.
+    """
+    for namespace in namespaces:
+        try:
+            cache.incr(VERSION_KEY.format(namespace))
+        except ValueError:
+            cache.set(VERSION_KEY.format(namespace), time.time_ns() // 1000, None)
+
+
+def scope_key(user):
+    user_scope = get_scope(user)
+    if user_scope.is_admin:
+        return "all"
+    campuses = ",".join(str(campus_id) for campus_id in sorted(user_scope.campus_ids))
+    return hashlib.sha256(campuses.encode()).hexdigest()[:16]
+
+
+def make_etag(data):
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return f'"{hashlib.sha256(encoded).hexdigest()[:32]}"'
+
+
+class CachedResponseMixin:
+    """
+    Caches list and retrieve responses of rarely changing reference data.
+
+    Entries are keyed by `cache_namespace` and its version, the request path
+    and query, and (unless `cache_per_scope` is off) the caller's campus
+    scope, so users with the same scope share entries. Model signals bump
+    the namespace version (see the apps' signals.py). Responses carry an
+    ETag; a matching If-None-Match gets a 304 with no body.
+    """
+    cache_namespace = None
+    cache_per_scope = True
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+    def cached_response(self, request, render):
+        key = self.response_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = render()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            # Plain containers: ReturnList/ReturnDict keep a serializer reference
+            data = list(response.data) if isinstance(response.data, list) else dict(response.data)
+            entry = {"etag": make_etag(data), "data": data}
+            cache.set(key, entry, self.cache_timeout)
+
+        headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if entry["etag"] in _etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry["data"], headers=headers)
+
+    def response_cache_key(self, request):
+        scope = scope_key(request.user) if self.cache_per_scope else "-"
+        path = hashlib.sha256(request.get_full_path().encode()).hexdigest()[:32]
+        return f"response-cache:{self.cache_namespace}:{namespace_version(self.cache_namespace)}:{scope}:{path}"
+
+
+def _etags(header):
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
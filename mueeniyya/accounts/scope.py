@@ -0,0 +1,120 @@
+import hashlib
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+SCOPE_CACHE_TIMEOUT = 60 * 60
+VERSION_KEY = "user-scope:version"
+USER_VERSION_KEY = "user-scope:user-version:{}"
+
+
+@dataclass(frozen=True)
+class UserScope:
+    """
+    What a user may see: admins see everything, staff only the campuses
+    in `User.off_campuses` and the cash books that belong to them.
+    """
+    is_admin: bool
+    campus_ids: frozenset = frozenset()
+    cash_book_ids: frozenset = frozenset()
+
+    def allows_campus(self, campus_id):
+        return self.is_admin or campus_id in self.campus_ids
+
+    def allows_cash_book(self, cash_book_id):
+        return self.is_admin or cash_book_id in self.cash_book_ids
+
+    @property
+    def key(self):
+        """
+        Short stable id of the cash books in scope, equal for users who see
+        the same transactions.
+        """
+        if self.is_admin:
+            return "all"
+        books = ",".join(str(cash_book_id) for cash_book_id in sorted(self.cash_book_ids))
+        return hashlib.sha256(books.encode()).hexdigest()[:16]
+
+
+def get_scope(user):
+    """
+    Returns the UserScope for `user`, resolved at most once per request
+    (memoized on the user object) and cached across requests until the
+    user, their campuses, roles or cash books change.
+    """
+    scope = getattr(user, "_scope", None)
+    if scope is not None:
+        return scope
+
+    key = _cache_key(user.pk)
+    scope = cache.get(key)
+    if scope is None:
+        scope = _resolve(user)
+        cache.set(key, scope, SCOPE_CACHE_TIMEOUT)
+
+    user._scope = scope
+    return scope
+
+
+def is_admin(user):
+    return get_scope(user).is_admin
+
+
+def invalidate_user(user_id):
+    cache.delete(_cache_key(user_id))
+    _bump(USER_VERSION_KEY.format(user_id))
+
+
+def invalidate_all():
+    """
+    Drops every cached scope, e.g. when a role is renamed or a cash book
+    moves to another campus.
+    """
+    _bump(VERSION_KEY)
+
+
+def token_version(user_id):
+    """
+    Changes whenever the scope of `user_id` may have changed; stamped into
+    access tokens so scope claims can be trusted until it moves on (see
+    accounts.authentication).
+    """
+    user_key = USER_VERSION_KEY.format(user_id)
+    versions = cache.get_many([VERSION_KEY, user_key])
+    return f"{_version(VERSION_KEY, versions)}.{_version(user_key, versions)}"
+
+
+def _version(key, known=None):
+    version = (known or {}).get(key) or cache.get(key)
+    if version is None:
+        # Seeded from the clock rather than 1, so a version lost with the
+        # cache never matches one stamped into an older token
+        cache.add(key, time.time_ns() // 1000, None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns() // 1000, None)
+
+
+def _cache_key(user_id):
+    return f"user-scope:{_version(VERSION_KEY)}:{user_id}"
+
+
+def _resolve(user):
+    from transactions.models import CashBook
+
+    role = user.role.name if user.role_id else ""
+    if user.is_superuser or role.lower() == "admin":
+        return UserScope(is_admin=True)
+
+    campus_ids = frozenset(user.off_campuses.values_list("id", flat=True))
+    cash_book_ids = frozenset(
+        CashBook.objects.filter(campus_id__in=campus_ids).values_list("id", flat=True)
+    )
+    return UserScope(is_admin=False, campus_ids=campus_ids, cash_book_ids=cash_book_ids)
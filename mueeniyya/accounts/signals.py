@@ -0,0 +1,44 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import response_cache, scope
+from .models import OffCampus, Role, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_scope(sender, instance, **kwargs):
+    scope.invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.off_campuses.through)
+def invalidate_scope_on_campus_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        scope.invalidate_user(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            scope.invalidate_user(user_id)
+    else:
+        scope.invalidate_all()
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_delete, sender=OffCampus)
+def invalidate_all_scopes(sender, **kwargs):
+    scope.invalidate_all()
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_role_responses(sender, **kwargs):
+    response_cache.invalidate("roles")
+
+
+@receiver(post_save, sender=OffCampus)
+@receiver(post_delete, sender=OffCampus)
+def invalidate_campus_responses(sender, **kwargs):
+    # cash books and categories embed campus names
+    response_cache.invalidate("offcampuses", "cash_books", "categories")
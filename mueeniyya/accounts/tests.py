@@ -1,3 +1,282 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import identify_hasher
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from transactions.models import CashBook, PaymentMode
+from . import response_cache, scope
+from .authentication import ClaimsUser
+from .throttles import LoginIPRateThrottle, LoginMobileRateThrottle
+from .models import User, Role, OffCampus
+
+
+class UserScopeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff_role = Role.objects.create(name="staff")
+        self.campus = OffCampus.objects.create(name="Main Campus")
+        self.other_campus = OffCampus.objects.create(name="Other Campus")
+        self.book = CashBook.objects.create(name="Main Book", campus=self.campus)
+        self.other_book = CashBook.objects.create(name="Other Book", campus=self.other_campus)
+        self.staff = User.objects.create_user(mobile="9000000002", password="pass", role=self.staff_role, name="Staff")
+        self.staff.off_campuses.set([self.campus])
+
+    def fresh_scope(self):
+        # A new instance, as every request loads the user again
+        return scope.get_scope(User.objects.get(pk=self.staff.pk))
+
+    def test_scope_is_cached_across_requests(self):
+        self.assertEqual(self.fresh_scope().cash_book_ids, {self.book.id})
+        user = User.objects.get(pk=self.staff.pk)
+        with CaptureQueriesContext(connection) as queries:
+            user_scope = scope.get_scope(user)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(user_scope.campus_ids, {self.campus.id})
+        self.assertFalse(user_scope.allows_cash_book(self.other_book.id))
+
+    def test_campus_assignment_invalidates_scope(self):
+        self.fresh_scope()
+        self.staff.off_campuses.add(self.other_campus)
+        self.assertEqual(self.fresh_scope().cash_book_ids, {self.book.id, self.other_book.id})
+
+    def test_cash_book_changes_invalidate_scope(self):
+        self.fresh_scope()
+        new_book = CashBook.objects.create(name="New Book", campus=self.campus)
+        self.assertIn(new_book.id, self.fresh_scope().cash_book_ids)
+
+    def test_role_rename_invalidates_scope(self):
+        self.assertFalse(self.fresh_scope().is_admin)
+        self.staff_role.name = "Admin"
+        self.staff_role.save()
+        self.assertTrue(self.fresh_scope().is_admin)
+
+    def test_viewsets_use_scope(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get("/api/transactions/cash_books/")
+        self.assertEqual([row["id"] for row in response.json()], [self.book.id])
+
+        response = client.post("/api/transactions/cash_books/", {"name": "Sneaky", "campus": self.other_campus.id})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(CashBook.objects.filter(name="Sneaky").exists())
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campus = OffCampus.objects.create(name="Main Campus")
+        self.other_campus = OffCampus.objects.create(name="Other Campus")
+        CashBook.objects.create(name="Main Book", campus=self.campus)
+        CashBook.objects.create(name="Other Book", campus=self.other_campus)
+        self.admin = User.objects.create_superuser(mobile="9000000001", password="pass", name="Admin")
+        staff_role = Role.objects.create(name="staff")
+        self.staff = User.objects.create_user(mobile="9000000002", password="pass", role=staff_role, name="Staff")
+        self.staff.off_campuses.set([self.campus])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_unchanged_response_returns_304_without_queries(self):
+        url = "/api/transactions/cash_books/"
+        first = self.client.get(url)
+        etag = first["ETag"]
+        self.assertEqual(len(first.json()), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(len(queries), 0)
+
+    def test_saves_invalidate_dependent_endpoints(self):
+        url = "/api/transactions/cash_books/"
+        etag = self.client.get(url)["ETag"]
+        self.campus.name = "Renamed Campus"
+        self.campus.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("Renamed Campus", [row["campus_name"] for row in res.json()])
+
+    def test_lost_version_does_not_revive_stale_entries(self):
+        url = "/api/transactions/payment_modes/"
+        PaymentMode.objects.create(name="Cash")
+        cache.clear()
+        self.assertEqual([row["name"] for row in self.client.get(url).json()], ["Cash"])
+        PaymentMode.objects.create(name="Bank")
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+        cache.delete(response_cache.VERSION_KEY.format("payment_modes"))
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+    def test_entries_are_keyed_by_scope(self):
+        url = "/api/transactions/cash_books/"
+        self.assertEqual(len(self.client.get(url).json()), 2)
+        self.client.force_authenticate(self.staff)
+        self.assertEqual([row["name"] for row in self.client.get(url).json()], ["Main Book"])
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff_role = Role.objects.create(name="staff")
+        self.campus = OffCampus.objects.create(name="Main Campus")
+        self.other_campus = OffCampus.objects.create(name="Other Campus")
+        self.book = CashBook.objects.create(name="Main Book", campus=self.campus)
+        self.staff = User.objects.create_user(mobile="9000000002", password="pass", role=self.staff_role, name="Staff")
+        self.staff.off_campuses.set([self.campus])
+        self.client = APIClient()
+
+    def login(self, url="/api/accounts/login/"):
+        res = self.client.post(url, {"mobile": "9000000002", "password": "pass"}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+        return res.data
+
+    def user_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(url, data, format="json")
+        self.assertLess(res.status_code, 400, res.data)
+        return [q["sql"] for q in queries if 'FROM "accounts_user"' in q["sql"]], res
+
+    def test_reads_use_token_claims(self):
+        self.login()
+        user_sql, res = self.user_queries("get", "/api/accounts/offcampuses/")
+        self.assertEqual(user_sql, [])
+        self.assertEqual([c["id"] for c in res.data], [self.campus.id])
+        self.assertEqual(self.client.get("/api/accounts/me/").data["name"], "Staff")
+
+    def test_claims_user_reads_name_and_role(self):
+        user = ClaimsUser(AccessToken(self.login()["access"]))
+        self.assertEqual((user.name, user.role, user.is_superuser), ("Staff", "staff", False))
+
+    def test_token_endpoint_issues_claims(self):
+        self.login("/api/accounts/token/")
+        user_sql, _ = self.user_queries("get", "/api/transactions/cash_books/")
+        self.assertEqual(user_sql, [])
+
+    def test_stale_claims_and_writes_load_the_user(self):
+        tokens = self.login()
+        self.staff.off_campuses.add(self.other_campus)
+        user_sql, res = self.user_queries("get", "/api/accounts/offcampuses/")
+        self.assertTrue(user_sql)
+        self.assertEqual({c["id"] for c in res.data}, {self.campus.id, self.other_campus.id})
+
+        user_sql, _ = self.user_queries("post", "/api/transactions/categories/", {"name": "Fees"})
+        self.assertTrue(user_sql)
+
+        # a refresh re-stamps the claims
+        res = self.client.post("/api/accounts/token_refresh/", {"refresh": tokens["refresh"]}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+        user_sql, res = self.user_queries("get", "/api/accounts/offcampuses/")
+        self.assertEqual(user_sql, [])
+        self.assertEqual(len(res.data), 2)
+
+    def test_deactivated_user_is_rejected(self):
+        self.login()
+        self.staff.is_active = False
+        self.staff.save()
+        self.assertEqual(self.client.get("/api/accounts/offcampuses/").status_code, 401)
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches["throttle"].clear()
+        self.user = User.objects.create_user(mobile="9000000002", password="pass", role=Role.objects.create(name="staff"))
+        self.client = APIClient()
+
+    def login(self, mobile, password="wrong", url="/api/accounts/login/"):
+        return self.client.post(url, {"mobile": mobile, "password": password}, format="json").status_code
+
+    @mock.patch.dict(LoginMobileRateThrottle.THROTTLE_RATES, {"login_mobile": "2/min"})
+    def test_attempts_are_limited_per_mobile(self):
+        self.assertEqual([self.login("9000000002") for _ in range(3)], [401, 401, 429])
+        self.assertEqual(self.login("9000000002", "pass", url="/api/accounts/token/"), 429)
+        self.assertEqual(self.login("9000000003"), 401)
+
+    @mock.patch.dict(LoginIPRateThrottle.THROTTLE_RATES, {"login_ip": "3/min"})
+    def test_attempts_are_limited_per_ip(self):
+        self.assertEqual([self.login(f"90000000{i:02d}") for i in range(4)], [401, 401, 401, 429])
+
+    @mock.patch.dict(LoginIPRateThrottle.THROTTLE_RATES, {"login_ip": "3/min"})
+    def test_spoofed_forwarded_for_is_still_limited(self):
+        # the proxy appends the real client address to whatever was sent
+        statuses = [
+            self.client.post(
+                "/api/accounts/login/",
+                {"mobile": f"90000000{i:02d}", "password": "wrong"},
+                format="json",
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{i}, 203.0.113.7",
+            ).status_code
+            for i in range(4)
+        ]
+        self.assertEqual(statuses, [401, 401, 401, 429])
+
+    def test_hash_is_upgraded_on_login(self):
+        with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher"]):
+            self.user.set_password("pass")
+            self.user.save()
+        self.assertEqual(self.login("9000000002", "pass"), 200)
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm, "pbkdf2_sha256")
+        self.assertEqual(self.login("9000000002", "pass"), 200)
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(mobile="9000000001", password="pass", role=Role.objects.create(name="admin"), name="Admin")
+        self.staff_role = Role.objects.create(name="staff")
+        self.campus = OffCampus.objects.create(name="Main Campus")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_users(self, count):
+        for _ in range(count):
+            user = User.objects.create_user(
+                mobile=f"8{User.objects.count():09d}", password="pass", role=self.staff_role, name="Staff"
+            )
+            user.off_campuses.set([self.campus])
+
+    def count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get("/api/accounts/users/", params or {})
+        self.assertEqual(res.status_code, 200)
+        return len(queries), res.data
+
+    def test_user_list_queries_do_not_grow_with_users(self):
+        self.add_users(2)
+        few, _ = self.count_queries()
+        self.add_users(10)
+        many, data = self.count_queries()
+        self.assertEqual(few, many)
+        self.assertEqual(data[-1]["off_campuses"][0]["name"], "Main Campus")
+
+    def test_fields_projection_uses_values(self):
+        self.add_users(3)
+        count, data = self.count_queries({"fields": "id,name,role"})
+        self.assertEqual(count, 1)
+        self.assertEqual(data[0], {"id": self.admin.id, "name": "Admin", "role": "admin"})
+
+        # nested fields go through the serializer, trimmed
+        _, data = self.count_queries({"fields": "id,off_campuses"})
+        self.assertEqual(set(data[1]), {"id", "off_campuses"})
+
+        res = self.client.get("/api/accounts/users/", {"fields": "id,password"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_staff_see_users_of_their_campuses_once(self):
+        other = OffCampus.objects.create(name="Other Campus")
+        self.add_users(1)
+        colleague = User.objects.get(mobile="8000000001")
+        colleague.off_campuses.add(other)
+        staff = User.objects.create_user(mobile="9000000002", password="pass", role=self.staff_role, name="Me")
+        staff.off_campuses.set([self.campus, other])
+        self.client.force_authenticate(staff)
+        _, data = self.count_queries({"fields": "id"})
+        self.assertEqual(sorted(row["id"] for row in data), sorted([colleague.id, staff.id]))
@@ -0,0 +1,32 @@
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginIPRateThrottle(SimpleRateThrottle):
+    """
+    Limits login attempts per client IP, before any password is hashed.
+    The IP is read NUM_PROXIES entries from the end of X-Forwarded-For
+    (REST_FRAMEWORK settings), past anything the client put there.
+    """
+    scope = "login_ip"
+    cache = caches["throttle"]
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class LoginMobileRateThrottle(SimpleRateThrottle):
+    """
+    Limits login attempts per mobile number, whichever IPs they come from.
+    """
+    scope = "login_mobile"
+    cache = caches["throttle"]
+
+    def get_cache_key(self, request, view):
+        mobile = str(request.data.get("mobile") or "").strip()
+        if not mobile:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": mobile}
+
+
+LOGIN_THROTTLES = [LoginIPRateThrottle, LoginMobileRateThrottle]
@@ -0,0 +1,62 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import scope
+from .models import User
+
+SCOPE_CLAIM = "scope"
+
+
+def stamp(token, user):
+    """
+    Puts the user's name, role and UserScope into `token`, with the scope
+    version they were read at.
+    """
+    # Read the version first: a change racing with this makes the claims
+    # stale rather than wrong
+    version = scope.token_version(user.pk)
+    user_scope = scope.get_scope(user)
+    token["name"] = user.name
+    token["role"] = user.role.name if user.role_id else None
+    token["is_superuser"] = user.is_superuser
+    token[SCOPE_CLAIM] = {
+        "v": version,
+        "admin": user_scope.is_admin,
+        "campuses": sorted(user_scope.campus_ids),
+        "cash_books": sorted(user_scope.cash_book_ids),
+    }
+
+
+def is_current(token):
+    claims = token.get(SCOPE_CLAIM)
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    return bool(claims) and user_id is not None and claims.get("v") == scope.token_version(user_id)
+
+
+class ScopedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the scope claims; access tokens copy them. A
+    refresh re-reads them from the database when they have gone stale.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        stamp(token, user)
+        return token
+
+    @property
+    def access_token(self):
+        if not is_current(self):
+            user = User.objects.select_related("role").get(pk=self[api_settings.USER_ID_CLAIM])
+            stamp(self, user)
+        return super().access_token
+
+
+class ScopedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ScopedRefreshToken
+
+
+class ScopedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ScopedRefreshToken
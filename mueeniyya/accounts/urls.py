@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from .throttles import LOGIN_THROTTLES
 from .views import RoleViewSet, UserViewSet, LoginView, MeView, OffCampusViewSet
 
 router = DefaultRouter()
@@ -13,7 +14,7 @@ router.register(r'offcampuses', OffCampusViewSet, basename='offcampuses')
 
 urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/', TokenObtainPairView.as_view(throttle_classes=LOGIN_THROTTLES), name='token_obtain_pair'),
     path('token_refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('me/', MeView.as_view(), name='me'),
     path('', include(router.urls)),
@@ -3,30 +3,43 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User, Role, OffCampus
+from .fields import SparseFieldsMixin
+from .response_cache import CachedResponseMixin
+from .scope import get_scope
+from .throttles import LOGIN_THROTTLES
+from .tokens import ScopedRefreshToken
 from .serializers import UserSerializer, RoleSerializer, LoginSerializer, OffCampusSerializer
 
 # Role CRUD
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(CachedResponseMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [IsAuthenticated]
+    cache_namespace = "roles"
+    cache_per_scope = False
 
 # User CRUD
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
+    """
+    Users with their role and campuses. `?fields=id,name` returns only
+    those columns, e.g. for mapping ids to names.
+    """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
+        user_scope = get_scope(self.request.user)
+        users = User.objects.select_related('role').prefetch_related('off_campuses').order_by('id')
 
         # Superusers or Admins can view all users
-        if user.is_superuser or (user.role and user.role.name.lower() == "admin"):
-            return User.objects.all()
+        if user_scope.is_admin:
+            return users
 
-        # Staff users can view only themselves or users from their campuses
-        return User.objects.filter(off_campuses__in=user.off_campuses.all()).distinct()
+        # Staff users can view only themselves or users from their campuses;
+        # a subquery on the campus link table instead of join + distinct
+        assigned = User.off_campuses.through.objects.filter(offcampus_id__in=user_scope.campus_ids)
+        return users.filter(id__in=assigned.values('user_id'))
     
     def create(self, request, *args, **kwargs):
         print("📥 Incoming data:", request.data)
@@ -40,6 +53,7 @@ class UserViewSet(viewsets.ModelViewSet):
 # JWT Login View
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = LOGIN_THROTTLES
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -51,7 +65,7 @@ class LoginView(APIView):
         if not user:
             return Response({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ScopedRefreshToken.for_user(user)
         return Response({
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -62,16 +76,18 @@ class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
+        # request.user may be a ClaimsUser; the profile needs the row
+        user = User.objects.get(pk=request.user.pk)
         serializer = UserSerializer(user)
         return Response(serializer.data)
 
-class OffCampusViewSet(viewsets.ModelViewSet):
+class OffCampusViewSet(CachedResponseMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = OffCampusSerializer
     permission_classes = [IsAuthenticated]
+    cache_namespace = "offcampuses"
     
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser or (hasattr(user, "role") and user.role and user.role.name.lower() == "admin"):
+        user_scope = get_scope(self.request.user)
+        if user_scope.is_admin:
             return OffCampus.objects.all().order_by('name')
-        return user.off_campuses.all().order_by('name')
\ No newline at end of file
+        return OffCampus.objects.filter(id__in=user_scope.campus_ids).order_by('name')
\ No newline at end of file
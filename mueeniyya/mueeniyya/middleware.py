@@ -0,0 +1,67 @@
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+BROTLI_QUALITY = 5
+
+
+def accepted_encodings(header):
+    """
+    Content codings an Accept-Encoding header accepts, i.e. those listed
+    without `q=0`.
+    """
+    accepted = set()
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses API responses with brotli when the client accepts it and the
+    `brotli` package is installed, and with gzip otherwise.
+
+    Streaming responses (report and PDF downloads, mostly already
+    compressed formats) are passed through untouched.
+    """
+    def process_response(self, request, response):
+        if response.streaming:
+            return response
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is None or "br" not in accepted:
+            if "gzip" in accepted:
+                return super().process_response(request, response)
+            if len(response.content) >= 200 and not response.has_header("Content-Encoding"):
+                patch_vary_headers(response, ("Accept-Encoding",))
+            return response
+
+        if len(response.content) < 200 or response.has_header("Content-Encoding"):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+
+        # the compressed body is a different byte sequence (see GZipMiddleware)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
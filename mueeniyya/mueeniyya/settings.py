@@ -38,6 +38,8 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # after WhiteNoise, which serves its own pre-compressed static files
+    'mueeniyya.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,6 +94,30 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The first hasher of the chosen profile hashes new passwords; the rest
+# still verify existing hashes, which are upgraded on the next successful
+# login. argon2 needs argon2-cffi and bcrypt needs bcrypt installed.
+# Compare profiles with `manage.py bench_password_hashers`.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for name, hasher in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER_PROFILE
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Argon2 cost for TunedArgon2PasswordHasher (memory in KiB)
+PASSWORD_ARGON2 = {
+    'time_cost': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', 19456)),
+    'parallelism': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -111,6 +137,41 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Shared by all worker processes so cache invalidation reaches every worker
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, '.cache')),
+        # The file cache culls random keys (version counters included) past
+        # MAX_ENTRIES; keep that well above the response and scope entries
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '100000')),
+        },
+    },
+    # Login throttle counters: per process, so no I/O on the login path;
+    # with several workers the effective limit is that many times higher
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'login-throttle',
+    },
+}
+
+# Rendered report files served by the report job download endpoint. The
+# worker (`python manage.py run_report_worker`, the Procfile's worker
+# process) writes them and the web process reads them, so both must see the
+# same directory; without that the reports page falls back to the
+# synchronous generate_report endpoint.
+REPORT_ARTIFACT_DIR = os.environ.get('REPORT_ARTIFACT_DIR', os.path.join(BASE_DIR, 'report_artifacts'))
+# Rendered reports are reused and downloadable for this long, then deleted
+# by the worker (or `python manage.py clean_report_artifacts`)
+REPORT_ARTIFACT_TTL_SECONDS = int(os.environ.get('REPORT_ARTIFACT_TTL_SECONDS', str(24 * 60 * 60)))
+# RUNNING report jobs older than this are requeued (worker presumed dead)
+REPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get('REPORT_JOB_TIMEOUT_SECONDS', str(30 * 60)))
+
+# How far back each sync re-reads updated_at (transactions.sync); must be
+# longer than the slowest commit of a write transaction
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '60'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -120,9 +181,18 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ScopeClaimsJWTAuthentication',
     ),
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # accounts.throttles, on the login and token endpoints
+    'DEFAULT_THROTTLE_RATES': {
+        'login_mobile': os.environ.get('LOGIN_MOBILE_RATE', '10/min'),
+        'login_ip': os.environ.get('LOGIN_IP_RATE', '60/min'),
+    },
+    # Proxies in front of the app that append to X-Forwarded-For (1 for the
+    # platform router); client IPs for throttling are read that many hops
+    # from the end, so a client-supplied header cannot pick its own identity
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '1')),
 }
 
 from datetime import timedelta
@@ -133,6 +203,9 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Access tokens carry role and campus claims (accounts.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.tokens.ScopedTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.tokens.ScopedTokenRefreshSerializer',
 }
 
 
@@ -142,6 +215,9 @@ CORS_ALLOWED_ORIGINS = [
     "https://acc.mueeniyya.in",
 ]
 
+# Lets the frontend read ETags of cached reference data responses
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 CSRF_TRUSTED_ORIGINS = [
     "https://acc.mueeniyya.in",
 ]
\ No newline at end of file
@@ -1,8 +1,29 @@
 from django.contrib import admin
-from .models import Category, PaymentMode, Transaction, OpeningBalance, CashBook
+from .models import Category, PaymentMode, Transaction, OpeningBalance, CashBook, DailyCashBookBalance, ReportJob, Party, TransactionTombstone, MonthlyCategoryTotal
 
 admin.site.register(Category)
 admin.site.register(PaymentMode)
 admin.site.register(Transaction)
 admin.site.register(OpeningBalance)
-admin.site.register(CashBook)
\ No newline at end of file
+admin.site.register(CashBook)
+admin.site.register(ReportJob)
+admin.site.register(Party)
+admin.site.register(TransactionTombstone)
+
+
+@admin.register(DailyCashBookBalance, MonthlyCategoryTotal)
+class DerivedTotalsAdmin(admin.ModelAdmin):
+    """
+    Rollups maintained from the Transaction table (rebuild_daily_balances,
+    rebuild_category_totals); viewable only, since edits would be lost or
+    make them disagree with the transactions.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,183 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import CashBook, DailyCashBookBalance, OpeningBalance, Transaction
+
+ZERO = Decimal("0.00")
+
+
+def lock_cash_books(cash_book_ids):
+    """
+    Locks the given cash book rows until the surrounding transaction ends.
+    Everything that writes a book's snapshots or category totals takes this
+    lock first, so first writes to the same day cannot both create its row
+    and closing balances are computed from committed neighbours. Books are
+    locked in id order so writers never deadlock.
+    """
+    ids = sorted({cash_book_id for cash_book_id in cash_book_ids if cash_book_id})
+    if ids:
+        list(CashBook.objects.select_for_update().filter(id__in=ids).order_by("id").values_list("id", flat=True))
+
+
+def apply_delta(cash_book_id, date, amount_in=ZERO, amount_out=ZERO):
+    """
+    Adds a change of Cash In / Cash Out on `date` to the daily snapshots.
+
+    The day's totals are adjusted and every later closing balance is shifted
+    by the same net amount, so back-dated edits stay correct.
+    """
+    if not cash_book_id or (not amount_in and not amount_out):
+        return
+
+    net = amount_in - amount_out
+    rows = DailyCashBookBalance.objects.filter(cash_book_id=cash_book_id)
+
+    with transaction.atomic():
+        lock_cash_books([cash_book_id])
+        updated = rows.filter(date=date).update(
+            total_in=F("total_in") + amount_in,
+            total_out=F("total_out") + amount_out,
+            closing_balance=F("closing_balance") + net,
+        )
+        if not updated:
+            previous = rows.filter(date__lt=date).order_by("-date").values_list("closing_balance", flat=True).first()
+            DailyCashBookBalance.objects.create(
+                cash_book_id=cash_book_id,
+                date=date,
+                total_in=amount_in,
+                total_out=amount_out,
+                closing_balance=(previous or ZERO) + net,
+            )
+        rows.filter(date__gt=date).update(closing_balance=F("closing_balance") + net)
+
+
+def apply_transaction(txn, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) a single transaction from the snapshots.
+    """
+    amount = Decimal(txn.amount or 0) * sign
+    if txn.transaction_type == "IN":
+        apply_delta(txn.cash_book_id, txn.date, amount_in=amount)
+    elif txn.transaction_type == "OUT":
+        apply_delta(txn.cash_book_id, txn.date, amount_out=amount)
+
+
+def collect_deltas(txns, sign=1, deltas=None):
+    """
+    Tallies the Cash In / Cash Out of `txns` per (cash book, date) into
+    `deltas` without writing, so a bulk edit applies one delta per day.
+    """
+    deltas = {} if deltas is None else deltas
+    for txn in txns:
+        if not txn.cash_book_id or txn.transaction_type not in ("IN", "OUT"):
+            continue
+        amount = Decimal(txn.amount or 0) * sign
+        date = datetime.date.fromisoformat(txn.date) if isinstance(txn.date, str) else txn.date
+        amount_in, amount_out = deltas.get((txn.cash_book_id, date), (ZERO, ZERO))
+        if txn.transaction_type == "IN":
+            amount_in += amount
+        else:
+            amount_out += amount
+        deltas[(txn.cash_book_id, date)] = (amount_in, amount_out)
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Writes tallies from collect_deltas(), locking every cash book involved
+    up front. Days whose changes cancel out are skipped.
+    """
+    if not deltas:
+        return
+    with transaction.atomic():
+        lock_cash_books(cash_book_id for cash_book_id, _ in deltas)
+        for (cash_book_id, date), (amount_in, amount_out) in sorted(deltas.items()):
+            apply_delta(cash_book_id, date, amount_in=amount_in, amount_out=amount_out)
+
+
+def rebuild(cash_book_ids=None):
+    """
+    Recomputes the snapshots from the Transaction table. Returns the number
+    of day rows written.
+    """
+    days = (
+        Transaction.objects.filter(cash_book__isnull=False)
+        .order_by()
+        .values("cash_book_id", "date")
+        .annotate(
+            total_in=Coalesce(Sum("amount", filter=Q(transaction_type="IN")), Value(ZERO)),
+            total_out=Coalesce(Sum("amount", filter=Q(transaction_type="OUT")), Value(ZERO)),
+        )
+        .order_by("cash_book_id", "date")
+    )
+    snapshots = DailyCashBookBalance.objects.all()
+    if cash_book_ids is not None:
+        days = days.filter(cash_book_id__in=cash_book_ids)
+        snapshots = snapshots.filter(cash_book_id__in=cash_book_ids)
+
+    with transaction.atomic():
+        # read under the lock so no write lands between the read and the swap
+        lock_cash_books(CashBook.objects.values_list("id", flat=True) if cash_book_ids is None else cash_book_ids)
+        rows = []
+        current_book, closing = None, ZERO
+        for day in days.iterator():
+            if day["cash_book_id"] != current_book:
+                current_book, closing = day["cash_book_id"], ZERO
+            closing += day["total_in"] - day["total_out"]
+            rows.append(DailyCashBookBalance(
+                cash_book_id=day["cash_book_id"],
+                date=day["date"],
+                total_in=day["total_in"],
+                total_out=day["total_out"],
+                closing_balance=closing,
+            ))
+
+        snapshots.delete()
+        DailyCashBookBalance.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def carried_balance(cash_book_ids=None, before=None):
+    """
+    Sum of OpeningBalance amounts plus each cash book's closing balance on
+    the last snapshot day before `before`. Costs one indexed lookup per cash
+    book. With no `before`, only the OpeningBalance amounts are returned.
+    """
+    books = CashBook.objects.all()
+    balances = OpeningBalance.objects.all()
+    if cash_book_ids is not None:
+        books = books.filter(id__in=cash_book_ids)
+        balances = balances.filter(cash_book_id__in=cash_book_ids)
+
+    total = balances.aggregate(total=Sum("amount"))["total"] or ZERO
+    if before is None:
+        return total
+
+    latest = (
+        DailyCashBookBalance.objects.filter(cash_book=OuterRef("pk"), date__lt=before)
+        .order_by("-date")
+        .values("closing_balance")[:1]
+    )
+    carried = books.order_by().annotate(closing=Subquery(latest)).aggregate(total=Sum("closing"))["total"]
+    return total + (carried or ZERO)
+
+
+def balance_as_of(cash_book_id, date, time=None):
+    """
+    Balance of a cash book at the end of `date`, or at `time` on that day
+    when given: one snapshot lookup plus that day's rows up to `time`.
+    """
+    if time is None:
+        return carried_balance([cash_book_id], before=date + datetime.timedelta(days=1))
+
+    balance = carried_balance([cash_book_id], before=date)
+    day = Transaction.objects.filter(cash_book_id=cash_book_id, date=date, time__lte=time).order_by().aggregate(
+        total_in=Sum("amount", filter=Q(transaction_type="IN")),
+        total_out=Sum("amount", filter=Q(transaction_type="OUT")),
+    )
+    return balance + (day["total_in"] or ZERO) - (day["total_out"] or ZERO)
+
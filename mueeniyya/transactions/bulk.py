@@ -0,0 +1,117 @@
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from . import balances, category_totals, parties, search, signals, sync
+from .models import Transaction, TransactionSearchToken, TransactionTombstone
+
+# Fields that bulk_update may change
+UPDATABLE_FIELDS = (
+    "transaction_type", "category", "payment_mode", "cash_book", "date", "time",
+    "remarks", "party_name", "party_mobile_number",
+)
+BALANCE_FIELDS = {"transaction_type", "cash_book", "date"}
+CATEGORY_TOTAL_FIELDS = BALANCE_FIELDS | {"category"}
+PARTY_FIELDS = {"party_name", "party_mobile_number", "cash_book"}
+
+SNAPSHOT_FIELDS = ("id", "cash_book_id", "category_id", "date", "transaction_type", "amount", *search.SEARCH_FIELDS)
+ID_CHUNK_SIZE = 5000
+
+
+def update_transactions(queryset, changes):
+    """
+    Applies `changes` (field -> validated value) to every row of `queryset`
+    with a single UPDATE, then refreshes only the derived data the changed
+    fields affect: the rows are taken off and added back to the daily
+    balances and category totals (one delta per day and month, not a
+    rebuild of the books' history), party usage counts and search tokens.
+    Returns the number of rows updated.
+    """
+    changed = set(changes)
+    with db_transaction.atomic():
+        rows = _snapshot(queryset)
+        if not rows:
+            return 0
+
+        daily = balances.collect_deltas(rows, sign=-1) if changed & BALANCE_FIELDS else None
+        monthly = category_totals.collect_deltas(rows, sign=-1) if changed & CATEGORY_TOTAL_FIELDS else None
+        if changed & PARTY_FIELDS:
+            parties.apply_uses(parties.collect_uses(rows), sign=-1)
+
+        # update() skips auto_now; the sync feed relies on updated_at
+        updated_at = timezone.now()
+        count = sum(
+            Transaction.objects.filter(id__in=ids).update(**changes, updated_at=updated_at)
+            for ids in _id_chunks(rows)
+        )
+
+        moved = []
+        if "cash_book" in changes:
+            new_book_id = getattr(changes["cash_book"], "pk", changes["cash_book"])
+            moved = [
+                TransactionTombstone(transaction_id=row.id, cash_book_id=row.cash_book_id)
+                for row in rows if row.cash_book_id and row.cash_book_id != new_book_id
+            ]
+
+        for row in rows:
+            for field, value in changes.items():
+                setattr(row, field, value)
+
+        if daily is not None:
+            balances.apply_deltas(balances.collect_deltas(rows, deltas=daily))
+        if monthly is not None:
+            category_totals.apply_deltas(category_totals.collect_deltas(rows, deltas=monthly))
+        if changed & PARTY_FIELDS:
+            parties.apply_uses(parties.collect_uses(rows))
+        if changed & set(search.SEARCH_FIELDS):
+            _delete_tokens([row.id for row in rows])
+            search.index_transactions(rows)
+
+        # last, so the sync feed sees times close to the commit
+        TransactionTombstone.objects.bulk_create(moved)
+        sync.restamp(row.id for row in rows)
+    return count
+
+
+def delete_transactions(queryset):
+    """
+    Deletes every row of `queryset`, taking the rows off the daily
+    balances, category totals and their parties' counts and leaving sync
+    tombstones in bulk instead of once per row. Returns the number of rows
+    deleted.
+    """
+    with db_transaction.atomic():
+        rows = _snapshot(queryset)
+        if not rows:
+            return 0
+
+        parties.apply_uses(parties.collect_uses(rows), sign=-1)
+        count = 0
+        with signals.paused():
+            # search tokens go with the rows (CASCADE)
+            for ids in _id_chunks(rows):
+                deleted = Transaction.objects.filter(id__in=ids).delete()[1]
+                count += deleted.get(Transaction._meta.label, 0)
+        balances.apply_deltas(balances.collect_deltas(rows, sign=-1))
+        category_totals.apply_deltas(category_totals.collect_deltas(rows, sign=-1))
+        # last, so the sync feed sees times close to the commit
+        TransactionTombstone.objects.bulk_create(
+            TransactionTombstone(transaction_id=row.id, cash_book_id=row.cash_book_id) for row in rows
+        )
+    return count
+
+
+def _snapshot(queryset):
+    # The rows are locked and written by id, so the derived data is updated
+    # for exactly the rows that change, even if the filter matches others
+    # by then
+    return list(queryset.select_related(None).select_for_update().order_by().only(*SNAPSHOT_FIELDS))
+
+
+def _id_chunks(rows):
+    for start in range(0, len(rows), ID_CHUNK_SIZE):
+        yield [row.id for row in rows[start:start + ID_CHUNK_SIZE]]
+
+
+def _delete_tokens(ids):
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        TransactionSearchToken.objects.filter(transaction_id__in=ids[start:start + ID_CHUNK_SIZE]).delete()
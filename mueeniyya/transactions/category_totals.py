@@ -0,0 +1,112 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from . import balances
+from .models import CashBook, MonthlyCategoryTotal, Transaction
+
+ZERO = Decimal("0.00")
+
+
+def month_of(date):
+    if isinstance(date, str):
+        date = datetime.date.fromisoformat(date)
+    return date.replace(day=1)
+
+
+def apply_delta(cash_book_id, category_id, month, amount_in=ZERO, amount_out=ZERO, count=0):
+    """
+    Adds Cash In / Cash Out amounts and a row count to one month of a
+    category in a cash book, creating the row when something is added.
+    """
+    if not amount_in and not amount_out and not count:
+        return
+
+    with transaction.atomic():
+        # same per-book lock as the daily balances (see balances.lock_cash_books)
+        balances.lock_cash_books([cash_book_id])
+        updated = MonthlyCategoryTotal.objects.filter(
+            cash_book_id=cash_book_id, category_id=category_id, month=month
+        ).update(
+            total_in=F("total_in") + amount_in,
+            total_out=F("total_out") + amount_out,
+            count=F("count") + count,
+        )
+        if not updated and count > 0:
+            MonthlyCategoryTotal.objects.create(
+                cash_book_id=cash_book_id, category_id=category_id, month=month,
+                total_in=amount_in, total_out=amount_out, count=count,
+            )
+
+
+def apply_transaction(txn, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) a single transaction from the monthly
+    category totals. Rows without a cash book or category are not tracked.
+    """
+    apply_deltas(collect_deltas([txn], sign))
+
+
+def collect_deltas(txns, sign=1, deltas=None):
+    """
+    Tallies `txns` per (cash book, category, month) into `deltas` without
+    writing, so a bulk edit applies one delta per month and category.
+    """
+    deltas = {} if deltas is None else deltas
+    for txn in txns:
+        if not txn.cash_book_id or not txn.category_id or txn.transaction_type not in ("IN", "OUT"):
+            continue
+        amount = Decimal(txn.amount or 0) * sign
+        key = (txn.cash_book_id, txn.category_id, month_of(txn.date))
+        amount_in, amount_out, count = deltas.get(key, (ZERO, ZERO, 0))
+        if txn.transaction_type == "IN":
+            amount_in += amount
+        else:
+            amount_out += amount
+        deltas[key] = (amount_in, amount_out, count + sign)
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Writes tallies from collect_deltas(), locking every cash book involved
+    up front.
+    """
+    if not deltas:
+        return
+    with transaction.atomic():
+        balances.lock_cash_books(cash_book_id for cash_book_id, _, _ in deltas)
+        for (cash_book_id, category_id, month), (amount_in, amount_out, count) in sorted(deltas.items()):
+            apply_delta(cash_book_id, category_id, month, amount_in=amount_in, amount_out=amount_out, count=count)
+
+
+def rebuild(cash_book_ids=None):
+    """
+    Recomputes the totals from the Transaction table. Returns the number of
+    rows written.
+    """
+    months = (
+        Transaction.objects.filter(cash_book__isnull=False, category__isnull=False)
+        .order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("cash_book_id", "category_id", "month")
+        .annotate(
+            total_in=Coalesce(Sum("amount", filter=Q(transaction_type="IN")), Value(ZERO)),
+            total_out=Coalesce(Sum("amount", filter=Q(transaction_type="OUT")), Value(ZERO)),
+            count=Count("id"),
+        )
+    )
+    totals = MonthlyCategoryTotal.objects.all()
+    if cash_book_ids is not None:
+        months = months.filter(cash_book_id__in=cash_book_ids)
+        totals = totals.filter(cash_book_id__in=cash_book_ids)
+
+    with transaction.atomic():
+        balances.lock_cash_books(CashBook.objects.values_list("id", flat=True) if cash_book_ids is None else cash_book_ids)
+        rows = [MonthlyCategoryTotal(**month) for month in months.iterator()]
+        totals.delete()
+        MonthlyCategoryTotal.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
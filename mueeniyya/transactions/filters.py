@@ -0,0 +1,83 @@
+import django_filters
+from django.db.models import Exists, OuterRef, Q
+from rest_framework import filters
+
+from . import ledger, search
+from .models import Category, Transaction
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class TransactionFilter(django_filters.FilterSet):
+    """
+    Query params for the transaction list, ledger and summary endpoints.
+
+    Dates use YYYY-MM-DD. `date_range` takes one of the named relative
+    ranges and is combined with `date_from` / `date_to` when both are sent.
+    The `__in` filters take comma separated ids, e.g. `category__in=1,4`.
+    """
+    date_from = django_filters.DateFilter(field_name="date", lookup_expr="gte")
+    date_to = django_filters.DateFilter(field_name="date", lookup_expr="lte")
+    date_range = django_filters.ChoiceFilter(
+        choices=[(name, name) for name in ledger.NAMED_DATE_RANGES], method="filter_date_range"
+    )
+
+    category__in = NumberInFilter(field_name="category", lookup_expr="in")
+    payment_mode__in = NumberInFilter(field_name="payment_mode", lookup_expr="in")
+    user__in = NumberInFilter(field_name="user", lookup_expr="in")
+    cash_book__in = NumberInFilter(field_name="cash_book", lookup_expr="in")
+    campus = django_filters.NumberFilter(field_name="cash_book__campus")
+
+    amount_min = django_filters.NumberFilter(field_name="amount", lookup_expr="gte")
+    amount_max = django_filters.NumberFilter(field_name="amount", lookup_expr="lte")
+
+    party_name = django_filters.CharFilter(field_name="party_name", lookup_expr="iexact")
+    party_name__contains = django_filters.CharFilter(field_name="party_name", lookup_expr="icontains")
+    party_mobile_number = django_filters.CharFilter(field_name="party_mobile_number")
+    party_mobile_number__startswith = django_filters.CharFilter(
+        field_name="party_mobile_number", lookup_expr="startswith"
+    )
+    has_party = django_filters.BooleanFilter(method="filter_has_party")
+
+    class Meta:
+        model = Transaction
+        fields = ['transaction_type', 'category', 'payment_mode', 'cash_book', 'user', 'date']
+
+    def filter_date_range(self, queryset, name, value):
+        date_from, date_to = ledger.resolve_date_range({"date_range": value})
+        return queryset.filter(date__range=[date_from, date_to])
+
+    def filter_has_party(self, queryset, name, value):
+        no_party = Q(party_name__isnull=True) | Q(party_name__exact="")
+        return queryset.exclude(no_party) if value else queryset.filter(no_party)
+
+
+class CategoryFilter(django_filters.FilterSet):
+    """
+    `?cash_book=<id>`: the categories that can be used in that cash book,
+    i.e. those linked to it plus those not limited to any cash book.
+    """
+    cash_book = django_filters.NumberFilter(method="filter_cash_book")
+
+    class Meta:
+        model = Category
+        fields = ['is_active']
+
+    def filter_cash_book(self, queryset, name, value):
+        # Both subqueries read the M2M through table by its indexed columns
+        through = Category.cash_books.through
+        linked = through.objects.filter(cashbook_id=value).values("category_id")
+        limited = Exists(through.objects.filter(category_id=OuterRef("pk")))
+        return queryset.filter(Q(id__in=linked) | ~limited)
+
+
+class TransactionSearchFilter(filters.SearchFilter):
+    """
+    `?search=` over remarks, party name and party mobile, answered from the
+    search indexes (see transactions.search) instead of a LIKE scan.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return search.search(queryset, request.query_params.get(self.search_param, ""))
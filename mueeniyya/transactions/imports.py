@@ -0,0 +1,277 @@
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+from openpyxl import load_workbook
+
+from . import balances, category_totals, parties, search, sync
+from .models import CashBook, Category, PaymentMode, Transaction
+
+BATCH_SIZE = 1000
+# Error report is cut off after this many rows
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ("csv", "xlsx", "json")
+DATE_FORMATS = ("%Y-%m-%d", "%d:%m:%Y", "%d-%m-%Y", "%d/%m/%Y")
+TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%I:%M %p")
+TRANSACTION_TYPES = {"in": "IN", "cash in": "IN", "out": "OUT", "cash out": "OUT"}
+MAX_AMOUNT = Decimal("9999999999.99")
+
+
+def detect_format(filename, content_type=""):
+    name = (filename or "").lower()
+    for format_ in IMPORT_FORMATS:
+        if name.endswith(f".{format_}"):
+            return format_
+    if "json" in content_type:
+        return "json"
+    if "spreadsheetml" in content_type:
+        return "xlsx"
+    if "csv" in content_type:
+        return "csv"
+    return None
+
+
+def read_rows(file, format_):
+    """
+    Yields one dict per data row. CSV and XLSX are read incrementally, so
+    the upload is never held in memory as a whole.
+    """
+    if format_ == "csv":
+        yield from csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    elif format_ == "xlsx":
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or "").strip() for cell in next(rows, ())]
+        for values in rows:
+            if any(value not in (None, "") for value in values):
+                yield dict(zip(header, values))
+        workbook.close()
+    elif format_ == "json":
+        data = json.load(file)
+        if not isinstance(data, list):
+            raise ValueError("JSON imports must be an array of objects")
+        yield from data
+    else:
+        raise ValueError(f"Unknown import format: {format_}")
+
+
+class LookupTable:
+    """
+    Maps ids and case-insensitive names to primary keys, loaded once per
+    import.
+    """
+
+    def __init__(self, queryset):
+        self.ids = set()
+        self.names = {}
+        for pk, name in queryset.values_list("id", "name"):
+            self.ids.add(pk)
+            self.names[name.strip().lower()] = pk
+
+    def resolve(self, value):
+        if value in (None, ""):
+            return None
+        text = str(value).strip()
+        if text.isdigit() and int(text) in self.ids:
+            return int(text)
+        return self.names.get(text.lower())
+
+
+class TransactionImporter:
+    """
+    Validates rows in batches against lookups resolved once for the whole
+    import, then inserts the valid rows with bulk_create.
+
+    Derived data that the Transaction signals normally maintain is updated
+    in bulk: search tokens per batch, daily balances, monthly category
+    totals and the Party directory once per import.
+    """
+
+    def __init__(self, user, user_scope, batch_size=BATCH_SIZE):
+        self.user = user
+        self.scope = user_scope
+        self.batch_size = batch_size
+        self.categories = LookupTable(Category.objects.all())
+        self.modes = LookupTable(PaymentMode.objects.all())
+        self.cash_books = LookupTable(CashBook.objects.all())
+
+        self.valid = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.cash_book_ids = set()
+        self.created_ids = []
+        self.party_uses = {}
+
+    def run(self, rows, dry_run=False):
+        """
+        Imports `rows` (an iterable of dicts). Rows with errors are skipped
+        and reported; with `dry_run` nothing is written. Returns the report.
+        """
+        with db_transaction.atomic():
+            batch = []
+            for number, row in enumerate(rows, 1):
+                batch.append((number, row))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch, dry_run)
+                    batch = []
+            self._import_batch(batch, dry_run)
+
+            if self.cash_book_ids and not dry_run:
+                balances.rebuild(self.cash_book_ids)
+                category_totals.rebuild(self.cash_book_ids)
+                parties.apply_uses(self.party_uses)
+            # last, so the sync feed sees times close to the commit
+            sync.restamp(self.created_ids)
+
+        return {
+            "valid": self.valid,
+            "created": self.created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "dry_run": dry_run,
+        }
+
+    def _import_batch(self, batch, dry_run):
+        valid = []
+        for number, row in batch:
+            txn, errors = self.build(row)
+            if errors:
+                self.error_count += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({"row": number, "errors": errors})
+            else:
+                valid.append(txn)
+
+        self.valid += len(valid)
+        if dry_run or not valid:
+            return
+
+        created = Transaction.objects.bulk_create(valid)
+        search.index_transactions(created)
+        parties.collect_uses(created, self.party_uses)
+        self.cash_book_ids.update(txn.cash_book_id for txn in created)
+        self.created_ids.extend(txn.id for txn in created)
+        self.created += len(created)
+
+    def build(self, row):
+        """
+        Returns (Transaction, None) for a valid row or (None, errors) with
+        one message per invalid column.
+        """
+        if not isinstance(row, dict):
+            return None, {"row": "Expected an object with transaction columns."}
+        row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+        errors = {}
+
+        date = _parse_date(row.get("date"))
+        if date is None:
+            errors["date"] = "Enter a date as YYYY-MM-DD or DD:MM:YYYY."
+        time = _parse_time(row.get("time"))
+        if time is None:
+            errors["time"] = "Enter a time as HH:MM."
+
+        transaction_type = TRANSACTION_TYPES.get(str(row.get("transaction_type") or "").strip().lower())
+        if transaction_type is None:
+            errors["transaction_type"] = "Use IN or OUT."
+
+        amount = _parse_amount(row.get("amount"))
+        if amount is None:
+            errors["amount"] = "Enter a positive amount with at most 2 decimal places."
+
+        category_id = self.categories.resolve(row.get("category"))
+        if category_id is None:
+            errors["category"] = "Unknown category."
+        payment_mode_id = self.modes.resolve(row.get("payment_mode"))
+        if payment_mode_id is None:
+            errors["payment_mode"] = "Unknown payment mode."
+
+        cash_book_id = self.cash_books.resolve(row.get("cash_book"))
+        if cash_book_id is None:
+            errors["cash_book"] = "Unknown cash book."
+        elif not self.scope.allows_cash_book(cash_book_id):
+            errors["cash_book"] = "You are not allowed to add transactions for this campus."
+
+        party_name = _text(row.get("party_name"))
+        party_mobile_number = _text(row.get("party_mobile_number"))
+        if party_name and len(party_name) > 100:
+            errors["party_name"] = "At most 100 characters."
+        if party_mobile_number and len(party_mobile_number) > 15:
+            errors["party_mobile_number"] = "At most 15 characters."
+
+        if errors:
+            return None, errors
+        return Transaction(
+            user=self.user,
+            transaction_type=transaction_type,
+            category_id=category_id,
+            payment_mode_id=payment_mode_id,
+            cash_book_id=cash_book_id,
+            date=date,
+            time=time,
+            amount=amount,
+            remarks=_text(row.get("remarks")),
+            party_name=party_name,
+            party_mobile_number=party_mobile_number,
+        ), None
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # mobile numbers read from spreadsheets
+    text = str(value).strip()
+    return text or None
+
+
+def _parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = str(value or "").strip()
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        pass
+    for format_ in DATE_FORMATS[1:]:
+        try:
+            return datetime.datetime.strptime(text, format_).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_time(value):
+    if isinstance(value, datetime.datetime):
+        return value.time()
+    if isinstance(value, datetime.time):
+        return value
+    text = str(value or "").strip()
+    try:
+        return datetime.time.fromisoformat(text)
+    except ValueError:
+        pass
+    for format_ in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, format_).time()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value):
+    if value in (None, "") or isinstance(value, bool):
+        return None
+    try:
+        amount = Decimal(str(value).strip().replace(",", ""))
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or amount <= 0 or amount > MAX_AMOUNT or amount != amount.quantize(Decimal("0.01")):
+        return None
+    return amount.quantize(Decimal("0.01"))
@@ -0,0 +1,107 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+
+from .models import CashBook, DailyCashBookBalance, MonthlyCategoryTotal, OpeningBalance
+
+ZERO = Decimal("0.00")
+TOP_CATEGORIES = 5
+KPI_FIELDS = ("today_in", "today_out", "month_in", "month_out", "balance")
+
+
+def dashboard(user_scope, campus_id=None, today=None, top=TOP_CATEGORIES):
+    """
+    Dashboard figures for the cash books `user_scope` can see (optionally of
+    one campus): today's and this month's Cash In / Cash Out and the balance
+    to date, per cash book, per campus and overall, plus the month's top
+    categories.
+
+    Everything is read from DailyCashBookBalance, MonthlyCategoryTotal and
+    OpeningBalance, so the cost does not depend on the number of
+    transactions: five queries whatever the data size.
+    """
+    today = today or datetime.date.today()
+    month_start = today.replace(day=1)
+
+    books = CashBook.objects.all()
+    if not user_scope.is_admin:
+        books = books.filter(id__in=user_scope.cash_book_ids)
+    if campus_id is not None:
+        books = books.filter(campus_id=campus_id)
+
+    latest = (
+        DailyCashBookBalance.objects.filter(cash_book=OuterRef("pk"), date__lte=today)
+        .order_by("-date")
+        .values("closing_balance")[:1]
+    )
+    book_rows = list(
+        books.order_by("campus__name", "name")
+        .annotate(closing=Subquery(latest), campus_name=F("campus__name"))
+        .values("id", "name", "campus_id", "campus_name", "closing")
+    )
+    book_ids = [book["id"] for book in book_rows]
+
+    month = {
+        row["cash_book_id"]: row
+        for row in DailyCashBookBalance.objects.filter(
+            cash_book_id__in=book_ids, date__range=[month_start, today]
+        ).order_by().values("cash_book_id").annotate(
+            month_in=Sum("total_in"),
+            month_out=Sum("total_out"),
+            today_in=Sum("total_in", filter=Q(date=today)),
+            today_out=Sum("total_out", filter=Q(date=today)),
+        )
+    }
+    opening = dict(
+        OpeningBalance.objects.filter(cash_book_id__in=book_ids).order_by()
+        .values("cash_book_id").annotate(total=Sum("amount")).values_list("cash_book_id", "total")
+    )
+
+    totals = _empty()
+    campuses = {}
+    for book in book_rows:
+        figures = month.get(book["id"], {})
+        entry = {
+            "id": book["id"],
+            "name": book["name"],
+            "campus_id": book["campus_id"],
+            **{field: figures.get(field) or ZERO for field in KPI_FIELDS[:4]},
+            "balance": (opening.get(book["id"]) or ZERO) + (book["closing"] or ZERO),
+        }
+
+        campus = campuses.setdefault(book["campus_id"], {
+            "id": book["campus_id"], "name": book["campus_name"], **_empty(), "cash_books": [],
+        })
+        campus["cash_books"].append(entry)
+        for field in KPI_FIELDS:
+            campus[field] += entry[field]
+            totals[field] += entry[field]
+
+    return {
+        "date": today,
+        "month_start": month_start,
+        "totals": totals,
+        "campuses": list(campuses.values()),
+        "top_categories": top_categories(book_ids, month_start, top),
+    }
+
+
+def top_categories(cash_book_ids, month, top=TOP_CATEGORIES):
+    """
+    The `top` categories of `month` by Cash In plus Cash Out over the given
+    cash books.
+    """
+    return list(
+        MonthlyCategoryTotal.objects.filter(month=month, cash_book_id__in=cash_book_ids)
+        .order_by()
+        .values("category_id", category_name=F("category__name"))
+        .annotate(total_in=Sum("total_in"), total_out=Sum("total_out"), count=Sum("count"))
+        .annotate(total=F("total_in") + F("total_out"))
+        .filter(count__gt=0)
+        .order_by("-total", "category_name")[:top]
+    )
+
+
+def _empty():
+    return {field: ZERO for field in KPI_FIELDS}
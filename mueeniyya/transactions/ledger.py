@@ -0,0 +1,168 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+
+from . import balances
+
+AMOUNT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Decimal("0.00")
+
+# Relative ranges accepted by `date_range`
+NAMED_DATE_RANGES = ("today", "yesterday", "this_month", "last_month")
+
+
+def signed_amount():
+    """
+    Expression that yields +amount for Cash In and -amount for Cash Out.
+    """
+    return Case(
+        When(transaction_type="IN", then=F("amount")),
+        When(transaction_type="OUT", then=-F("amount")),
+        default=Value(ZERO),
+        output_field=AMOUNT_FIELD,
+    )
+
+
+def resolve_date_range(params, today=None):
+    """
+    Returns (date_from, date_to) from request params: the bounds the
+    TransactionFilter date filters select, i.e. the intersection of a
+    named `date_range` (today, yesterday, this_month, last_month), explicit
+    `date_from` / `date_to` and an exact `date`, all in YYYY-MM-DD format.
+    Either bound may be None.
+    """
+    today = today or datetime.date.today()
+    named = (params.get("date_range") or "").lower()
+    exact = _parse_date(params.get("date"))
+
+    bounds = [(_parse_date(params.get("date_from")), _parse_date(params.get("date_to"))), (exact, exact)]
+    if named == "today":
+        bounds.append((today, today))
+    elif named == "yesterday":
+        yesterday = today - datetime.timedelta(days=1)
+        bounds.append((yesterday, yesterday))
+    elif named == "this_month":
+        bounds.append((today.replace(day=1), today))
+    elif named == "last_month":
+        last_month_end = today.replace(day=1) - datetime.timedelta(days=1)
+        bounds.append((last_month_end.replace(day=1), last_month_end))
+
+    lower = [date_from for date_from, _ in bounds if date_from]
+    upper = [date_to for _, date_to in bounds if date_to]
+    return max(lower, default=None), min(upper, default=None)
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def opening_balance(cash_book_ids=None, before=None):
+    """
+    Balance carried into the ledger: the cash books' OpeningBalance amounts
+    plus the net of every transaction dated before `before`, read from the
+    daily balance snapshots. No transaction rows are loaded.
+    """
+    return balances.carried_balance(cash_book_ids, before)
+
+
+def with_running_balance(queryset, opening=ZERO):
+    """
+    Annotates each row with `running_balance`, computed by a window function
+    over the whole filtered queryset in chronological order. Rows come back
+    latest first, so a sliced page still carries the correct balance.
+    """
+    return queryset.annotate(
+        running_balance=Window(
+            expression=Sum(signed_amount()),
+            order_by=[F("date").asc(), F("time").asc(), F("id").asc()],
+        ) + Value(opening, output_field=AMOUNT_FIELD),
+    ).order_by("-date", "-time", "-id")
+
+
+def totals(queryset):
+    """
+    Cash In / Cash Out totals for the filtered queryset in a single query.
+    """
+    return queryset.order_by().aggregate(
+        total_in=Coalesce(Sum("amount", filter=Q(transaction_type="IN")), Value(ZERO), output_field=AMOUNT_FIELD),
+        total_out=Coalesce(Sum("amount", filter=Q(transaction_type="OUT")), Value(ZERO), output_field=AMOUNT_FIELD),
+    )
+
+
+
+# group name -> (id column, label column)
+SUMMARY_GROUPS = {
+    "cash_book": ("cash_book_id", "cash_book__name"),
+    "category": ("category_id", "category__name"),
+    "payment_mode": ("payment_mode_id", "payment_mode__name"),
+    "user": ("user_id", "user__name"),
+    "day": ("date", None),
+}
+
+
+def parse_group_by(value):
+    """
+    Accepts a comma separated string or a list of group names and returns
+    the known ones in request order. Raises ValueError for unknown names.
+    """
+    if not value:
+        return []
+    names = value.split(",") if isinstance(value, str) else list(value)
+    names = [name.strip() for name in names if name and name.strip()]
+    unknown = [name for name in names if name not in SUMMARY_GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown group_by value(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def summary(queryset, group_by=()):
+    """
+    Cash In / Cash Out sums and counts for the filtered queryset, optionally
+    grouped by any of SUMMARY_GROUPS. Everything is computed by one
+    GROUP BY query; the overall totals are added up from the grouped rows.
+    """
+    metrics = {
+        "total_in": Coalesce(Sum("amount", filter=Q(transaction_type="IN")), Value(ZERO), output_field=AMOUNT_FIELD),
+        "total_out": Coalesce(Sum("amount", filter=Q(transaction_type="OUT")), Value(ZERO), output_field=AMOUNT_FIELD),
+        "count_in": Count("id", filter=Q(transaction_type="IN")),
+        "count_out": Count("id", filter=Q(transaction_type="OUT")),
+    }
+    queryset = queryset.order_by()
+
+    if not group_by:
+        totals = queryset.aggregate(**metrics)
+        return {"totals": _with_net(totals), "groups": []}
+
+    columns = []
+    for name in group_by:
+        columns.extend(column for column in SUMMARY_GROUPS[name] if column)
+    rows = queryset.values(*columns).annotate(**metrics).order_by(*columns)
+
+    groups = []
+    totals = {"total_in": ZERO, "total_out": ZERO, "count_in": 0, "count_out": 0}
+    for row in rows:
+        group = {}
+        for name in group_by:
+            id_column, label_column = SUMMARY_GROUPS[name]
+            group[name] = row[id_column]
+            if label_column:
+                group[f"{name}_name"] = row[label_column]
+        for key in totals:
+            group[key] = row[key]
+            totals[key] += row[key]
+        groups.append(_with_net(group))
+
+    return {"totals": _with_net(totals), "groups": groups}
+
+
+def _with_net(values):
+    values["net"] = values["total_in"] - values["total_out"]
+    values["count"] = values["count_in"] + values["count_out"]
+    return values
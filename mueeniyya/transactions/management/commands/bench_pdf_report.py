@@ -0,0 +1,73 @@
+import datetime
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from transactions.pdf_report import PdfReportEngine
+
+
+def synthetic_rows(count):
+    """
+    Yields report rows shaped like reports.iter_report_rows without
+    touching the database, so the benchmark measures the engine alone.
+    """
+    balance = Decimal("0.00")
+    start = datetime.date(2024, 1, 1)
+    for i in range(count):
+        transaction_type = "IN" if i % 3 else "OUT"
+        amount = Decimal(100 + i % 900) + Decimal("0.50")
+        balance += amount if transaction_type == "IN" else -amount
+        yield {
+            "date": start + datetime.timedelta(days=i // 200),
+            "time": datetime.time(9 + i % 8, i % 60),
+            "remarks": f"Entry {i} for monthly fee collection and misc charges",
+            "user__name": "Staff User",
+            "party_name": f"Party {i % 500}",
+            "party_mobile_number": f"9{i % 1000000000:09d}",
+            "category__name": "Tuition Fees",
+            "payment_mode__name": "Cash",
+            "transaction_type": transaction_type,
+            "amount": amount,
+            "running_balance": balance,
+        }
+
+
+class CountingFile:
+    """Write-only sink that discards bytes, so file I/O does not skew results."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+class Command(BaseCommand):
+    help = "Benchmarks PDF report rendering time and peak Python memory for growing row counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[1000, 10000, 100000],
+            help="Row counts to render (default: 1000 10000 100000).",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>10} {'pages':>7} {'seconds':>9} {'peak MB':>9} {'pdf MB':>8}")
+        for count in options["rows"]:
+            sink = CountingFile()
+            engine = PdfReportEngine(sink, ["Benchmark report"])
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            engine.render(synthetic_rows(count))
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"{count:>10} {engine.page_number:>7} {elapsed:>9.2f} "
+                f"{peak / 1024 / 1024:>9.1f} {sink.size / 1024 / 1024:>8.1f}"
+            )
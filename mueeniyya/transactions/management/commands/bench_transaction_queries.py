@@ -0,0 +1,175 @@
+import datetime
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.models import OffCampus, User
+from transactions import ledger, search
+from transactions.models import CashBook, Category, PaymentMode, Transaction
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds synthetic transactions inside a transaction, times the list, report and "
+        "parties queries without and with the Transaction indexes, then rolls everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000, help="Transactions to seed (default: 200000).")
+        parser.add_argument("--campuses", type=int, default=10, help="Campuses to spread rows over (default: 10).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is reported.")
+        parser.add_argument("--explain", action="store_true", help="Print the query plans with indexes.")
+        parser.add_argument("--force", action="store_true", help="Allow running when DEBUG is off.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Refusing to seed benchmark data with DEBUG off; pass --force to override.")
+
+        self.options = options
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"], options["campuses"])
+                self.run()
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Benchmark data rolled back.")
+
+    def seed(self, rows, campuses):
+        rng = random.Random(42)
+        stamp = int(time.time())
+        user = User.objects.create(mobile=f"bench{stamp}"[:15], name="Bench User")
+        campus_objs = [OffCampus.objects.create(name=f"Bench Campus {stamp}-{i}") for i in range(campuses)]
+        books = [
+            CashBook.objects.create(name=f"Bench Book {stamp}-{i}-{j}", campus=campus)
+            for i, campus in enumerate(campus_objs) for j in range(3)
+        ]
+        categories = [Category.objects.create(name=f"Bench Category {stamp}-{i}") for i in range(20)]
+        mode = PaymentMode.objects.create(name=f"Bench Mode {stamp}")
+        start = datetime.date.today() - datetime.timedelta(days=3 * 365)
+
+        self.stdout.write(f"Seeding {rows} transactions...")
+        batch = []
+        for i in range(rows):
+            has_party = rng.random() < 0.3
+            batch.append(Transaction(
+                user=user,
+                transaction_type="IN" if rng.random() < 0.6 else "OUT",
+                category=rng.choice(categories),
+                payment_mode=mode,
+                cash_book=rng.choice(books),
+                date=start + datetime.timedelta(days=rng.randrange(3 * 365)),
+                time=datetime.time(rng.randrange(8, 20), rng.randrange(60)),
+                amount=Decimal(rng.randrange(100, 100000)) / 100,
+                party_name=f"Party {rng.randrange(2000)}" if has_party else None,
+                party_mobile_number=f"9{rng.randrange(10 ** 9):09d}" if has_party else None,
+            ))
+            if len(batch) == 5000:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+        search.rebuild()
+
+        self.campus = campus_objs[0]
+        self.book = books[0]
+        self.categories = [category.id for category in categories[:3]]
+        self.user = user
+
+    def queries(self):
+        today = datetime.date.today()
+        campus_rows = Transaction.objects.filter(cash_book__campus=self.campus)
+        return {
+            "list (campus, latest 50)": lambda: list(campus_rows.order_by("-date", "-time")[:50]),
+            "list (all, latest 50)": lambda: list(Transaction.objects.order_by("-date", "-time")[:50]),
+            "ledger page (cash book)": lambda: list(ledger.with_running_balance(
+                Transaction.objects.filter(cash_book=self.book, date__gte=today - datetime.timedelta(days=90))
+            )[:50]),
+            "report (month, type, categories)": lambda: list(
+                Transaction.objects.filter(
+                    cash_book=self.book, transaction_type="IN",
+                    date__range=[today - datetime.timedelta(days=30), today],
+                    category_id__in=self.categories,
+                ).order_by("date", "time").values_list("id", "amount")
+            ),
+            "report (user, quarter)": lambda: list(
+                Transaction.objects.filter(
+                    user_id__in=[self.user.id], date__range=[today - datetime.timedelta(days=90), today],
+                ).order_by("date", "time").values_list("id", "amount")[:1000]
+            ),
+            "search (party word)": lambda: list(
+                search.search(Transaction.objects.all(), "party 1234").order_by("-date", "-time")[:50]
+            ),
+            "search (mobile digits)": lambda: list(
+                search.search(Transaction.objects.all(), "98765").order_by("-date", "-time")[:50]
+            ),
+            "parties (all)": lambda: list(
+                Transaction.objects.exclude(party_name__isnull=True).exclude(party_name__exact="")
+                .values_list("party_name", flat=True).distinct()
+            ),
+            "parties (campus)": lambda: (
+                list(campus_rows.exclude(party_name__isnull=True).exclude(party_name__exact="")
+                     .values_list("party_name", flat=True).distinct()),
+                list(campus_rows.exclude(party_mobile_number__isnull=True).exclude(party_mobile_number__exact="")
+                     .values_list("party_mobile_number", flat=True).distinct()),
+            ),
+        }
+
+    def time_queries(self):
+        results = {}
+        for name, run in self.queries().items():
+            run()  # warm up
+            samples = []
+            for _ in range(self.options["repeat"]):
+                started = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(samples)
+        return results
+
+    def run(self):
+        # Plain DDL statements rather than schema_editor(), which SQLite
+        # refuses to open inside the surrounding atomic block.
+        editor = connection.schema_editor()
+        indexes = Transaction._meta.indexes
+
+        self.run_ddl([f"DROP INDEX {connection.ops.quote_name(index.name)}" for index in indexes])
+        before = self.time_queries()
+
+        self.run_ddl([index.create_sql(Transaction, editor) for index in indexes])
+        after = self.time_queries()
+
+        self.stdout.write(f"\n{'query':<36} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            self.stdout.write(f"{name:<36} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>7.1f}x")
+
+        if self.options["explain"]:
+            self.explain()
+
+    def run_ddl(self, statements):
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(str(statement))
+            cursor.execute("ANALYZE")
+
+    def explain(self):
+        today = datetime.date.today()
+        plans = {
+            "list (campus)": Transaction.objects.filter(cash_book__campus=self.campus).order_by("-date", "-time")[:50],
+            "report": Transaction.objects.filter(
+                cash_book=self.book, transaction_type="IN",
+                date__range=[today - datetime.timedelta(days=30), today],
+            ).order_by("date", "time"),
+            "parties": Transaction.objects.exclude(party_name__isnull=True).exclude(party_name__exact="")
+            .values_list("party_name", flat=True).distinct(),
+        }
+        for name, queryset in plans.items():
+            self.stdout.write(f"\n-- {name}\n{queryset.explain()}")
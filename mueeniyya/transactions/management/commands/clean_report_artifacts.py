@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from transactions import report_jobs
+
+
+class Command(BaseCommand):
+    help = "Deletes rendered report files older than REPORT_ARTIFACT_TTL_SECONDS (run_report_worker also does this)."
+
+    def handle(self, *args, **options):
+        count = report_jobs.delete_expired_artifacts()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} expired report files."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from transactions import balances
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the DailyCashBookBalance snapshots from the Transaction table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cash-book", type=int, action="append", dest="cash_books",
+            help="Only rebuild the given cash book id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        count = balances.rebuild(options["cash_books"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily balance rows."))
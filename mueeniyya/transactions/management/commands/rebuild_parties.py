@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from transactions import parties
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the Party directory (usage counts and last used dates) from the Transaction table."
+
+    def handle(self, *args, **options):
+        count = parties.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} parties."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from transactions import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the TransactionSearchToken table (only used on databases without pg_trgm)."
+
+    def handle(self, *args, **options):
+        if not search.uses_token_index():
+            self.stdout.write("PostgreSQL searches through its trigram indexes; nothing to rebuild.")
+            return
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} search tokens."))
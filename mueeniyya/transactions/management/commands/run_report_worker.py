@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from transactions import report_jobs
+
+
+# Seconds between sweeps of expired report files
+CLEANUP_INTERVAL = 10 * 60
+
+
+class Command(BaseCommand):
+    help = "Processes queued report jobs from the database queue and deletes expired report files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        next_cleanup = 0
+        while True:
+            close_old_connections()
+            if time.monotonic() >= next_cleanup:
+                report_jobs.delete_expired_artifacts()
+                next_cleanup = time.monotonic() + CLEANUP_INTERVAL
+
+            job = report_jobs.claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+                continue
+
+            job = report_jobs.run_job(job)
+            self.stdout.write(f"Report job #{job.pk}: {job.status} ({job.row_count or 0} rows)")
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_cashbook'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Party',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('mobile_number', models.CharField(blank=True, max_length=15, null=True)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='openingbalance',
+            name='campus',
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='campus',
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='cash_books',
+            field=models.ManyToManyField(blank=True, related_name='categories', to='transactions.cashbook'),
+        ),
+        migrations.AddField(
+            model_name='openingbalance',
+            name='cash_book',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='transactions.cashbook'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='cash_book',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='transactions.cashbook'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='party_mobile_number',
+            field=models.CharField(blank=True, max_length=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='party_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:28
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def populate_daily_balances(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    DailyCashBookBalance = apps.get_model('transactions', 'DailyCashBookBalance')
+
+    days = (
+        Transaction.objects.filter(cash_book__isnull=False)
+        .order_by('cash_book_id', 'date')
+        .values('cash_book_id', 'date')
+        .annotate(
+            total_in=Sum('amount', filter=Q(transaction_type='IN')),
+            total_out=Sum('amount', filter=Q(transaction_type='OUT')),
+        )
+    )
+    rows = []
+    current_book, closing = None, Decimal('0.00')
+    for day in days:
+        if day['cash_book_id'] != current_book:
+            current_book, closing = day['cash_book_id'], Decimal('0.00')
+        total_in = day['total_in'] or Decimal('0.00')
+        total_out = day['total_out'] or Decimal('0.00')
+        closing += total_in - total_out
+        rows.append(DailyCashBookBalance(
+            cash_book_id=day['cash_book_id'], date=day['date'],
+            total_in=total_in, total_out=total_out, closing_balance=closing,
+        ))
+    DailyCashBookBalance.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_catch_up'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCashBookBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_in', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_out', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('closing_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cash_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='transactions.cashbook')),
+            ],
+            options={
+                'ordering': ['cash_book', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('cash_book', 'date'), name='unique_daily_cash_book_balance')],
+            },
+        ),
+        migrations.RunPython(populate_daily_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_reportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date', 'time'], name='txn_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['cash_book', 'date', 'time'], name='txn_book_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['cash_book', 'transaction_type', 'date'], name='txn_book_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['category', 'date'], name='txn_category_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date'], name='txn_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('party_name__isnull', False), models.Q(('party_name', ''), _negated=True)), fields=['party_name'], name='txn_party_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('party_mobile_number__isnull', False), models.Q(('party_mobile_number', ''), _negated=True)), fields=['party_mobile_number'], name='txn_party_mobile_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:50
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEARCH_FIELDS = ('remarks', 'party_name', 'party_mobile_number')
+
+# Trigram indexes serve ILIKE '%term%' on remarks and party names, the
+# pattern-ops index serves LIKE 'term%' on mobile numbers.
+POSTGRES_INDEXES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS txn_remarks_trgm_idx ON transactions_transaction '
+    'USING gin (remarks gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS txn_party_name_trgm_idx ON transactions_transaction '
+    'USING gin (party_name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS txn_party_mobile_prefix_idx ON transactions_transaction '
+    '(party_mobile_number varchar_pattern_ops)',
+]
+POSTGRES_DROP_INDEXES = [
+    'DROP INDEX IF EXISTS txn_remarks_trgm_idx',
+    'DROP INDEX IF EXISTS txn_party_name_trgm_idx',
+    'DROP INDEX IF EXISTS txn_party_mobile_prefix_idx',
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for statement in POSTGRES_INDEXES:
+            schema_editor.execute(statement)
+        return
+
+    Transaction = apps.get_model('transactions', 'Transaction')
+    TransactionSearchToken = apps.get_model('transactions', 'TransactionSearchToken')
+    rows = []
+    for txn in Transaction.objects.only('id', *SEARCH_FIELDS).iterator(chunk_size=2000):
+        tokens = set()
+        for field in SEARCH_FIELDS:
+            tokens |= {token[:64] for token in re.findall(r'\w+', (getattr(txn, field) or '').lower())}
+        rows.extend(TransactionSearchToken(transaction_id=txn.id, token=token) for token in tokens)
+    TransactionSearchToken.objects.bulk_create(rows, batch_size=2000)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_DROP_INDEXES:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='transactions.transaction')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'transaction'], name='txn_search_token_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
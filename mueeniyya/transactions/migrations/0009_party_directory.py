@@ -0,0 +1,83 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def populate_parties(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    Party = apps.get_model('transactions', 'Party')
+
+    merged = {}
+    groups = (
+        Transaction.objects.exclude(party_name__isnull=True, party_mobile_number__isnull=True)
+        .order_by()
+        .values('cash_book__campus_id', 'party_name', 'party_mobile_number')
+        .annotate(uses=Count('id'), last_used=Max('date'))
+    )
+    for group in groups:
+        name = (group['party_name'] or '').strip()
+        mobile = (group['party_mobile_number'] or '').strip()
+        if not name and not mobile:
+            continue
+        campus_id = group['cash_book__campus_id']
+        key = f"{campus_id or 0}|{name.lower()}|{mobile}"
+        if key in merged:
+            merged[key].usage_count += group['uses']
+            merged[key].last_used = max(merged[key].last_used, group['last_used'])
+            continue
+        merged[key] = Party(
+            key=key, campus_id=campus_id, name=name, name_key=name.lower(),
+            mobile_number=mobile or None, usage_count=group['uses'], last_used=group['last_used'],
+        )
+    Party.objects.bulk_create(merged.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_email'),
+        ('transactions', '0008_transactionsearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='party',
+            name='campus',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='parties', to='accounts.offcampus'),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='key',
+            field=models.CharField(max_length=200, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='last_used',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='name_key',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['campus', 'name_key'], name='party_campus_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['campus', 'mobile_number'], name='party_campus_mobile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['-usage_count', 'name_key'], name='party_usage_idx'),
+        ),
+        migrations.RunPython(populate_parties, migrations.RunPython.noop),
+    ]
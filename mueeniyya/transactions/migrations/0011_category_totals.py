@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def populate_category_totals(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyCategoryTotal = apps.get_model('transactions', 'MonthlyCategoryTotal')
+
+    months = (
+        Transaction.objects.filter(cash_book__isnull=False, category__isnull=False)
+        .order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('cash_book_id', 'category_id', 'month')
+        .annotate(
+            total_in=Coalesce(Sum('amount', filter=Q(transaction_type='IN')), Value(0), output_field=models.DecimalField()),
+            total_out=Coalesce(Sum('amount', filter=Q(transaction_type='OUT')), Value(0), output_field=models.DecimalField()),
+            count=Count('id'),
+        )
+    )
+    MonthlyCategoryTotal.objects.bulk_create(
+        (MonthlyCategoryTotal(**month) for month in months.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0010_sync_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('total_in', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_out', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('cash_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_totals', to='transactions.cashbook')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to='transactions.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'cash_book'], name='category_total_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cash_book', 'category', 'month'), name='unique_monthly_category_total')],
+            },
+        ),
+        migrations.RunPython(populate_category_totals, migrations.RunPython.noop),
+    ]
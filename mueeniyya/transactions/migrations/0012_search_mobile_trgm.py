@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Search matches every field anywhere (a case-insensitive regex on
+# PostgreSQL), which the pattern-ops index on mobile numbers cannot serve;
+# a trigram index can, like the ones on remarks and party names.
+POSTGRES_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS txn_party_mobile_trgm_idx ON transactions_transaction '
+    'USING gin (party_mobile_number gin_trgm_ops)',
+    'DROP INDEX IF EXISTS txn_party_mobile_prefix_idx',
+]
+POSTGRES_DROP_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS txn_party_mobile_prefix_idx ON transactions_transaction '
+    '(party_mobile_number varchar_pattern_ops)',
+    'DROP INDEX IF EXISTS txn_party_mobile_trgm_idx',
+]
+
+
+def create_mobile_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_INDEXES:
+            schema_editor.execute(statement)
+
+
+def drop_mobile_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_DROP_INDEXES:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0011_category_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_mobile_trgm_index, drop_mobile_trgm_index),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Party autocomplete filters with LIKE 'prefix%'. Under a non-C collation
+# PostgreSQL only serves that from pattern-ops indexes.
+POSTGRES_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS party_campus_name_pattern_idx ON transactions_party '
+    '(campus_id, name_key varchar_pattern_ops)',
+    'CREATE INDEX IF NOT EXISTS party_campus_mobile_pattern_idx ON transactions_party '
+    '(campus_id, mobile_number varchar_pattern_ops)',
+]
+POSTGRES_DROP_INDEXES = [
+    'DROP INDEX IF EXISTS party_campus_name_pattern_idx',
+    'DROP INDEX IF EXISTS party_campus_mobile_pattern_idx',
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_INDEXES:
+            schema_editor.execute(statement)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_DROP_INDEXES:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0012_search_mobile_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
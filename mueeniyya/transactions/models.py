@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
 from django.conf import settings
 from accounts.models import OffCampus
 
@@ -42,8 +42,26 @@ class CashBook(models.Model):
         return f"{self.name} ({self.campus})" if self.campus else self.name
 
 class Party(models.Model):
+    """
+    Directory of parties seen on transactions, one row per campus, name and
+    mobile. Kept up to date by the Transaction signals (see
+    transactions.parties) and rebuilt with `rebuild_parties`.
+    """
+    campus = models.ForeignKey(OffCampus, on_delete=models.CASCADE, null=True, blank=True, related_name='parties')
     name = models.CharField(max_length=100)
     mobile_number = models.CharField(max_length=15, blank=True, null=True)
+    # lowercased name for prefix lookups, and campus|name|mobile identity
+    name_key = models.CharField(max_length=100, default='')
+    key = models.CharField(max_length=200, unique=True, null=True)
+    usage_count = models.PositiveIntegerField(default=0)
+    last_used = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['campus', 'name_key'], name='party_campus_name_idx'),
+            models.Index(fields=['campus', 'mobile_number'], name='party_campus_mobile_idx'),
+            models.Index(fields=['-usage_count', 'name_key'], name='party_usage_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.mobile_number})" if self.mobile_number else self.name
@@ -64,15 +82,74 @@ class Transaction(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     remarks = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     party_name = models.CharField(max_length=100, null=True, blank=True)
     party_mobile_number = models.CharField(max_length=15, null=True, blank=True)
 
     class Meta:
         ordering = ['-date', '-time']
+        indexes = [
+            # list / ledger pages ordered by -date, -time
+            models.Index(fields=['date', 'time'], name='txn_date_time_idx'),
+            models.Index(fields=['cash_book', 'date', 'time'], name='txn_book_date_time_idx'),
+            # report filters
+            models.Index(fields=['cash_book', 'transaction_type', 'date'], name='txn_book_type_date_idx'),
+            models.Index(fields=['category', 'date'], name='txn_category_date_idx'),
+            models.Index(fields=['user', 'date'], name='txn_user_date_idx'),
+            # sync change feed
+            models.Index(fields=['updated_at', 'id'], name='txn_updated_idx'),
+            # party dropdowns only look at rows that have a party
+            models.Index(
+                fields=['party_name'], name='txn_party_name_idx',
+                condition=models.Q(party_name__isnull=False) & ~models.Q(party_name=''),
+            ),
+            models.Index(
+                fields=['party_mobile_number'], name='txn_party_mobile_idx',
+                condition=models.Q(party_mobile_number__isnull=False) & ~models.Q(party_mobile_number=''),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.transaction_type} - {self.amount} ({self.date})"
 
+    def save(self, *args, **kwargs):
+        # The signal receivers that keep the snapshots, totals, parties and
+        # search tokens in step commit or roll back with the row itself
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+
+class TransactionTombstone(models.Model):
+    """
+    Records a deleted transaction so sync clients can drop their copy.
+    """
+    transaction_id = models.BigIntegerField()
+    cash_book_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='txn_tombstone_idx'),
+        ]
+
+    def __str__(self):
+        return f"Transaction {self.transaction_id} deleted {self.deleted_at}"
+
+class TransactionSearchToken(models.Model):
+    """
+    Inverted index over the searchable transaction fields, used when the
+    database has no trigram support (SQLite). See transactions.search.
+    """
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'transaction'], name='txn_search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} → {self.transaction_id}"
+
 class OpeningBalance(models.Model):
     cash_book = models.ForeignKey(CashBook, on_delete=models.CASCADE, blank=True, null=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -82,5 +159,82 @@ class OpeningBalance(models.Model):
     def __str__(self):
         return f"{self.cash_book} - {self.amount}"
 
+class DailyCashBookBalance(models.Model):
+    """
+    One row per cash book per day with transactions. `closing_balance` is the
+    running net of all transactions up to the end of that day; OpeningBalance
+    amounts are added on top when answering "balance as of" questions.
+    """
+    cash_book = models.ForeignKey(CashBook, on_delete=models.CASCADE, related_name='daily_balances')
+    date = models.DateField()
+    total_in = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_out = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    closing_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
+    class Meta:
+        ordering = ['cash_book', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['cash_book', 'date'], name='unique_daily_cash_book_balance'),
+        ]
+
+    def __str__(self):
+        return f"{self.cash_book} - {self.date}: {self.closing_balance}"
+
+class MonthlyCategoryTotal(models.Model):
+    """
+    Cash In / Cash Out totals and row counts per cash book, category and
+    month (`month` is the first day), kept up to date like
+    DailyCashBookBalance. Backs the dashboard's top categories.
+    """
+    cash_book = models.ForeignKey(CashBook, on_delete=models.CASCADE, related_name='category_totals')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='monthly_totals')
+    month = models.DateField()
+    total_in = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_out = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cash_book', 'category', 'month'], name='unique_monthly_category_total'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'cash_book'], name='category_total_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cash_book} - {self.category} ({self.month:%Y-%m})"
+
+class ReportJob(models.Model):
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+    STATUSES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    format = models.CharField(max_length=10)
+    filters = models.JSONField(default=dict)
+    filter_hash = models.CharField(max_length=64)
+    data_version = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING)
+    artifact = models.CharField(max_length=255, blank=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['filter_hash', 'data_version'], name='reportjob_lookup_idx'),
+            models.Index(fields=['status', 'created_at'], name='reportjob_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.format} report #{self.pk} ({self.status})"
@@ -0,0 +1,156 @@
+import base64
+import datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# cursor column -> parser of its encoded value
+CURSOR_TYPES = {
+    'date': datetime.date.fromisoformat,
+    'time': datetime.time.fromisoformat,
+    'amount': Decimal,
+    'id': int,
+}
+
+
+class LedgerPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class TransactionCursorPagination(BasePagination):
+    """
+    Keyset pagination over (date, time, id), newest first, or over
+    (amount, id) with `?ordering=amount` / `?ordering=-amount`.
+
+    Each page is fetched with a WHERE on the last row's position instead of
+    an OFFSET, so deep pages cost the same as the first one. Pagination is
+    opt-in: requests without `page_size` or `cursor` still get the full,
+    unpaginated list.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+    # ordering -> the columns its cursor is keyed on, most significant first
+    keysets = {
+        'date': ('date', 'time', 'id'),
+        'amount': ('amount', 'id'),
+    }
+    default_ordering = '-date'
+    # read from the last row, which may be a values() dict
+    position_fields = ('date', 'time', 'amount', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        descending = self.ordering.startswith('-')
+        columns = self.keysets[self.ordering.lstrip('-')]
+        position = self.decode_cursor(params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by(*(f"-{column}" if descending else column for column in columns))
+        if position:
+            queryset = queryset.filter(self.after(columns, position, descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_param) or self.default_ordering
+        if ordering.lstrip('-') not in self.keysets:
+            raise ValidationError({"error": f"Paginated lists can only be ordered by {', '.join(self.keysets)}."})
+        return ordering
+
+    def after(self, columns, position, descending):
+        """
+        Rows after `position` in the page order: a lexicographic comparison
+        on `columns` written as ORs the indexes can serve.
+        """
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for i, column in enumerate(columns):
+            equal = {earlier: position[earlier] for earlier in columns[:i]}
+            condition |= Q(**equal, **{f"{column}__{lookup}": position[column]})
+        return condition
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        columns = self.keysets[self.ordering.lstrip('-')]
+        if isinstance(last, dict):
+            return self.encode_cursor(self.ordering, [last[column] for column in columns])
+        return self.encode_cursor(self.ordering, [getattr(last, column) for column in columns])
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.get_next_cursor(),
+            'page_size': self.page_size,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def encode_cursor(self, ordering, values):
+        parts = [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values]
+        if ordering != self.default_ordering:
+            parts.insert(0, ordering)
+        return base64.urlsafe_b64encode('|'.join(parts).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        The position (column -> value) in `cursor`, which must have been
+        issued for the same ordering.
+        """
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            parts = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+            ordering = parts.pop(0) if parts[0].lstrip('-') in self.keysets else self.default_ordering
+            columns = self.keysets[ordering.lstrip('-')]
+            if ordering != self.ordering or len(parts) != len(columns):
+                raise ValueError(ordering)
+            return {column: CURSOR_TYPES[column](value) for column, value in zip(columns, parts)}
+        except (TypeError, ValueError, UnicodeDecodeError, ArithmeticError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,132 @@
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import CashBook, Party, Transaction
+
+
+def normalize(name, mobile):
+    return (name or "").strip(), (mobile or "").strip()
+
+
+def party_key(campus_id, name, mobile):
+    return f"{campus_id or 0}|{name.lower()}|{mobile}"
+
+
+def record(txn, sign=1):
+    """
+    Counts `txn` for (sign=1) or against (sign=-1) its party, creating the
+    directory entry on first use. Transactions without party details are
+    ignored. `last_used` only moves forward; it is exact again after a
+    rebuild.
+    """
+    apply_uses(collect_uses([txn]), sign)
+
+
+def collect_uses(txns, uses=None):
+    """
+    Tallies party uses of `txns` into `uses` (key -> entry) without writing,
+    so a bulk import can apply them once at the end.
+    """
+    uses = {} if uses is None else uses
+    book_ids = {txn.cash_book_id for txn in txns if txn.cash_book_id}
+    campus_by_book = dict(CashBook.objects.filter(id__in=book_ids).values_list("id", "campus_id")) if book_ids else {}
+
+    for txn in txns:
+        name, mobile = normalize(txn.party_name, txn.party_mobile_number)
+        if not name and not mobile:
+            continue
+        campus_id = campus_by_book.get(txn.cash_book_id)
+        key = party_key(campus_id, name, mobile)
+        entry = uses.setdefault(key, {"campus_id": campus_id, "name": name, "mobile": mobile, "count": 0, "last": txn.date})
+        entry["count"] += 1
+        entry["last"] = max(entry["last"], txn.date)
+    return uses
+
+
+def apply_uses(uses, sign=1):
+    """
+    Writes tallies from collect_uses(): missing parties are created in one
+    bulk insert, then each party gets a single counter update. With
+    sign=-1 the tallies are taken away instead (rows deleted or moved).
+    """
+    if not uses:
+        return
+    if sign < 0:
+        for key, entry in uses.items():
+            Party.objects.filter(key=key).update(
+                usage_count=Greatest(F("usage_count") - entry["count"], Value(0))
+            )
+        return
+
+    Party.objects.bulk_create(
+        [
+            Party(key=key, campus_id=entry["campus_id"], name=entry["name"], name_key=entry["name"].lower(),
+                  mobile_number=entry["mobile"] or None)
+            for key, entry in uses.items()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    for key, entry in uses.items():
+        last = Value(entry["last"])
+        Party.objects.filter(key=key).update(
+            usage_count=F("usage_count") + entry["count"],
+            last_used=Greatest(Coalesce("last_used", last), last),
+        )
+
+
+def rebuild():
+    """
+    Recreates the directory from the Transaction table in one grouped
+    query. Returns the number of parties.
+    """
+    merged = {}
+    groups = (
+        Transaction.objects.exclude(party_name__isnull=True, party_mobile_number__isnull=True)
+        .order_by()
+        .values("cash_book__campus_id", "party_name", "party_mobile_number")
+        .annotate(uses=Count("id"), last_used=Max("date"))
+    )
+    for group in groups:
+        name, mobile = normalize(group["party_name"], group["party_mobile_number"])
+        if not name and not mobile:
+            continue
+        key = party_key(group["cash_book__campus_id"], name, mobile)
+        party = merged.get(key)
+        if party is None:
+            merged[key] = Party(
+                key=key, campus_id=group["cash_book__campus_id"], name=name, name_key=name.lower(),
+                mobile_number=mobile or None, usage_count=group["uses"], last_used=group["last_used"],
+            )
+        else:
+            party.usage_count += group["uses"]
+            party.last_used = max(party.last_used, group["last_used"])
+
+    Party.objects.all().delete()
+    Party.objects.bulk_create(merged.values(), batch_size=1000)
+    return len(merged)
+
+
+def autocomplete(user_scope, prefix="", field="name"):
+    """
+    Visible parties whose name (or mobile, with field="mobile") starts with
+    `prefix`, most used first. Entries for the same party on several
+    campuses are merged.
+    """
+    parties = Party.objects.filter(usage_count__gt=0)
+    if not user_scope.is_admin:
+        parties = parties.filter(campus_id__in=user_scope.campus_ids)
+
+    prefix = prefix.strip()
+    if prefix:
+        column = "mobile_number" if field == "mobile" else "name_key"
+        value = prefix if field == "mobile" else prefix.lower()
+        # LIKE 'value%', served on PostgreSQL by the pattern-ops indexes of
+        # migration 0013 whatever the database collation
+        parties = parties.filter(**{f"{column}__startswith": value})
+
+    return (
+        parties.values("name_key", "mobile_number")
+        .annotate(name=Max("name"), usage_count=Sum("usage_count"), last_used=Max("last_used"))
+        .order_by("-usage_count", "name_key", "mobile_number")
+    )
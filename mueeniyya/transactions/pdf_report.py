@@ -0,0 +1,253 @@
+import zlib
+from decimal import Decimal
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 8
+ROW_HEIGHT = 13
+MARGIN = 30
+
+# (header, relative width, alignment)
+COLUMNS = [
+    ("Sl. No.", 5, "right"),
+    ("Date & Time", 10, "left"),
+    ("Remarks", 19, "left"),
+    ("Party", 14, "left"),
+    ("Category", 10, "left"),
+    ("Mode", 7, "left"),
+    ("User", 9, "left"),
+    ("Cash In", 8, "right"),
+    ("Cash Out", 8, "right"),
+    ("Balance", 10, "right"),
+]
+
+ZERO = Decimal("0.00")
+
+
+class PdfStreamWriter:
+    """
+    Minimal PDF writer that flushes each page to `file` as soon as it is
+    finished. Only object offsets are kept until the end, unlike a reportlab
+    canvas which holds every page in memory until save().
+
+    Text uses the standard Helvetica fonts with WinAnsi encoding.
+    """
+
+    FONTS = {FONT: b"F1", FONT_BOLD: b"F2"}
+
+    def __init__(self, file, pagesize):
+        self.file = file
+        self.width, self.height = pagesize
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 5  # 1: catalog, 2: page tree, 3-4: fonts
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for font, object_id in ((FONT, 3), (FONT_BOLD, 4)):
+            self._write_object(object_id, (
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /" + font.encode()
+                + b" /Encoding /WinAnsiEncoding >>"
+            ))
+        self.begin_page()
+
+    def begin_page(self):
+        self.ops = [b"BT"]
+        self.graphics = []
+
+    def set_font(self, font, size):
+        self.ops.append(b"/%s %d Tf" % (self.FONTS[font], size))
+
+    def text(self, x, y, text):
+        self.ops.append(b"1 0 0 1 %.2f %.2f Tm (%s) Tj" % (x, y, _escape(text)))
+
+    def line(self, x1, y1, x2, y2):
+        self.graphics.append(b"%.2f %.2f m %.2f %.2f l S" % (x1, y1, x2, y2))
+
+    def end_page(self):
+        self.ops.append(b"ET")
+        content = zlib.compress(b"\n".join(self.graphics + self.ops))
+
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self._write_object(content_id, (
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content)
+            + content + b"\nendstream"
+        ))
+        self._write_object(page_id, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>"
+            % (self.width, self.height, content_id)
+        ))
+        self.page_ids.append(page_id)
+        self.begin_page()
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        self._write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_position = self.position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % self.next_id)
+        for object_id in range(1, self.next_id):
+            self._write(b"%010d 00000 n \n" % self.offsets[object_id])
+        self._write(
+            b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.next_id, xref_position)
+        )
+
+    def _write_object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        self._write(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    def _write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+
+def _escape(text):
+    data = text.encode("cp1252", "replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class PdfReportEngine:
+    """
+    Renders report rows onto a multi-page PDF one row at a time.
+
+    Column positions and per-column text limits are computed once, every
+    page repeats the table header, and each page carries its own Cash In /
+    Cash Out totals plus the balance brought and carried forward. Rows are
+    consumed from an iterator and pages are flushed as they fill, so memory
+    stays bounded regardless of the row count.
+    """
+
+    def __init__(self, file, title_lines=(), pagesize=None):
+        self.pagesize = pagesize or landscape(A4)
+        self.width, self.height = self.pagesize
+        self.title_lines = list(title_lines)
+        self.pdf = PdfStreamWriter(file, self.pagesize)
+        self.page_number = 0
+        self._layout_columns()
+
+    def _layout_columns(self):
+        usable = self.width - 2 * MARGIN
+        total_weight = sum(weight for _, weight, _ in COLUMNS)
+        char_width = stringWidth("0", FONT, FONT_SIZE)
+
+        self.columns = []
+        x = MARGIN
+        for header, weight, align in COLUMNS:
+            width = usable * weight / total_weight
+            self.columns.append({
+                "header": header,
+                "x": x,
+                "width": width,
+                "align": align,
+                "max_chars": max(int((width - 4) / char_width), 1),
+            })
+            x += width
+
+    def render(self, rows):
+        """
+        Draws every row and finishes the document. Returns the number of rows.
+        """
+        self.page_number = 0
+        self.balance = None
+        count = 0
+
+        self._start_page(first=True)
+        for count, row in enumerate(rows, 1):
+            if self.y < MARGIN + 2 * ROW_HEIGHT:
+                self._finish_page()
+                self._start_page()
+            self._draw_row(count, row)
+
+        self._finish_page()
+        self.pdf.close()
+        return count
+
+    def _start_page(self, first=False):
+        self.page_number += 1
+        self.page_in = ZERO
+        self.page_out = ZERO
+        self.y = self.height - MARGIN
+
+        if first:
+            for i, line in enumerate(self.title_lines):
+                self.pdf.set_font(FONT_BOLD if i == 0 else FONT, 12 if i == 0 else 10)
+                self.pdf.text(MARGIN, self.y, line)
+                self.y -= 16
+            self.y -= 6
+
+        self.pdf.set_font(FONT_BOLD, FONT_SIZE)
+        for column in self.columns:
+            self._draw_cell(column, column["header"], FONT_BOLD)
+        self.y -= 4
+        self.pdf.line(MARGIN, self.y, self.width - MARGIN, self.y)
+        self.y -= ROW_HEIGHT - 4
+
+        self.pdf.set_font(FONT, FONT_SIZE)
+        if self.balance is not None:
+            self._draw_summary("Brought forward", balance=self.balance)
+
+    def _draw_row(self, number, row):
+        amount = row["amount"] or ZERO
+        is_in = row["transaction_type"] == "IN"
+        if is_in:
+            self.page_in += amount
+        else:
+            self.page_out += amount
+        self.balance = row["running_balance"]
+
+        party = f"{row['party_name'] or ''} {row['party_mobile_number'] or ''}".strip()
+        values = [
+            str(number),
+            f"{row['date'].strftime('%d:%m:%Y')} {row['time'].strftime('%H:%M') if row['time'] else ''}",
+            row["remarks"] or "",
+            party,
+            row["category__name"] or "",
+            row["payment_mode__name"] or "",
+            row["user__name"] or "",
+            f"{amount:.2f}" if is_in else "",
+            "" if is_in else f"{amount:.2f}",
+            f"{self.balance:.2f}",
+        ]
+        for column, value in zip(self.columns, values):
+            if value:
+                self._draw_cell(column, value)
+        self.y -= ROW_HEIGHT
+
+    def _draw_summary(self, label, cash_in=None, cash_out=None, balance=None):
+        self.pdf.set_font(FONT_BOLD, FONT_SIZE)
+        self._draw_cell(self.columns[2], label, FONT_BOLD)
+        if cash_in is not None:
+            self._draw_cell(self.columns[7], f"{cash_in:.2f}", FONT_BOLD)
+        if cash_out is not None:
+            self._draw_cell(self.columns[8], f"{cash_out:.2f}", FONT_BOLD)
+        if balance is not None:
+            self._draw_cell(self.columns[9], f"{balance:.2f}", FONT_BOLD)
+        self.pdf.set_font(FONT, FONT_SIZE)
+        self.y -= ROW_HEIGHT
+
+    def _finish_page(self):
+        rule = self.y + ROW_HEIGHT - 4
+        self.pdf.line(MARGIN, rule, self.width - MARGIN, rule)
+        self._draw_summary("Page total", self.page_in, self.page_out)
+        if self.balance is not None:
+            self._draw_summary("Carried forward", balance=self.balance)
+
+        label = f"Page {self.page_number}"
+        self.pdf.text(self.width - MARGIN - stringWidth(label, FONT, FONT_SIZE), MARGIN / 2, label)
+        self.pdf.end_page()
+
+    def _draw_cell(self, column, text, font=FONT):
+        if len(text) > column["max_chars"]:
+            text = text[:column["max_chars"] - 1] + "…"
+        if column["align"] == "right":
+            x = column["x"] + column["width"] - 2 - stringWidth(text, font, FONT_SIZE)
+        else:
+            x = column["x"] + 2
+        self.pdf.text(x, self.y, text)
+
@@ -0,0 +1,68 @@
+from rest_framework.renderers import JSONRenderer
+
+# Row columns sent once per distinct value: each group becomes one column of
+# indexes into a dictionary holding the group's columns.
+DICTIONARY_COLUMNS = {
+    "category": ("category", "category_name"),
+    "payment_mode": ("payment_mode", "payment_mode_name"),
+    "user": ("user_id", "user_name"),
+    "cash_book": ("cash_book", "cash_book_name"),
+}
+# Keys holding the row lists of the list, ledger and sync responses
+ROW_KEYS = ("results", "changed")
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    Opt-in compact rendering of transaction lists
+    (`Accept: application/vnd.mueeniyya.columnar+json` or `?format=columnar`),
+    offered by the list, ledger and sync actions.
+
+    Each row list becomes {"length", "columns", "dictionaries"}: one array
+    per field instead of one object per row, with the category, payment
+    mode, user and cash book columns replaced by indexes into dictionaries
+    that carry each distinct id and name once. The rest of the response
+    (cursors, totals, errors) is rendered as plain JSON.
+
+    Row i is rebuilt as {name: columns[name][i]} for the plain columns plus
+    {name: dictionaries[group][name][columns[group][i]]} for each group.
+    """
+    media_type = "application/vnd.mueeniyya.columnar+json"
+    format = "columnar"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list):
+            data = encode_rows(data)
+        elif isinstance(data, dict):
+            data = {
+                key: encode_rows(value) if key in ROW_KEYS and isinstance(value, list) else value
+                for key, value in data.items()
+            }
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def encode_rows(rows):
+    # anything but a list of objects (e.g. a list of error messages) is sent as is
+    if not all(isinstance(row, dict) for row in rows):
+        return rows
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    columns = {}
+    dictionaries = {}
+    grouped = set()
+
+    for group, group_names in DICTIONARY_COLUMNS.items():
+        present = [name for name in group_names if name in names]
+        if not present:
+            continue
+        grouped.update(present)
+        index = {}
+        keys = [tuple(row.get(name) for name in present) for row in rows]
+        columns[group] = [index.setdefault(key, len(index)) for key in keys]
+        values = list(zip(*index)) if index else [()] * len(present)
+        dictionaries[group] = {name: list(column) for name, column in zip(present, values)}
+
+    for name in names:
+        if name not in grouped:
+            columns[name] = [row.get(name) for row in rows]
+
+    return {"length": len(rows), "columns": columns, "dictionaries": dictionaries}
@@ -0,0 +1,189 @@
+import datetime
+import hashlib
+import json
+import os
+import traceback
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from accounts.scope import get_scope
+
+from . import reports
+from .models import ReportJob
+
+# Filters whose result depends on the day the report is generated
+RELATIVE_DATE_FILTERS = {"today", "yesterday", "this_month"}
+# RUNNING jobs not finished after this long are assumed lost with their
+# worker and queued again
+RUNNING_TIMEOUT = datetime.timedelta(seconds=getattr(settings, "REPORT_JOB_TIMEOUT_SECONDS", 30 * 60))
+# Finished artifacts are reused and served for this long, then deleted
+ARTIFACT_TTL = datetime.timedelta(seconds=getattr(settings, "REPORT_ARTIFACT_TTL_SECONDS", 24 * 60 * 60))
+
+
+def filter_hash(data, user_scope, today=None):
+    """
+    Stable hash of the report request and the cash books the user can see,
+    so artifacts are only shared between users with the same scope.
+    Relative date filters are pinned to the current day so "today" does
+    not match yesterday's artifact.
+    """
+    payload = {key: data.get(key) for key in sorted(data.keys())}
+    payload["_scope"] = user_scope.key
+    if not data.get("customDateRange") and data.get("dateFilter", "today") in RELATIVE_DATE_FILTERS:
+        payload["_day"] = (today or datetime.date.today()).isoformat()
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def data_version(data, user_scope, today=None):
+    """
+    Fingerprint of what a report would contain: an aggregate over the
+    matching rows, which changes whenever one is added, removed or edited,
+    plus the user, category, payment mode, cash book and campus names the
+    report prints, which change without touching the rows.
+    """
+    queryset, _ = reports.filter_report_queryset(data, today=today, user_scope=user_scope)
+    queryset = queryset.order_by()
+    stats = queryset.aggregate(
+        rows=Count("id"), last_id=Max("id"), total=Sum("amount"), updated=Max("updated_at")
+    )
+    name_columns = ("user__name", "category__name", "payment_mode__name")
+    stats["names"] = list(queryset.values_list(*name_columns).distinct().order_by(*name_columns))
+    cash_book = reports.report_cash_book(data)
+    if cash_book:
+        stats["cash_book"] = [cash_book.name, cash_book.campus.name if cash_book.campus else None]
+    encoded = json.dumps(stats, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def artifact_path(job):
+    return os.path.join(settings.REPORT_ARTIFACT_DIR, job.artifact)
+
+
+def request_report(user, data):
+    """
+    Queues a report for `user`, or reuses work already done for the same
+    filters and data version. Returns (job, created).
+    """
+    format_ = data.get("format", "excel")
+    user_scope = get_scope(user)
+    hash_ = filter_hash(data, user_scope)
+    version = data_version(data, user_scope)
+    requeue_stale_jobs()
+    jobs = ReportJob.objects.filter(filter_hash=hash_, data_version=version)
+
+    in_flight = jobs.filter(
+        created_by=user, status__in=[ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING]
+    ).first()
+    if in_flight:
+        return in_flight, False
+
+    fresh = jobs.filter(status=ReportJob.STATUS_DONE, finished_at__gte=timezone.now() - ARTIFACT_TTL)
+    for done in fresh:
+        if not os.path.exists(artifact_path(done)):
+            continue
+        if done.created_by_id == user.id:
+            return done, False
+        # Same artifact, new job row so every user only sees their own jobs
+        job = ReportJob.objects.create(
+            created_by=user, format=format_, filters=data, filter_hash=hash_, data_version=version,
+            status=ReportJob.STATUS_DONE, artifact=done.artifact, row_count=done.row_count,
+            started_at=timezone.now(), finished_at=timezone.now(),
+        )
+        return job, True
+
+    job = ReportJob.objects.create(
+        created_by=user, format=format_, filters=data, filter_hash=hash_, data_version=version,
+    )
+    return job, True
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Moves RUNNING jobs started more than RUNNING_TIMEOUT ago back to
+    PENDING, so a job whose worker died is picked up again instead of
+    being handed out as in flight forever. Returns the number requeued.
+    """
+    now = now or timezone.now()
+    return ReportJob.objects.filter(
+        status=ReportJob.STATUS_RUNNING, started_at__lt=now - RUNNING_TIMEOUT
+    ).update(status=ReportJob.STATUS_PENDING, started_at=None)
+
+
+def delete_expired_artifacts(now=None):
+    """
+    Deletes files in REPORT_ARTIFACT_DIR older than ARTIFACT_TTL that no
+    job finished within ARTIFACT_TTL refers to (reused artifacts live on),
+    including partial files left by crashed renders. Their jobs stay DONE;
+    the download endpoint answers 410 for them. Returns the number of files
+    removed.
+    """
+    now = now or timezone.now()
+    cutoff = now - ARTIFACT_TTL
+    if not os.path.isdir(settings.REPORT_ARTIFACT_DIR):
+        return 0
+    live = set(
+        ReportJob.objects.filter(status=ReportJob.STATUS_DONE, finished_at__gte=cutoff).values_list("artifact", flat=True)
+    )
+
+    removed = 0
+    for name in os.listdir(settings.REPORT_ARTIFACT_DIR):
+        path = os.path.join(settings.REPORT_ARTIFACT_DIR, name)
+        try:
+            if name in live or os.path.getmtime(path) >= cutoff.timestamp():
+                continue
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def claim_next_job():
+    """
+    Atomically moves the oldest pending job to RUNNING. The conditional
+    UPDATE makes it safe to run several workers against the same database.
+    """
+    requeue_stale_jobs()
+    pending = ReportJob.objects.filter(status=ReportJob.STATUS_PENDING).order_by("created_at", "id")
+    for job_id in pending.values_list("id", flat=True)[:10]:
+        claimed = ReportJob.objects.filter(id=job_id, status=ReportJob.STATUS_PENDING).update(
+            status=ReportJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            return ReportJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """
+    Renders the job's report to disk. The file is written under a temporary
+    name and renamed once complete, so downloads never see a partial file.
+    """
+    extension, _ = reports.REPORT_FORMATS.get(job.format, ("", None))
+    job.artifact = f"{job.filter_hash[:24]}-{job.data_version[:16]}{extension}"
+    path = artifact_path(job)
+    partial = f"{path}.{job.pk}.part"
+
+    try:
+        today = job.created_at.date()
+        user_scope = get_scope(job.created_by)
+        if filter_hash(job.filters, user_scope, today) != job.filter_hash:
+            raise PermissionError("The requesting user's campuses changed; request the report again.")
+        os.makedirs(settings.REPORT_ARTIFACT_DIR, exist_ok=True)
+        with open(partial, "wb") as file:
+            job.row_count = reports.render_report(job.filters, file, today=today, user_scope=user_scope)
+        os.replace(partial, path)
+        job.status = ReportJob.STATUS_DONE
+    except Exception:
+        if os.path.exists(partial):
+            os.remove(partial)
+        job.artifact = ""
+        job.status = ReportJob.STATUS_FAILED
+        job.error = traceback.format_exc(limit=5)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["artifact", "row_count", "status", "error", "finished_at"])
+    return job
@@ -0,0 +1,206 @@
+import datetime
+import tempfile
+from decimal import Decimal
+
+from django.core.exceptions import PermissionDenied
+from openpyxl import Workbook
+
+from . import ledger
+from .models import CashBook, Transaction
+from .pdf_report import PdfReportEngine
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# format -> (file extension, content type)
+REPORT_FORMATS = {
+    "excel": (".xlsx", XLSX_CONTENT_TYPE),
+    "pdf": (".pdf", "application/pdf"),
+}
+
+# Reports above this size are spooled to disk instead of memory
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+# Columns read from the database for every report row
+ROW_FIELDS = (
+    "date", "time", "remarks", "user__name", "party_name", "party_mobile_number",
+    "category__name", "payment_mode__name", "transaction_type", "amount",
+)
+
+EXCEL_HEADERS = [
+    "Date",
+    "Time",
+    "Remarks",
+    "Entered By",
+    "Party Name",
+    "Mobile Number",
+    "Category",
+    "Mode",
+    "Cash In",
+    "Cash Out",
+    "Balance",
+]
+
+
+def check_scope(data, user_scope):
+    """
+    Raises PermissionDenied when the report asks for a campus or cash book
+    outside `user_scope`.
+    """
+    try:
+        if data.get("campus") and not user_scope.allows_campus(int(data["campus"])):
+            raise PermissionDenied("You are not allowed to report on this campus.")
+        if data.get("cash_book") and not user_scope.allows_cash_book(int(data["cash_book"])):
+            raise PermissionDenied("You are not allowed to report on this cash book.")
+    except (TypeError, ValueError):
+        raise PermissionDenied("Invalid campus or cash book.")
+
+
+def filter_report_queryset(data, queryset=None, today=None, user_scope=None):
+    """
+    Applies the report filters sent by the reports page, limited to the
+    cash books of `user_scope` when given. Returns (queryset, date_text).
+    """
+    queryset = Transaction.objects.all() if queryset is None else queryset
+    if user_scope is not None and not user_scope.is_admin:
+        queryset = queryset.filter(cash_book_id__in=user_scope.cash_book_ids)
+
+    if data.get("campus"):
+        queryset = queryset.filter(cash_book__campus_id=data["campus"])
+    if data.get("cash_book"):
+        queryset = queryset.filter(cash_book_id=data["cash_book"])
+    if data.get("typeFilter") and data["typeFilter"] != "all":
+        queryset = queryset.filter(transaction_type=data["typeFilter"])
+    if data.get("categories"):
+        queryset = queryset.filter(category_id__in=data["categories"])
+    if data.get("modes"):
+        queryset = queryset.filter(payment_mode_id__in=data["modes"])
+    if data.get("users"):
+        queryset = queryset.filter(user_id__in=data["users"])
+
+    # --- Date Filter ---
+    today = today or datetime.date.today()
+    if data.get("customDateRange"):
+        from_date = data["customDateRange"]["from"]
+        to_date = data["customDateRange"]["to"]
+        queryset = queryset.filter(date__range=[from_date, to_date])
+        date_text = f"{from_date} to {to_date}"
+    else:
+        date_filter = data.get("dateFilter", "today")
+        if date_filter == "today":
+            queryset = queryset.filter(date=today)
+            date_text = "Today"
+        elif date_filter == "yesterday":
+            yesterday = today - datetime.timedelta(days=1)
+            queryset = queryset.filter(date=yesterday)
+            date_text = "Yesterday"
+        elif date_filter == "this_month":
+            queryset = queryset.filter(date__month=today.month, date__year=today.year)
+            date_text = today.strftime("%B %Y")
+        else:
+            date_text = "All Dates"
+
+    return queryset, date_text
+
+
+def report_cash_book(data):
+    if not data.get("cash_book"):
+        return None
+    return CashBook.objects.select_related("campus").filter(id=data["cash_book"]).first()
+
+
+def iter_report_rows(queryset, chunk_size=2000):
+    """
+    Yields report rows in chronological order with a running balance,
+    streaming from a server-side cursor so memory stays flat.
+    """
+    balance = Decimal("0.00")
+    rows = queryset.order_by("date", "time", "id").values(*ROW_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        amount = row["amount"] or Decimal("0.00")
+        if row["transaction_type"] == "IN":
+            balance += amount
+        else:
+            balance -= amount
+        row["running_balance"] = balance
+        yield row
+
+
+def write_excel(rows, file, cash_book=None, date_text="", totals=None):
+    """
+    Writes the report into `file` with a write-only workbook: rows are
+    flushed to disk as they are appended instead of being kept in memory.
+    Returns the number of rows written.
+    """
+    totals = totals or {}
+    total_in = totals.get("total_in") or Decimal("0.00")
+    total_out = totals.get("total_out") or Decimal("0.00")
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Report")
+
+    ws.append([
+        f"Campus: {cash_book.campus.name if cash_book and cash_book.campus else ''}",
+        f"Cash Book: {cash_book.name if cash_book else ''}",
+    ])
+    ws.append([f"Date: {date_text}"])
+    ws.append([f"Total In: {total_in}", f"Total Out: {total_out}", f"Net Balance: {total_in - total_out}"])
+    ws.append([])
+    ws.append(EXCEL_HEADERS)
+
+    count = 0
+    for count, row in enumerate(rows, 1):
+        is_in = row["transaction_type"] == "IN"
+        ws.append([
+            row["date"].strftime("%d:%m:%Y"),
+            row["time"].strftime("%H:%M:%S") if row["time"] else "",
+            row["remarks"] or "",
+            row["user__name"] or "",
+            row["party_name"] or "",
+            row["party_mobile_number"] or "",
+            row["category__name"] or "",
+            row["payment_mode__name"] or "",
+            row["amount"] if is_in else "",
+            "" if is_in else row["amount"],
+            row["running_balance"],
+        ])
+
+    wb.save(file)
+    return count
+
+
+def render_report(data, file, today=None, user_scope=None):
+    """
+    Renders the report described by `data` (the reports page payload) into
+    `file` in the requested format. Returns the number of rows written.
+    """
+    queryset, date_text = filter_report_queryset(data, today=today, user_scope=user_scope)
+    totals = ledger.totals(queryset)
+    cash_book = report_cash_book(data)
+    format_ = data.get("format", "excel")
+
+    if format_ == "excel":
+        return write_excel(iter_report_rows(queryset), file, cash_book, date_text, totals)
+
+    if format_ == "pdf":
+        title_lines = [
+            f"Campus: {cash_book.campus.name if cash_book and cash_book.campus else ''}"
+            f"    Cash Book: {cash_book.name if cash_book else ''}",
+            f"Date: {date_text}",
+            f"Total In: {totals['total_in']}   Total Out: {totals['total_out']}"
+            f"   Net Balance: {totals['total_in'] - totals['total_out']}",
+        ]
+        return PdfReportEngine(file, title_lines).render(iter_report_rows(queryset))
+
+    raise ValueError(f"Unknown report format: {format_}")
+
+
+def report_file(data, today=None, user_scope=None):
+    """
+    Renders the report into a spooled temporary file (kept in memory while
+    small, moved to disk once it grows) and returns it rewound.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    render_report(data, file, today, user_scope)
+    file.seek(0)
+    return file
+
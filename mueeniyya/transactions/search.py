@@ -0,0 +1,132 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Transaction, TransactionSearchToken
+
+# Fields covered by the transaction search box
+SEARCH_FIELDS = ("remarks", "party_name", "party_mobile_number")
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TOKEN_LENGTH = 64
+# Terms matching at least this many tokens are probed per row (EXISTS)
+COMMON_TERM_ROWS = 5000
+
+
+def tokenize(text):
+    """
+    Lowercased word tokens of `text`. Search terms are word runs as well,
+    so a term occurs in a field exactly when it occurs inside one of the
+    field's tokens.
+    """
+    if not text:
+        return set()
+    return {token[:MAX_TOKEN_LENGTH] for token in TOKEN_RE.findall(text.lower())}
+
+
+def transaction_tokens(txn):
+    tokens = set()
+    for field in SEARCH_FIELDS:
+        tokens |= tokenize(getattr(txn, field))
+    return tokens
+
+
+def uses_token_index(using="default"):
+    """
+    PostgreSQL answers searches from the trigram indexes created in
+    migrations 0008 and 0012. Other databases use the TransactionSearchToken
+    table.
+    """
+    return connections[using].vendor != "postgresql"
+
+
+def search(queryset, text):
+    """
+    Filters `queryset` to transactions matching every word of `text`: each
+    word must occur, case-insensitively, anywhere in the remarks, party
+    name or party mobile (e.g. "ostel" finds "Hostel fees", "65000" finds
+    9876500001).
+
+    PostgreSQL matches the fields with `~*`, which the pg_trgm GIN indexes
+    serve (Django's icontains compares UPPER() values and would not use
+    them). Elsewhere each word must occur in an indexed token.
+    """
+    terms = tokenize(text)
+    if not terms:
+        return queryset
+
+    if not uses_token_index(queryset.db):
+        for term in terms:
+            pattern = re.escape(term)
+            queryset = queryset.filter(
+                Q(remarks__iregex=pattern)
+                | Q(party_name__iregex=pattern)
+                | Q(party_mobile_number__iregex=pattern)
+            )
+        return queryset
+
+    for term in terms:
+        matches = TransactionSearchToken.objects.using(queryset.db).filter(token__contains=term)
+        if matches[:COMMON_TERM_ROWS].count() < COMMON_TERM_ROWS:
+            # Selective term: drive the query from the matching ids
+            queryset = queryset.filter(id__in=matches.values("transaction_id"))
+        else:
+            # Common term: walk rows in page order and probe the token index,
+            # instead of materialising a huge id list
+            queryset = queryset.filter(Exists(matches.filter(transaction_id=OuterRef("pk"))))
+    return queryset
+
+
+def index_transaction(txn, using=None):
+    """
+    Replaces the search tokens of one transaction, in the database it was
+    saved to unless `using` says otherwise.
+    """
+    using = using or txn._state.db or DEFAULT_DB_ALIAS
+    if not uses_token_index(using):
+        return
+    TransactionSearchToken.objects.using(using).filter(transaction_id=txn.pk).delete()
+    index_transactions([txn], using=using)
+
+
+def index_transactions(txns, using=None, batch_size=2000):
+    """
+    Adds tokens for newly created transactions (e.g. after bulk_create), in
+    the database they were saved to unless `using` says otherwise.
+    """
+    if not txns:
+        return
+    using = using or txns[0]._state.db or DEFAULT_DB_ALIAS
+    if not uses_token_index(using):
+        return
+    # Plain executemany: building a model instance per token dominates the
+    # cost of large imports
+    connection = connections[using]
+    table = connection.ops.quote_name(TransactionSearchToken._meta.db_table)
+    sql = f"INSERT INTO {table} (transaction_id, token) VALUES (%s, %s)"
+    rows = [(txn.pk, token) for txn in txns for token in transaction_tokens(txn)]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+
+def rebuild(batch_size=2000):
+    """
+    Rebuilds the whole token table from the Transaction rows, e.g. after
+    bulk_create or a raw import. Returns the number of tokens written.
+    """
+    if not uses_token_index():
+        return 0
+    TransactionSearchToken.objects.all().delete()
+
+    count, batch = 0, []
+    rows = Transaction.objects.order_by().only("id", *SEARCH_FIELDS)
+    for txn in rows.iterator(chunk_size=batch_size):
+        batch.extend(TransactionSearchToken(transaction_id=txn.pk, token=token) for token in transaction_tokens(txn))
+        if len(batch) >= batch_size:
+            TransactionSearchToken.objects.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    TransactionSearchToken.objects.bulk_create(batch)
+    return count + len(batch)
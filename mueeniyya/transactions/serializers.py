@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Category, PaymentMode, CashBook, Transaction, OpeningBalance
+from .models import Category, PaymentMode, CashBook, Transaction, OpeningBalance, ReportJob
 
 # ----------------------------------------------------------------------
 # PAYMENT MODE SERIALIZER
@@ -36,13 +36,34 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'name', 'is_active', 'created_at', 'cash_books', 'cash_books_details']
 
+# ----------------------------------------------------------------------
+# CATEGORY IDS SERIALIZER
+# ----------------------------------------------------------------------
+class CategoryIdsSerializer(serializers.ModelSerializer):
+    """Category with only the ids of its cash books (`?details=false`)."""
+    cash_books = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'is_active', 'cash_books']
+
 # ----------------------------------------------------------------------
 # TRANSACTION SERIALIZER
 # ----------------------------------------------------------------------
+TRANSACTION_LABELS = dict(Transaction.TRANSACTION_TYPES)
+
+
+class TransactionLabelField(serializers.ReadOnlyField):
+    """Display label of `transaction_type`, read from the same column."""
+
+    def to_representation(self, value):
+        return TRANSACTION_LABELS.get(value, value)
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     user_name = serializers.CharField(source='user.name', read_only=True)
-    user_id = serializers.IntegerField(source='user.id', read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
 
     category_name = serializers.CharField(source='category.name', read_only=True)
     payment_mode_name = serializers.CharField(source='payment_mode.name', read_only=True)
@@ -54,7 +75,7 @@ class TransactionSerializer(serializers.ModelSerializer):
     
     date = serializers.DateField(format="%d:%m:%Y")
 
-    transaction_label = serializers.SerializerMethodField()
+    transaction_label = TransactionLabelField(source='transaction_type')
 
     class Meta:
         model = Transaction
@@ -64,12 +85,18 @@ class TransactionSerializer(serializers.ModelSerializer):
             'category', 'category_name',
             'payment_mode', 'payment_mode_name',
             'cash_book', 'cash_book_name',
-            'date', 'time', 'amount', 'remarks', 'created_at',
+            'date', 'time', 'amount', 'remarks', 'created_at', 'updated_at',
             'party_name', 'party_mobile_number',
         ]
 
-    def get_transaction_label(self, obj):
-        return dict(Transaction.TRANSACTION_TYPES).get(obj.transaction_type, obj.transaction_type)
+# ----------------------------------------------------------------------
+# LEDGER ENTRY SERIALIZER
+# ----------------------------------------------------------------------
+class LedgerEntrySerializer(TransactionSerializer):
+    running_balance = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta(TransactionSerializer.Meta):
+        fields = TransactionSerializer.Meta.fields + ['running_balance']
 
 # ----------------------------------------------------------------------
 # OPENING BALANCE SERIALIZER
@@ -82,4 +109,25 @@ class OpeningBalanceSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'cash_book', 'cash_book_name', 'amount', 'date', 'created_by'
         ]
-        read_only_fields = ['date', 'created_by', 'cash_book_name']
\ No newline at end of file
+        read_only_fields = ['date', 'created_by', 'cash_book_name']
+
+# ----------------------------------------------------------------------
+# REPORT JOB SERIALIZER
+# ----------------------------------------------------------------------
+class ReportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'format', 'filters', 'status', 'row_count', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+# ----------------------------------------------------------------------
+# PARTY SERIALIZER
+# ----------------------------------------------------------------------
+class PartySerializer(serializers.Serializer):
+    name = serializers.CharField(read_only=True)
+    mobile_number = serializers.CharField(read_only=True, allow_null=True)
+    usage_count = serializers.IntegerField(read_only=True)
+    last_used = serializers.DateField(read_only=True, allow_null=True)
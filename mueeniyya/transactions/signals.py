@@ -0,0 +1,115 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts import response_cache, scope
+
+from . import balances, category_totals, parties, search
+from .models import CashBook, Category, PaymentMode, Transaction, TransactionTombstone
+
+# A change to any of these moves the transaction to another Party entry
+PARTY_FIELDS = ("party_name", "party_mobile_number", "cash_book_id")
+
+_state = threading.local()
+
+
+@contextmanager
+def paused():
+    """
+    Skips the per-row Transaction receivers below, for bulk operations that
+    update balances, search tokens and parties themselves (see bulk.py).
+    """
+    previous = _is_paused()
+    _state.paused = True
+    try:
+        yield
+    finally:
+        _state.paused = previous
+
+
+def _is_paused():
+    return getattr(_state, "paused", False)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not raw:
+        # locked until the save commits, so concurrent edits apply in turn
+        instance._previous_state = (
+            Transaction.objects.select_for_update().filter(pk=instance.pk)
+            .only("cash_book_id", "category_id", "date", "transaction_type", "amount", *search.SEARCH_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Transaction)
+def update_daily_balance_on_save(sender, instance, raw=False, **kwargs):
+    if raw or _is_paused():
+        return
+    previous = getattr(instance, "_previous_state", None)
+    # both books up front and in order: a move between books must not deadlock
+    balances.lock_cash_books([instance.cash_book_id, getattr(previous, "cash_book_id", None)])
+    if previous is not None:
+        balances.apply_transaction(previous, sign=-1)
+        category_totals.apply_transaction(previous, sign=-1)
+    balances.apply_transaction(instance)
+    category_totals.apply_transaction(instance)
+
+    if previous is None or any(
+        getattr(previous, field) != getattr(instance, field) for field in search.SEARCH_FIELDS
+    ):
+        search.index_transaction(instance, using=kwargs.get("using"))
+
+    if previous is not None and previous.cash_book_id and previous.cash_book_id != instance.cash_book_id:
+        # gone from the old cash book: staff who only see that one drop it
+        TransactionTombstone.objects.create(transaction_id=instance.pk, cash_book_id=previous.cash_book_id)
+
+    if previous is None:
+        parties.record(instance)
+    elif any(getattr(previous, field) != getattr(instance, field) for field in PARTY_FIELDS):
+        parties.record(previous, sign=-1)
+        parties.record(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_daily_balance_on_delete(sender, instance, **kwargs):
+    if _is_paused():
+        return
+    balances.apply_transaction(instance, sign=-1)
+    category_totals.apply_transaction(instance, sign=-1)
+    parties.record(instance, sign=-1)
+    TransactionTombstone.objects.create(transaction_id=instance.pk, cash_book_id=instance.cash_book_id)
+
+
+@receiver(post_save, sender=CashBook)
+@receiver(post_delete, sender=CashBook)
+def invalidate_scopes_on_cash_book_change(sender, **kwargs):
+    scope.invalidate_all()
+    # categories embed their cash books
+    response_cache.invalidate("cash_books", "categories")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Category.cash_books.through)
+def invalidate_category_responses(sender, **kwargs):
+    response_cache.invalidate("categories")
+
+
+@receiver(post_save, sender=PaymentMode)
+@receiver(post_delete, sender=PaymentMode)
+def invalidate_payment_mode_responses(sender, **kwargs):
+    response_cache.invalidate("payment_modes")
+
+
+@receiver(pre_delete, sender=CashBook)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=PaymentMode)
+def touch_transactions_on_set_null(sender, instance, **kwargs):
+    # SET_NULL rewrites these rows without save(); let sync clients see it
+    field = {CashBook: "cash_book", Category: "category", PaymentMode: "payment_mode"}[sender]
+    Transaction.objects.filter(**{field: instance}).update(updated_at=timezone.now())
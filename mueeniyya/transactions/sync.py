@@ -0,0 +1,144 @@
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Transaction, TransactionTombstone
+
+SYNC_PAGE_SIZE = 500
+MAX_SYNC_PAGE_SIZE = 2000
+# Rows committed late with an earlier updated_at than rows already sent
+# are picked up by re-reading this window on the next sync. It must cover
+# the gap between stamping a row and committing it: single saves commit
+# at once, and bulk writes and imports restamp their rows (see restamp)
+# as the last step of their transaction.
+SYNC_OVERLAP = datetime.timedelta(seconds=getattr(settings, "SYNC_OVERLAP_SECONDS", 60))
+RESTAMP_CHUNK_SIZE = 5000
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def encode_token(changed, deleted, scope_key=None):
+    payload = {
+        "c": [changed[0].isoformat(), changed[1]] if changed else None,
+        "d": [deleted[0].isoformat(), deleted[1]] if deleted else None,
+        "s": scope_key,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_token(token):
+    """
+    Returns (changed_position, deleted_position, scope_key) from a sync
+    token; each position is (datetime, id) or None. An empty token means a
+    full sync.
+    """
+    if not token:
+        return None, None, None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return _position(payload["c"]), _position(payload["d"]), payload.get("s")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise InvalidSyncToken("Invalid sync token")
+
+
+def _position(value):
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value[0]), int(value[1])
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    moment, pk = position
+    return queryset.filter(Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk}))
+
+
+def changes_since(queryset, user_scope, token, limit=SYNC_PAGE_SIZE):
+    """
+    One page of the change feed after `token`: rows of `queryset` created or
+    updated since, ids deleted since, the token to continue from and
+    whether more pages are waiting. A full sync (no token) sends no
+    deletions, only the current rows.
+
+    Rows may be sent more than once (see SYNC_OVERLAP); clients upsert by
+    id. `deleted` also lists rows that moved to a cash book the user cannot
+    see. When the user's scope changed since `token`, a full sync is sent
+    with `reset` set and the client drops its copy before applying it.
+    """
+    changed_pos, deleted_pos, token_scope = decode_token(token)
+    # When the scope changed since the token, rows may have left the user's
+    # view without a tombstone (a campus was unassigned, a cash book moved
+    # or was deleted), so the client is told to start over
+    current_scope = user_scope.key
+    reset = bool(token) and token_scope != current_scope
+    if reset:
+        changed_pos, deleted_pos = None, None
+    full_sync = not token or reset
+
+    rows = list(_after(queryset, "updated_at", changed_pos).order_by("updated_at", "id")[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    tombstones = TransactionTombstone.objects.all()
+    if not user_scope.is_admin:
+        tombstones = tombstones.filter(cash_book_id__in=user_scope.cash_book_ids)
+    if full_sync:
+        # nothing to delete yet; continue from the latest tombstone
+        latest = tombstones.order_by("-deleted_at", "-id").values_list("deleted_at", "id").first()
+        deleted = []
+        next_deleted = _rewind(latest or (timezone.now(), 0))
+    else:
+        deleted_rows = list(
+            _after(tombstones, "deleted_at", deleted_pos).order_by("deleted_at", "id")
+            .values_list("deleted_at", "id", "transaction_id")[:limit + 1]
+        )
+        has_more = has_more or len(deleted_rows) > limit
+        deleted_rows = deleted_rows[:limit]
+        deleted = list(dict.fromkeys(transaction_id for _, _, transaction_id in deleted_rows))
+        # rows that moved between two of the user's cash books are still here
+        still_visible = set(queryset.filter(id__in=deleted).order_by().values_list("id", flat=True))
+        deleted = [transaction_id for transaction_id in deleted if transaction_id not in still_visible]
+        next_deleted = deleted_pos
+        if deleted_rows:
+            next_deleted = _rewind((deleted_rows[-1][0], deleted_rows[-1][1]), has_more)
+
+    next_changed = changed_pos
+    if rows:
+        next_changed = _rewind((rows[-1].updated_at, rows[-1].id), has_more)
+    elif changed_pos is None:
+        next_changed = _rewind((timezone.now(), 0))
+
+    return {
+        "changed": rows,
+        "deleted": deleted,
+        "sync_token": encode_token(next_changed, next_deleted, current_scope),
+        "has_more": has_more,
+        "reset": reset,
+    }
+
+
+def restamp(ids):
+    """
+    Sets updated_at of the rows `ids` to now. Long write transactions call
+    this as their last step, so their rows are stamped just before they
+    commit and stay within SYNC_OVERLAP of it.
+    """
+    now = timezone.now()
+    ids = list(ids)
+    for start in range(0, len(ids), RESTAMP_CHUNK_SIZE):
+        Transaction.objects.filter(id__in=ids[start:start + RESTAMP_CHUNK_SIZE]).update(updated_at=now)
+
+
+def _rewind(position, has_more=False):
+    # Only rows stamped within SYNC_OVERLAP of now can still be committing;
+    # the last page steps back before them so they are not skipped.
+    if has_more:
+        return position
+    return min(position, (timezone.now() - SYNC_OVERLAP, 0))
@@ -1,3 +1,1242 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+from pypdf import PdfReader
+from rest_framework.test import APIClient
+
+from accounts.models import User, Role, OffCampus
+from accounts.scope import get_scope
+from . import balances, bulk, category_totals, report_jobs, signals, sync
+from .models import (
+    Category, PaymentMode, CashBook, Transaction, OpeningBalance, DailyCashBookBalance, ReportJob,
+    TransactionSearchToken, TransactionTombstone, Party, MonthlyCategoryTotal,
+)
+from .renderers import ColumnarJSONRenderer
+
+
+class TransactionTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.admin_role = Role.objects.create(name="admin")
+        self.staff_role = Role.objects.create(name="staff")
+        self.campus = OffCampus.objects.create(name="Main Campus")
+        self.other_campus = OffCampus.objects.create(name="Other Campus")
+        self.admin = User.objects.create_user(mobile="9000000001", password="pass", role=self.admin_role, name="Admin")
+        self.staff = User.objects.create_user(mobile="9000000002", password="pass", role=self.staff_role, name="Staff")
+        self.staff.off_campuses.set([self.campus])
+
+        self.cash_book = CashBook.objects.create(name="Main Book", campus=self.campus)
+        self.other_book = CashBook.objects.create(name="Other Book", campus=self.other_campus)
+        self.category = Category.objects.create(name="Fees")
+        self.mode = PaymentMode.objects.create(name="Cash")
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_txn(self, date, amount, transaction_type="IN", cash_book=None, time="10:00", **extra):
+        return Transaction.objects.create(
+            user=extra.pop("user", self.admin),
+            transaction_type=transaction_type,
+            category=extra.pop("category", self.category),
+            payment_mode=self.mode,
+            cash_book=cash_book or self.cash_book,
+            date=date,
+            time=time,
+            amount=Decimal(amount),
+            **extra,
+        )
+
+
+class LedgerTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/ledger/"
+
+    def setUp(self):
+        super().setUp()
+        OpeningBalance.objects.create(cash_book=self.cash_book, amount=Decimal("1000"), created_by=self.admin)
+        OpeningBalance.objects.create(cash_book=self.other_book, amount=Decimal("500"), created_by=self.admin)
+        self.add_txn("2025-01-10", "200")
+        self.add_txn("2025-01-15", "50", "OUT")
+        self.add_txn("2025-02-01", "300")
+        self.add_txn("2025-02-02", "100", "OUT", time="09:00")
+        self.add_txn("2025-02-02", "40", "IN", time="11:00")
+        self.add_txn("2025-02-01", "999", cash_book=self.other_book)
+
+    def test_running_balance_starts_from_carried_opening_balance(self):
+        res = self.client.get(self.url, {"cash_book": self.cash_book.id, "date_from": "2025-02-01"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["opening_balance"], Decimal("1150.00"))
+        balances = [row["running_balance"] for row in res.data["results"]]
+        self.assertEqual(balances, ["1390.00", "1350.00", "1450.00"])
+        self.assertEqual(res.data["net_balance"], Decimal("1390.00"))
+
+    def test_opening_balance_follows_exact_date(self):
+        res = self.client.get(self.url, {"cash_book": self.cash_book.id, "date": "2025-02-01"})
+
+        self.assertEqual(res.data["opening_balance"], Decimal("1150.00"))
+        self.assertEqual([row["running_balance"] for row in res.data["results"]], ["1450.00"])
+
+    def test_opening_balance_follows_intersected_date_range(self):
+        today = datetime.date.today()
+        last_month_start = (today.replace(day=1) - datetime.timedelta(days=1)).replace(day=1)
+        self.add_txn(last_month_start.isoformat(), "7")
+        res = self.client.get(
+            self.url, {"cash_book": self.cash_book.id, "date_range": "last_month", "date_from": today.isoformat()}
+        )
+
+        self.assertEqual(res.data["count"], 0)
+        self.assertEqual(res.data["opening_balance"], Decimal("1397.00"))
+        self.assertEqual(res.data["net_balance"], Decimal("1397.00"))
+
+    def test_pages_keep_balance_of_earlier_rows(self):
+        res = self.client.get(self.url, {"cash_book": self.cash_book.id, "page_size": 2, "page": 2})
+
+        self.assertEqual(res.data["count"], 5)
+        balances = [row["running_balance"] for row in res.data["results"]]
+        self.assertEqual(balances, ["1450.00", "1150.00"])
+
+    def test_staff_only_sees_own_campus(self):
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.data["count"], 5)
+        self.assertEqual(res.data["opening_balance"], Decimal("1000.00"))
+
+    def test_staff_cannot_read_other_campus_opening_balance(self):
+        self.client.force_authenticate(self.staff)
+        for params in (
+            {"cash_book": self.other_book.id, "date_from": "2025-02-01"},
+            {"cash_book__in": f"{self.cash_book.id},{self.other_book.id}"},
+        ):
+            res = self.client.get(self.url, params)
+            self.assertEqual(res.status_code, 403, params)
+
+        res = self.client.get(self.url, {"campus": self.other_campus.id})
+        self.assertEqual(res.data["count"], 0)
+        self.assertEqual(res.data["opening_balance"], Decimal("0.00"))
+
+    def test_campus_limits_opening_balance(self):
+        res = self.client.get(self.url, {"campus": self.other_campus.id})
+        self.assertEqual(res.data["opening_balance"], Decimal("500.00"))
+
+    def test_staff_opening_balances_are_scoped(self):
+        self.client.force_authenticate(self.staff)
+        res = self.client.get("/api/transactions/opening_balances/")
+        self.assertEqual([row["cash_book"] for row in res.data], [self.cash_book.id])
+        res = self.client.post(
+            "/api/transactions/opening_balances/", {"cash_book": self.other_book.id, "amount": "10"}, format="json"
+        )
+        self.assertEqual(res.status_code, 403)
+
+    def test_include_ob_false(self):
+        res = self.client.get(self.url, {"cash_book": self.cash_book.id, "include_ob": "false"})
+
+        self.assertEqual(res.data["opening_balance"], Decimal("0.00"))
+        self.assertEqual(res.data["results"][0]["running_balance"], "390.00")
+
+
+class DailyCashBookBalanceTests(TransactionTestMixin, TestCase):
+    def closings(self, cash_book=None):
+        return list(
+            DailyCashBookBalance.objects.filter(cash_book=cash_book or self.cash_book)
+            .values_list("date", "closing_balance")
+        )
+
+    def test_back_dated_edits_shift_later_days(self):
+        first = self.add_txn("2025-01-10", "200")
+        self.add_txn("2025-01-12", "50", "OUT")
+        late = self.add_txn("2025-01-08", "10")
+
+        first.amount = Decimal("300")
+        first.save()
+        late.delete()
+
+        self.assertEqual(self.closings(), [
+            (datetime.date(2025, 1, 8), Decimal("0.00")),
+            (datetime.date(2025, 1, 10), Decimal("300.00")),
+            (datetime.date(2025, 1, 12), Decimal("250.00")),
+        ])
+
+    def test_moving_between_cash_books(self):
+        txn = self.add_txn("2025-01-10", "200")
+        txn.cash_book = self.other_book
+        txn.date = datetime.date(2025, 1, 11)
+        txn.save()
+
+        self.assertEqual(self.closings(), [(datetime.date(2025, 1, 10), Decimal("0.00"))])
+        self.assertEqual(self.closings(self.other_book), [(datetime.date(2025, 1, 11), Decimal("200.00"))])
+
+    def test_failed_snapshot_update_rolls_back_the_save(self):
+        self.add_txn("2025-01-10", "200")
+        with mock.patch("transactions.category_totals.apply_transaction", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.add_txn("2025-01-11", "50")
+
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(self.closings(), [(datetime.date(2025, 1, 10), Decimal("200.00"))])
+
+    def test_rebuild_matches_incremental_state(self):
+        self.add_txn("2025-01-10", "200")
+        self.add_txn("2025-01-10", "20", "OUT")
+        self.add_txn("2025-01-05", "75", cash_book=self.other_book)
+        expected = (self.closings(), self.closings(self.other_book))
+
+        DailyCashBookBalance.objects.all().delete()
+        call_command("rebuild_daily_balances", stdout=StringIO())
+
+        self.assertEqual((self.closings(), self.closings(self.other_book)), expected)
+
+    def test_balance_as_of(self):
+        OpeningBalance.objects.create(cash_book=self.cash_book, amount=Decimal("1000"), created_by=self.admin)
+        self.add_txn("2025-01-10", "200", time="09:00")
+        self.add_txn("2025-01-10", "50", "OUT", time="15:00")
+        self.add_txn("2025-01-20", "30")
+
+        self.assertEqual(balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 9)), Decimal("1000.00"))
+        self.assertEqual(balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 15)), Decimal("1150.00"))
+        self.assertEqual(
+            balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 10), datetime.time(12, 0)),
+            Decimal("1200.00"),
+        )
+
+    def test_nested_pause_keeps_outer_pause(self):
+        with signals.paused():
+            with signals.paused():
+                pass
+            self.add_txn("2025-01-10", "200")
+        self.assertFalse(DailyCashBookBalance.objects.exists())
+        self.add_txn("2025-01-11", "50")
+        self.assertTrue(DailyCashBookBalance.objects.exists())
+
+
+class DashboardTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/dashboard/"
+
+    def setUp(self):
+        super().setUp()
+        self.today = datetime.date.today()
+        self.month_start = self.today.replace(day=1)
+        self.salary = Category.objects.create(name="Salary")
+        OpeningBalance.objects.create(cash_book=self.cash_book, amount=Decimal("1000"), created_by=self.admin)
+        self.add_txn(self.month_start - datetime.timedelta(days=1), "500")
+        self.add_txn(self.month_start, "200")
+        self.add_txn(self.today, "50", "OUT", category=self.salary)
+        self.add_txn(self.today, "30")
+        self.add_txn(self.today, "70", cash_book=self.other_book, category=self.salary)
+
+    def test_kpis_per_cash_book_campus_and_overall(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        totals = res.data["totals"]
+        self.assertEqual(totals["today_in"], Decimal("100"))
+        self.assertEqual(totals["today_out"], Decimal("50"))
+        self.assertEqual(totals["month_in"], Decimal("300"))
+        self.assertEqual(totals["balance"], Decimal("1750"))
+
+        main = next(c for c in res.data["campuses"] if c["id"] == self.campus.id)
+        self.assertEqual([b["name"] for b in main["cash_books"]], ["Main Book"])
+        self.assertEqual(main["balance"], Decimal("1680"))
+        self.assertEqual(main["month_out"], Decimal("50"))
+
+        top = [(c["category_name"], c["total"], c["count"]) for c in res.data["top_categories"]]
+        self.assertEqual(top, [("Fees", Decimal("230"), 2), ("Salary", Decimal("120"), 2)])
+
+    def test_staff_only_see_their_campuses(self):
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(self.url)
+        self.assertEqual([c["id"] for c in res.data["campuses"]], [self.campus.id])
+        self.assertEqual(res.data["totals"]["today_in"], Decimal("30"))
+        self.assertEqual(res.data["top_categories"][1]["total"], Decimal("50"))
+        self.assertEqual(self.client.get(self.url, {"campus": self.other_campus.id}).status_code, 403)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(self.url)
+        for _ in range(20):
+            self.add_txn(self.today, "1", category=Category.objects.create(name=f"C{Category.objects.count()}"))
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(self.url)
+        self.assertEqual(len(before), len(after))
+
+    def test_category_totals_follow_edits_and_rebuild(self):
+        txn = Transaction.objects.get(amount=Decimal("70"))
+        txn.category = self.category
+        txn.save()
+        Transaction.objects.filter(amount=Decimal("30")).delete()
+        expected = sorted(MonthlyCategoryTotal.objects.values_list(
+            "cash_book_id", "category_id", "month", "total_in", "total_out", "count"
+        ))
+
+        MonthlyCategoryTotal.objects.all().delete()
+        call_command("rebuild_category_totals", stdout=StringIO())
+        rebuilt = sorted(MonthlyCategoryTotal.objects.filter(count__gt=0).values_list(
+            "cash_book_id", "category_id", "month", "total_in", "total_out", "count"
+        ))
+        self.assertEqual(rebuilt, [row for row in expected if row[-1]])
+
+
+    def test_category_total_writes_lock_the_cash_book(self):
+        with mock.patch("transactions.balances.lock_cash_books", wraps=balances.lock_cash_books) as lock:
+            category_totals.apply_transaction(Transaction(
+                cash_book=self.cash_book, category=self.category, transaction_type="IN", amount=5, date=self.today,
+            ))
+        lock.assert_any_call([self.cash_book.id])
+
+
+class GenerateReportTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/generate_report/"
+
+    def test_excel_report_streams_rows_with_running_balance(self):
+        self.add_txn("2025-01-10", "200", remarks="Fees")
+        self.add_txn("2025-01-11", "50", "OUT")
+
+        res = self.client.post(self.url, {"format": "excel", "dateFilter": "all"}, format="json")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        workbook = load_workbook(BytesIO(b"".join(res.streaming_content)), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual([Decimal(cell.split(": ")[1]) for cell in rows[2][:3]], [200, 50, 150])
+        self.assertEqual(rows[5][:3], ("10:01:2025", "10:00:00", "Fees"))
+        self.assertEqual([row[10] for row in rows[5:]], [200, 150])
+
+    def test_pdf_report_repeats_header_and_carries_balance(self):
+        for i in range(60):
+            self.add_txn("2025-01-10", "10", time=f"09:{i:02d}")
+
+        res = self.client.post(self.url, {"format": "pdf", "dateFilter": "all"}, format="json")
+
+        self.assertEqual(res.status_code, 200)
+        pages = PdfReader(BytesIO(b"".join(res.streaming_content))).pages
+        self.assertEqual(len(pages), 2)
+        second = pages[1].extract_text()
+        self.assertIn("Sl. No.", second)
+        self.assertIn("Brought forward", second)
+        self.assertIn("Carried forward 600.00", second)
+
+
+    def test_reports_require_login_and_respect_scope(self):
+        self.add_txn("2025-01-10", "200")
+        self.add_txn("2025-01-10", "70", cash_book=self.other_book)
+        payload = {"format": "summary", "dateFilter": "all"}
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(self.url, payload, format="json").status_code, 401)
+
+        self.client.force_authenticate(self.staff)
+        res = self.client.post(self.url, payload, format="json")
+        self.assertEqual(res.data["totals"]["total_in"], Decimal("200"))
+        for extra in ({"campus": self.other_campus.id}, {"cash_book": self.other_book.id}):
+            res = self.client.post(self.url, {**payload, **extra}, format="json")
+            self.assertEqual(res.status_code, 403, extra)
+        res = self.client.post(self.url, {"format": "excel", "dateFilter": "all"}, format="json")
+        rows = list(load_workbook(BytesIO(b"".join(res.streaming_content)), read_only=True).active.iter_rows(
+            values_only=True
+        ))
+        self.assertEqual([row[10] for row in rows[5:]], [200])
+
+
+class ReportJobTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/report_jobs/"
+    payload = {"format": "excel", "dateFilter": "all"}
+
+    def setUp(self):
+        super().setUp()
+        artifact_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(artifact_dir.cleanup)
+        settings_override = override_settings(REPORT_ARTIFACT_DIR=artifact_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.add_txn("2025-01-10", "200")
+
+    def test_queue_render_and_download(self):
+        res = self.client.post(self.url, self.payload, format="json")
+        self.assertEqual(res.status_code, 202)
+        job_id = res.data["id"]
+
+        self.assertEqual(self.client.get(f"{self.url}{job_id}/download/").status_code, 409)
+        call_command("run_report_worker", "--once", stdout=StringIO())
+
+        res = self.client.get(f"{self.url}{job_id}/")
+        self.assertEqual((res.data["status"], res.data["row_count"]), ("DONE", 1))
+        res = self.client.get(f"{self.url}{job_id}/download/")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(b"".join(res.streaming_content).startswith(b"PK"))
+
+    def test_identical_requests_reuse_artifact_until_data_changes(self):
+        first = self.client.post(self.url, self.payload, format="json").data["id"]
+        self.assertEqual(self.client.post(self.url, self.payload, format="json").data["id"], first)
+        call_command("run_report_worker", "--once", stdout=StringIO())
+
+        other_admin = User.objects.create_user(mobile="9000000003", password="pass", role=self.admin_role)
+        self.client.force_authenticate(other_admin)
+        res = self.client.post(self.url, self.payload, format="json")
+        self.assertEqual(res.data["status"], "DONE")
+        self.assertEqual(ReportJob.objects.get(id=res.data["id"]).artifact, ReportJob.objects.get(id=first).artifact)
+
+        self.add_txn("2025-01-11", "5")
+        res = self.client.post(self.url, self.payload, format="json")
+        self.assertEqual((res.status_code, res.data["status"]), (202, "PENDING"))
+
+    def test_renames_invalidate_artifacts(self):
+        self.client.post(self.url, self.payload, format="json")
+        call_command("run_report_worker", "--once", stdout=StringIO())
+
+        self.category.name = "Tuition"
+        self.category.save()
+        res = self.client.post(self.url, self.payload, format="json")
+        self.assertEqual((res.status_code, res.data["status"]), (202, "PENDING"))
+
+    def test_expired_artifacts_are_deleted(self):
+        job_id = self.client.post(self.url, self.payload, format="json").data["id"]
+        call_command("run_report_worker", "--once", stdout=StringIO())
+        path = report_jobs.artifact_path(ReportJob.objects.get(id=job_id))
+
+        later = timezone.now() + report_jobs.ARTIFACT_TTL + datetime.timedelta(seconds=1)
+        self.assertEqual(report_jobs.delete_expired_artifacts(now=timezone.now()), 0)
+        self.assertEqual(report_jobs.delete_expired_artifacts(now=later), 1)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.client.get(f"{self.url}{job_id}/download/").status_code, 410)
+
+        # an expired job is rendered again rather than reused
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            res = self.client.post(self.url, self.payload, format="json")
+        self.assertEqual(res.data["status"], "PENDING")
+
+    def test_artifacts_are_not_shared_across_scopes(self):
+        self.add_txn("2025-01-10", "70", cash_book=self.other_book)
+        self.client.post(self.url, self.payload, format="json")
+        call_command("run_report_worker", "--once", stdout=StringIO())
+
+        self.client.force_authenticate(self.staff)
+        res = self.client.post(self.url, self.payload, format="json")
+        self.assertEqual((res.status_code, res.data["status"]), (202, "PENDING"))
+        call_command("run_report_worker", "--once", stdout=StringIO())
+        self.assertEqual(ReportJob.objects.get(id=res.data["id"]).row_count, 1)
+
+        res = self.client.post(self.url, {**self.payload, "campus": self.other_campus.id}, format="json")
+        self.assertEqual(res.status_code, 403)
+
+    def test_stale_running_job_is_requeued(self):
+        job_id = self.client.post(self.url, self.payload, format="json").data["id"]
+        self.assertEqual(report_jobs.claim_next_job().id, job_id)
+        # the worker died; the job is handed out again only after the timeout
+        self.assertIsNone(report_jobs.claim_next_job())
+        ReportJob.objects.filter(id=job_id).update(
+            started_at=timezone.now() - report_jobs.RUNNING_TIMEOUT - datetime.timedelta(seconds=1)
+        )
+        self.assertEqual(self.client.post(self.url, self.payload, format="json").data["status"], "PENDING")
+        call_command("run_report_worker", "--once", stdout=StringIO())
+        self.assertEqual(ReportJob.objects.get(id=job_id).status, ReportJob.STATUS_DONE)
+
+
+class SummaryTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/summary/"
+
+    def setUp(self):
+        super().setUp()
+        self.other_category = Category.objects.create(name="Salary")
+        self.add_txn("2025-01-10", "200")
+        self.add_txn("2025-01-10", "50", "OUT", category=self.other_category)
+        self.add_txn("2025-01-11", "30", "OUT", category=self.other_category)
+        self.add_txn("2025-01-11", "999", cash_book=self.other_book)
+
+    def test_grouped_totals_in_one_query(self):
+        self.client.force_authenticate(self.staff)
+        get_scope(self.staff)  # resolved once, then served from the cache
+        with self.assertNumQueries(1):
+            res = self.client.get(self.url, {"group_by": "category,day"})
+
+        self.assertEqual(res.status_code, 200)
+        groups = [
+            (g["category_name"], str(g["day"]), g["total_in"], g["total_out"], g["count"])
+            for g in res.data["groups"]
+        ]
+        self.assertEqual(groups, [
+            ("Fees", "2025-01-10", Decimal("200"), Decimal("0"), 1),
+            ("Salary", "2025-01-10", Decimal("0"), Decimal("50"), 1),
+            ("Salary", "2025-01-11", Decimal("0"), Decimal("30"), 1),
+        ])
+        self.assertEqual(res.data["totals"]["net"], Decimal("120"))
+
+    def test_unknown_group_is_rejected(self):
+        res = self.client.get(self.url, {"group_by": "campus"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_generate_report_summary_mode(self):
+        res = self.client.post(
+            "/api/transactions/generate_report/",
+            {"format": "summary", "dateFilter": "all", "group_by": ["cash_book"]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([g["cash_book_name"] for g in res.data["groups"]], ["Main Book", "Other Book"])
+        self.assertEqual(res.data["totals"]["count"], 4)
+
+
+class TransactionCursorPaginationTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/"
+
+    def setUp(self):
+        super().setUp()
+        for day in (1, 2, 3):
+            for hour in ("09:00", "10:00"):
+                self.add_txn(f"2025-01-0{day}", "10", time=hour)
+        # same date and time, told apart by id
+        self.add_txn("2025-01-02", "10", "OUT", time="10:00")
+
+    def test_walks_all_rows_newest_first_without_gaps(self):
+        seen, params = [], {"page_size": 3}
+        while True:
+            res = self.client.get(self.url, params)
+            self.assertEqual(res.status_code, 200)
+            seen.extend(row["id"] for row in res.data["results"])
+            if not res.data["next_cursor"]:
+                break
+            params = {"page_size": 3, "cursor": res.data["next_cursor"]}
+
+        expected = list(Transaction.objects.order_by("-date", "-time", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_filters_apply_to_every_page(self):
+        res = self.client.get(self.url, {"page_size": 1, "transaction_type": "OUT"})
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertIsNone(res.data["next"])
+
+    def test_unpaginated_without_params(self):
+        res = self.client.get(self.url)
+        self.assertEqual(len(res.data), 7)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, 404)
+
+    def test_cursor_follows_requested_ordering(self):
+        Transaction.objects.filter(time="09:00").update(amount=Decimal("25"))
+        for ordering, fields, expected in (
+            ("amount", "id,amount", Transaction.objects.order_by("amount", "id")),
+            ("-amount", "", Transaction.objects.order_by("-amount", "-id")),
+            ("date", "id", Transaction.objects.order_by("date", "time", "id")),
+        ):
+            seen, params = [], {"page_size": 2, "ordering": ordering, "fields": fields}
+            while True:
+                res = self.client.get(self.url, params)
+                self.assertEqual(res.status_code, 200, ordering)
+                seen.extend(row["id"] for row in res.data["results"])
+                if not res.data["next_cursor"]:
+                    break
+                params = {**params, "cursor": res.data["next_cursor"]}
+            self.assertEqual(seen, list(expected.values_list("id", flat=True)), ordering)
+
+        cursor = self.client.get(self.url, {"page_size": 2}).data["next_cursor"]
+        res = self.client.get(self.url, {"cursor": cursor, "ordering": "amount"})
+        self.assertEqual(res.status_code, 404)
+        res = self.client.get(self.url, {"page_size": 2, "ordering": "remarks"})
+        self.assertEqual(res.status_code, 400)
+
+
+class TransactionFilterTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/"
+
+    def setUp(self):
+        super().setUp()
+        self.salary = Category.objects.create(name="Salary")
+        self.first = self.add_txn("2025-01-10", "200", party_name="Ravi Traders", party_mobile_number="9876500001")
+        self.second = self.add_txn("2025-01-20", "50", "OUT", category=self.salary)
+        self.third = self.add_txn("2025-02-05", "900", cash_book=self.other_book, user=self.staff)
+
+    def ids(self, params):
+        res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, 200, res.data)
+        return sorted(row["id"] for row in res.data)
+
+    def test_date_bounds_and_named_ranges(self):
+        self.assertEqual(self.ids({"date_from": "2025-01-15", "date_to": "2025-01-31"}), [self.second.id])
+        today = datetime.date.today()
+        recent = self.add_txn(today.isoformat(), "10")
+        self.assertEqual(self.ids({"date_range": "today"}), [recent.id])
+        self.assertEqual(self.client.get(self.url, {"date_range": "someday"}).status_code, 400)
+
+    def test_in_filters_and_amount_range(self):
+        self.assertEqual(
+            self.ids({"category__in": f"{self.category.id},{self.salary.id}", "cash_book__in": self.cash_book.id}),
+            [self.first.id, self.second.id],
+        )
+        self.assertEqual(self.ids({"user__in": self.staff.id}), [self.third.id])
+        self.assertEqual(self.ids({"amount_min": "100", "amount_max": "500"}), [self.first.id])
+        self.assertEqual(self.ids({"campus": self.other_campus.id}), [self.third.id])
+
+    def test_party_filters(self):
+        self.assertEqual(self.ids({"party_name__contains": "ravi"}), [self.first.id])
+        self.assertEqual(self.ids({"party_mobile_number__startswith": "98765"}), [self.first.id])
+        self.assertEqual(self.ids({"has_party": "false"}), [self.second.id, self.third.id])
+
+    def test_ledger_uses_same_filters(self):
+        res = self.client.get(f"{self.url}ledger/", {"cash_book__in": self.cash_book.id, "date_to": "2025-01-31"})
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(res.data["total_in"], Decimal("200"))
+
+
+class TransactionSearchTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/"
+
+    def setUp(self):
+        super().setUp()
+        self.fees = self.add_txn("2025-01-10", "200", remarks="Hostel fees for March")
+        self.party = self.add_txn(
+            "2025-01-11", "50", "OUT", party_name="Ravi Traders", party_mobile_number="9876500001"
+        )
+
+    def ids(self, term):
+        res = self.client.get(self.url, {"search": term})
+        self.assertEqual(res.status_code, 200)
+        return sorted(row["id"] for row in res.data)
+
+    def test_matches_words_party_and_mobile_prefix(self):
+        self.assertEqual(self.ids("hostel"), [self.fees.id])
+        self.assertEqual(self.ids("Fee MAR"), [self.fees.id])
+        self.assertEqual(self.ids("ravi"), [self.party.id])
+        self.assertEqual(self.ids("98765"), [self.party.id])
+        self.assertEqual(self.ids("hostel ravi"), [])
+
+    def test_matches_substrings(self):
+        self.assertEqual(self.ids("ostel"), [self.fees.id])
+        self.assertEqual(self.ids("RCH"), [self.fees.id])
+        self.assertEqual(self.ids("raders"), [self.party.id])
+        self.assertEqual(self.ids("65000"), [self.party.id])
+        self.assertEqual(self.ids("ostel raders"), [])
+
+    def test_regex_search_matches_token_index(self):
+        # the query PostgreSQL runs must agree with the token index
+        terms = ["hostel", "Fee MAR", "ostel", "RCH", "ravi", "raders", "98765", "65000", "hostel ravi", "ostel raders"]
+        expected = {term: self.ids(term) for term in terms}
+        with mock.patch("transactions.search.uses_token_index", return_value=False):
+            self.assertEqual({term: self.ids(term) for term in terms}, expected)
+
+    def test_tokens_follow_edits_and_deletes(self):
+        self.fees.remarks = "Library deposit"
+        self.fees.save()
+        self.assertEqual(self.ids("hostel"), [])
+        self.assertEqual(self.ids("library"), [self.fees.id])
+
+        self.party.delete()
+        self.assertFalse(TransactionSearchToken.objects.filter(token="ravi").exists())
+
+    def test_rebuild_matches_incremental_tokens(self):
+        before = set(TransactionSearchToken.objects.values_list("transaction_id", "token"))
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(set(TransactionSearchToken.objects.values_list("transaction_id", "token")), before)
+
+
+class PartyDirectoryTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/parties/"
+
+    def setUp(self):
+        super().setUp()
+        for _ in range(3):
+            self.add_txn("2025-01-10", "10", party_name="Ravi Traders", party_mobile_number="9876500001")
+        self.add_txn("2025-01-12", "10", party_name="Rahim Stores")
+        self.add_txn("2025-01-15", "10", cash_book=self.other_book, party_name="Ravi Traders",
+                     party_mobile_number="9876500001")
+        self.add_txn("2025-01-16", "10")
+
+    def test_counts_follow_saves_and_deletes(self):
+        party = Party.objects.get(campus=self.campus, name="Ravi Traders")
+        self.assertEqual((party.usage_count, party.last_used), (3, datetime.date(2025, 1, 10)))
+
+        txn = Transaction.objects.filter(party_name="Rahim Stores").get()
+        txn.party_name = "Ravi Traders"
+        txn.party_mobile_number = "9876500001"
+        txn.save()
+        party.refresh_from_db()
+        self.assertEqual((party.usage_count, party.last_used), (4, datetime.date(2025, 1, 12)))
+        self.assertEqual(Party.objects.get(name="Rahim Stores").usage_count, 0)
+
+        txn.delete()
+        party.refresh_from_db()
+        self.assertEqual(party.usage_count, 3)
+
+    def test_autocomplete_ranks_by_use_and_respects_scope(self):
+        res = self.client.get(self.url, {"q": "ra"})
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual([(row["name"], row["usage_count"]) for row in res.data["results"]],
+                         [("Ravi Traders", 4), ("Rahim Stores", 1)])
+
+        self.assertEqual(self.client.get(self.url, {"q": "98765", "field": "mobile"}).data["count"], 1)
+        # an exact prefix match: LIKE wildcards in q are literal
+        self.assertEqual(self.client.get(self.url, {"q": "r_v"}).data["count"], 0)
+        self.assertEqual(self.client.get(self.url, {"q": "%"}).data["count"], 0)
+
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(self.url, {"q": "RAVI"})
+        self.assertEqual(res.data["results"][0]["usage_count"], 3)
+
+    def test_fields_on_grouped_directory(self):
+        res = self.client.get(self.url, {"q": "ra", "fields": "name"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["results"], [{"name": "Ravi Traders"}, {"name": "Rahim Stores"}])
+
+    def test_parties_action_reads_directory(self):
+        with self.assertNumQueries(1):
+            res = self.client.get("/api/transactions/transactions/parties/")
+        self.assertEqual(res.data, {"names": ["Rahim Stores", "Ravi Traders"], "mobiles": ["9876500001"]})
+
+    def test_rebuild_matches_incremental_state(self):
+        fields = ("key", "usage_count", "last_used")
+        before = sorted(Party.objects.values_list(*fields))
+        call_command("rebuild_parties", stdout=StringIO())
+        self.assertEqual(sorted(Party.objects.values_list(*fields)), before)
+
+
+class BulkImportTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/import/"
+
+    def upload(self, name, content, **params):
+        file = SimpleUploadedFile(name, content)
+        query = "".join(f"?{key}={value}" for key, value in params.items())
+        return self.client.post(self.url + query, {"file": file}, format="multipart")
+
+    def test_csv_import_reports_bad_rows_and_updates_derived_data(self):
+        content = (
+            "date,time,transaction_type,amount,category,payment_mode,cash_book,remarks,party_name\n"
+            "2025-01-10,09:30,IN,200,Fees,Cash,Main Book,Hostel fees,Ravi Traders\n"
+            "11:01:2025,10:00,Cash Out,50.5,fees,cash,%d,,\n"
+            "2025-01-12,10:00,IN,-5,Unknown,Cash,Main Book,,\n"
+        ) % self.cash_book.id
+        res = self.upload("entries.csv", content.encode())
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual((res.data["created"], res.data["error_count"]), (2, 1))
+        self.assertEqual(res.data["errors"][0]["row"], 3)
+        self.assertEqual(set(res.data["errors"][0]["errors"]), {"amount", "category"})
+
+        self.assertEqual(balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 31)), Decimal("149.50"))
+        self.assertTrue(TransactionSearchToken.objects.filter(token="hostel").exists())
+        self.assertEqual(Party.objects.get(name="Ravi Traders").usage_count, 1)
+
+    def test_xlsx_import_and_dry_run(self):
+        wb = Workbook()
+        wb.active.append(["Date", "Time", "Transaction_Type", "Amount", "Category", "Payment_Mode", "Cash_Book"])
+        wb.active.append([datetime.datetime(2025, 1, 10), datetime.time(9, 0), "OUT", 75, "Fees", "Cash", "Main Book"])
+        buffer = BytesIO()
+        wb.save(buffer)
+
+        res = self.upload("entries.xlsx", buffer.getvalue(), dry_run="true")
+        self.assertEqual((res.status_code, res.data["valid"], res.data["created"]), (200, 1, 0))
+        self.assertFalse(Transaction.objects.exists())
+
+        res = self.upload("entries.xlsx", buffer.getvalue())
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(Transaction.objects.get().amount, Decimal("75.00"))
+
+    def test_json_body_respects_campus_scope(self):
+        self.client.force_authenticate(self.staff)
+        row = {"date": "2025-01-10", "time": "09:00", "transaction_type": "IN", "amount": "10",
+               "category": self.category.id, "payment_mode": self.mode.id}
+        res = self.client.post(
+            self.url, [dict(row, cash_book=self.cash_book.id), dict(row, cash_book=self.other_book.id)], format="json"
+        )
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["errors"], [{"row": 2, "errors": {
+            "cash_book": "You are not allowed to add transactions for this campus."
+        }}])
+        self.assertEqual(Transaction.objects.get().user, self.staff)
+
+    def test_rejects_unknown_file_type(self):
+        self.assertEqual(self.upload("entries.txt", b"hello").status_code, 400)
+
+
+class BulkActionTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/"
+
+    def setUp(self):
+        super().setUp()
+        self.salary = Category.objects.create(name="Salary")
+        self.first = self.add_txn("2025-01-10", "100", remarks="hostel fees", party_name="Ravi Traders")
+        self.second = self.add_txn("2025-01-11", "40", "OUT", party_name="Ravi Traders")
+        self.third = self.add_txn("2025-01-12", "500", cash_book=self.other_book)
+
+    def post(self, action, data):
+        return self.client.post(f"{self.url}{action}/", data, format="json")
+
+    def test_bulk_update_by_ids_moves_balances_parties_and_tokens(self):
+        res = self.post("bulk_update", {
+            "ids": [self.first.id, self.second.id],
+            "changes": {"cash_book": self.other_book.id, "category": self.salary.id, "remarks": "mess bill"},
+        })
+        self.assertEqual(res.data, {"updated": 2})
+        self.assertEqual(set(Transaction.objects.values_list("cash_book_id", flat=True)), {self.other_book.id})
+        self.assertEqual(Transaction.objects.filter(category=self.salary).count(), 2)
+
+        self.assertEqual(balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 31)), Decimal("0"))
+        self.assertEqual(balances.balance_as_of(self.other_book.id, datetime.date(2025, 1, 31)), Decimal("560"))
+        self.assertEqual(Party.objects.get(campus=self.campus).usage_count, 0)
+        self.assertEqual(Party.objects.get(campus=self.other_campus).usage_count, 2)
+        self.assertFalse(TransactionSearchToken.objects.filter(token="hostel").exists())
+        self.assertEqual(TransactionSearchToken.objects.filter(token="mess").count(), 2)
+
+    def test_bulk_update_by_filters(self):
+        res = self.post("bulk_update", {
+            "filters": {"category": self.category.id, "date_to": "2025-01-11"},
+            "changes": {"category": self.salary.id},
+        })
+        self.assertEqual(res.data, {"updated": 2})
+        self.assertEqual(Transaction.objects.get(category=self.category), self.third)
+
+    def test_bulk_update_rejects_unknown_fields_and_foreign_ids(self):
+        res = self.post("bulk_update", {"ids": [self.first.id], "changes": {"amount": "1"}})
+        self.assertEqual(res.status_code, 400)
+
+        self.client.force_authenticate(self.staff)
+        res = self.post("bulk_update", {"ids": [self.first.id, self.third.id], "changes": {"remarks": "x"}})
+        self.assertEqual(res.status_code, 403)
+        res = self.post("bulk_update", {"ids": [self.first.id], "changes": {"cash_book": self.other_book.id}})
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(Transaction.objects.get(id=self.first.id).remarks, "hostel fees")
+
+    def test_bulk_delete(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.post("bulk_delete", {"filters": {"cash_book": self.cash_book.id}})
+        self.assertEqual(res.data, {"deleted": 2})
+        self.assertEqual(list(Transaction.objects.all()), [self.third])
+        self.assertEqual(balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 31)), Decimal("0"))
+        self.assertFalse(
+            MonthlyCategoryTotal.objects.filter(cash_book=self.cash_book).exclude(count=0).exists()
+        )
+        self.assertEqual(Party.objects.get(name="Ravi Traders").usage_count, 0)
+        self.assertFalse(TransactionSearchToken.objects.filter(transaction_id=self.first.id).exists())
+
+        self.assertEqual(self.post("bulk_delete", {}).status_code, 400)
+        self.assertLess(len(queries), 20)
+
+
+    def derived_state(self):
+        # rows left empty by a delta are not written by a rebuild
+        days = DailyCashBookBalance.objects.exclude(total_in=0, total_out=0).order_by("cash_book_id", "date")
+        months = MonthlyCategoryTotal.objects.exclude(count=0).order_by("cash_book_id", "category_id", "month")
+        return (
+            list(days.values_list("cash_book_id", "date", "total_in", "total_out", "closing_balance")),
+            list(months.values_list("cash_book_id", "category_id", "month", "total_in", "total_out", "count")),
+        )
+
+    def test_bulk_update_applies_deltas_instead_of_rebuilding(self):
+        self.add_txn("2025-01-20", "60", cash_book=self.other_book)
+        with mock.patch("transactions.balances.rebuild") as rebuild_balances, \
+                mock.patch("transactions.category_totals.rebuild") as rebuild_totals:
+            self.post("bulk_update", {
+                "ids": [self.first.id, self.second.id],
+                "changes": {"date": "2025-01-15", "cash_book": self.other_book.id, "category": self.salary.id},
+            })
+        rebuild_balances.assert_not_called()
+        rebuild_totals.assert_not_called()
+
+        incremental = self.derived_state()
+        balances.rebuild()
+        category_totals.rebuild()
+        self.assertEqual(incremental, self.derived_state())
+
+    def test_bulk_writes_only_the_snapshotted_rows(self):
+        late = []
+
+        def add_matching_row(*args, **kwargs):
+            if not late:
+                late.append(None)
+                late[0] = self.add_txn("2025-01-10", "7", party_name="Late")
+
+        queryset = Transaction.objects.filter(cash_book=self.cash_book)
+        with mock.patch("transactions.parties.apply_uses", side_effect=add_matching_row):
+            self.assertEqual(bulk.update_transactions(queryset, {"party_name": "Moved"}), 2)
+        late[0].refresh_from_db()
+        self.assertEqual(late[0].party_name, "Late")
+
+        late.clear()
+        with mock.patch("transactions.parties.apply_uses", side_effect=add_matching_row):
+            self.assertEqual(bulk.delete_transactions(queryset), 3)
+        self.assertTrue(Transaction.objects.filter(id=late[0].id).exists())
+        self.assertEqual(balances.balance_as_of(self.cash_book.id, datetime.date(2025, 1, 31)), Decimal("7"))
+
+
+class CategoryCashBookTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/categories/"
+
+    def setUp(self):
+        super().setUp()
+        self.salary = Category.objects.create(name="Salary")
+        self.salary.cash_books.set([self.cash_book])
+        self.rent = Category.objects.create(name="Rent")
+        self.rent.cash_books.set([self.other_book])
+
+    def test_filter_by_cash_book_includes_unrestricted_categories(self):
+        res = self.client.get(self.url, {"cash_book": self.cash_book.id, "details": "false"})
+        self.assertEqual([c["name"] for c in res.data], ["Fees", "Salary"])
+        res = self.client.get(self.url, {"cash_book": self.other_book.id})
+        self.assertEqual([c["name"] for c in res.data], ["Fees", "Rent"])
+
+    def test_cash_book_map_is_cached_until_categories_change(self):
+        url = f"{self.url}cash_book_map/"
+        res = self.client.get(url)
+        self.assertEqual(res.data, {
+            "cash_books": {str(self.cash_book.id): [self.salary.id], str(self.other_book.id): [self.rent.id]},
+            "unrestricted": [self.category.id],
+        })
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"]).status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+        self.category.cash_books.set([self.other_book])
+        res = self.client.get(url)
+        self.assertEqual(res.data["cash_books"][str(self.other_book.id)], [self.category.id, self.rent.id])
+        self.assertEqual(res.data["unrestricted"], [])
+
+
+class SyncFeedTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/sync/"
+
+    def setUp(self):
+        super().setUp()
+        self.first = self.add_txn("2025-01-10", "100")
+        self.second = self.add_txn("2025-01-11", "40", "OUT")
+        self.third = self.add_txn("2025-01-12", "500", cash_book=self.other_book)
+        # outside the overlap window, so later syncs only return new changes
+        Transaction.objects.update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+
+    def sync(self, since=None, **params):
+        if since:
+            params["since"] = since
+        res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def test_full_sync_pages_through_visible_rows(self):
+        page = self.sync(limit=2)
+        self.assertTrue(page["has_more"])
+        self.assertEqual([row["id"] for row in page["changed"]], [self.first.id, self.second.id])
+        self.assertEqual(page["deleted"], [])
+
+        page = self.sync(page["sync_token"], limit=2)
+        self.assertFalse(page["has_more"])
+        self.assertEqual([row["id"] for row in page["changed"]], [self.third.id])
+
+        self.client.force_authenticate(self.staff)
+        self.assertEqual({row["id"] for row in self.sync()["changed"]}, {self.first.id, self.second.id})
+
+    def test_sync_returns_changes_and_deletions_since_token(self):
+        token = self.sync()["sync_token"]
+        self.assertEqual(self.sync(token)["changed"], [])
+
+        self.first.remarks = "edited"
+        self.first.save()
+        deleted_id = self.second.id
+        self.second.delete()
+        added = self.add_txn("2025-01-13", "10")
+
+        page = self.sync(token)
+        self.assertEqual([row["id"] for row in page["changed"]], [self.first.id, added.id])
+        self.assertEqual(page["changed"][0]["remarks"], "edited")
+        self.assertEqual(page["deleted"], [deleted_id])
+
+    def test_sync_covers_bulk_actions_and_scope(self):
+        self.client.force_authenticate(self.staff)
+        token = self.sync()["sync_token"]
+
+        self.client.force_authenticate(self.admin)
+        self.client.post(
+            "/api/transactions/transactions/bulk_update/",
+            {"ids": [self.first.id], "changes": {"remarks": "bulk"}}, format="json",
+        )
+        self.client.post(
+            "/api/transactions/transactions/bulk_delete/", {"ids": [self.second.id, self.third.id]}, format="json",
+        )
+        self.assertEqual(TransactionTombstone.objects.count(), 2)
+
+        self.client.force_authenticate(self.staff)
+        page = self.sync(token)
+        self.assertEqual([row["id"] for row in page["changed"]], [self.first.id])
+        self.assertEqual(page["deleted"], [self.second.id])
+
+    def test_rows_leaving_the_users_cash_books_are_deleted(self):
+        self.client.force_authenticate(self.staff)
+        token = self.sync()["sync_token"]
+
+        self.first.cash_book = self.other_book
+        self.first.save()
+        self.client.force_authenticate(self.admin)
+        self.client.post(
+            "/api/transactions/transactions/bulk_update/",
+            {"ids": [self.second.id], "changes": {"cash_book": self.other_book.id}}, format="json",
+        )
+        self.assertEqual(self.sync(self.sync()["sync_token"])["deleted"], [])
+
+        self.client.force_authenticate(self.staff)
+        page = self.sync(token)
+        self.assertEqual(page["changed"], [])
+        self.assertEqual(page["deleted"], [self.first.id, self.second.id])
+        self.assertFalse(page["reset"])
+
+    def test_move_between_visible_books_is_not_a_deletion(self):
+        token = self.sync()["sync_token"]
+        self.first.cash_book = self.other_book
+        self.first.save()
+        page = self.sync(token)
+        self.assertEqual([row["id"] for row in page["changed"]], [self.first.id])
+        self.assertEqual(page["deleted"], [])
+
+    def test_scope_change_resets_the_client(self):
+        self.client.force_authenticate(self.staff)
+        token = self.sync()["sync_token"]
+
+        self.staff.off_campuses.set([self.other_campus])
+        self.staff = User.objects.get(pk=self.staff.pk)
+        self.client.force_authenticate(self.staff)
+        page = self.sync(token)
+        self.assertTrue(page["reset"])
+        self.assertEqual([row["id"] for row in page["changed"]], [self.third.id])
+        self.assertFalse(self.sync(page["sync_token"])["reset"])
+
+    def test_bulk_writes_restamp_rows_at_the_end(self):
+        started = timezone.now()
+        with mock.patch("transactions.sync.restamp", wraps=sync.restamp) as restamp:
+            bulk.update_transactions(Transaction.objects.filter(id=self.first.id), {"remarks": "late"})
+        restamp.assert_called_once()
+        self.assertGreaterEqual(Transaction.objects.get(id=self.first.id).updated_at, started)
+
+    def test_invalid_token(self):
+        res = self.client.get(self.url, {"since": "not-a-token"})
+        self.assertEqual(res.status_code, 400)
+
+
+class SparseFieldsTests(TransactionTestMixin, TestCase):
+    def test_transaction_fields_with_cursor_pages(self):
+        for day in range(1, 4):
+            self.add_txn(f"2025-01-0{day}", "10")
+        url = "/api/transactions/transactions/"
+        res = self.client.get(url, {"fields": "id,date,amount,category_name", "page_size": 2})
+        self.assertEqual(res.data["results"][0], {
+            "id": res.data["results"][0]["id"], "date": "03:01:2025", "amount": "10.00", "category_name": "Fees",
+        })
+        res = self.client.get(url, {"fields": "id,date", "cursor": res.data["next_cursor"]})
+        self.assertEqual([row["date"] for row in res.data["results"]], ["01:01:2025"])
+
+    def test_reference_data_fields(self):
+        res = self.client.get("/api/transactions/cash_books/", {"fields": "id,campus_name"})
+        self.assertEqual(res.data[0], {"id": self.cash_book.id, "campus_name": "Main Campus"})
+        res = self.client.get("/api/transactions/categories/", {"fields": "name,cash_books"})
+        self.assertEqual(res.data, [{"name": "Fees", "cash_books": []}])
+
+    def test_projection_matches_full_serializer(self):
+        self.add_txn("2025-01-02", "10")
+        url = "/api/transactions/transactions/"
+        fields = ["date", "amount", "transaction_type", "transaction_label", "user_id"]
+        full = self.client.get(url).data[0]
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, {"fields": ",".join(fields)})
+        self.assertEqual(res.data, [{name: full[name] for name in fields}])
+        sql = [q["sql"] for q in queries if 'FROM "transactions_transaction"' in q["sql"]][-1]
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn('"remarks"', sql)
+
+    def test_omit_and_unknown_fields(self):
+        self.add_txn("2025-01-02", "10")
+        url = "/api/transactions/transactions/"
+        row = self.client.get(url, {"omit": "remarks,category_name"}).data[0]
+        self.assertNotIn("remarks", row)
+        self.assertNotIn("category_name", row)
+        self.assertIn("transaction_label", row)
+        res = self.client.get(url, {"fields": "date,nope"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_ledger_fields(self):
+        self.add_txn("2025-01-02", "10")
+        self.add_txn("2025-01-03", "5")
+        res = self.client.get("/api/transactions/transactions/ledger/", {
+            "fields": "date,amount,transaction_type,running_balance", "include_ob": "false",
+        })
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [set(row) for row in res.data["results"]],
+            [{"date", "amount", "transaction_type", "running_balance"}] * 2,
+        )
+        self.assertEqual([row["running_balance"] for row in res.data["results"]], ["15.00", "10.00"])
+        res = self.client.get("/api/transactions/transactions/ledger/", {"omit": "remarks", "include_ob": "false"})
+        self.assertNotIn("remarks", res.data["results"][0])
+
+
+COLUMNAR = "application/vnd.mueeniyya.columnar+json"
+
+
+def decode_columnar(table):
+    rows = [{} for _ in range(table["length"])]
+    for name, column in table["columns"].items():
+        dictionary = table["dictionaries"].get(name)
+        for row, value in zip(rows, column):
+            if dictionary is None:
+                row[name] = value
+            else:
+                row.update({key: values[value] for key, values in dictionary.items()})
+    return rows
+
+
+class ColumnarRendererTests(TransactionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        rent = Category.objects.create(name="Rent")
+        for day in range(1, 9):
+            self.add_txn(f"2025-01-0{day}", "10", category=rent if day % 2 else self.category, remarks="")
+
+    def test_list_round_trips(self):
+        url = "/api/transactions/transactions/"
+        plain = self.client.get(url, {"page_size": 5})
+        res = self.client.get(url, {"page_size": 5}, HTTP_ACCEPT=COLUMNAR)
+        self.assertEqual(res["Content-Type"], COLUMNAR)
+
+        body = json.loads(res.content)
+        self.assertEqual(body["next_cursor"], plain.data["next_cursor"])
+        self.assertEqual(body["results"]["dictionaries"]["category"]["category_name"], ["Fees", "Rent"])
+        self.assertEqual(body["results"]["dictionaries"]["user"], {"user_id": [self.admin.id], "user_name": ["Admin"]})
+        self.assertEqual(decode_columnar(body["results"]), json.loads(json.dumps(plain.data["results"])))
+        self.assertLess(len(res.content), len(plain.content) / 1.5)
+
+    def test_ledger_and_projection(self):
+        url = "/api/transactions/transactions/ledger/"
+        params = {"include_ob": "false", "fields": "date,amount,category,category_name,running_balance"}
+        plain = self.client.get(url, params)
+        body = json.loads(self.client.get(url, params, HTTP_ACCEPT=COLUMNAR).content)
+        self.assertEqual(body["total_in"], json.loads(plain.content)["total_in"])
+        self.assertEqual(set(body["results"]["columns"]), {"date", "amount", "category", "running_balance"})
+        self.assertEqual(decode_columnar(body["results"]), json.loads(json.dumps(plain.data["results"])))
+
+    def test_unpaginated_list_and_errors(self):
+        url = "/api/transactions/transactions/"
+        body = json.loads(self.client.get(url, {"format": "columnar", "fields": "id"}).content)
+        self.assertEqual(body["length"], 8)
+        self.assertEqual(body["dictionaries"], {})
+        res = self.client.get(url, {"fields": "nope"}, HTTP_ACCEPT=COLUMNAR)
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("error", json.loads(res.content))
+
+
+    def test_only_row_list_actions_offer_columnar(self):
+        renderer = ColumnarJSONRenderer()
+        self.assertEqual(json.loads(renderer.render(["Invalid row."])), ["Invalid row."])
+        self.assertEqual(json.loads(renderer.render({"results": ["a", "b"]})), {"results": ["a", "b"]})
+
+        res = self.client.get("/api/transactions/transactions/parties/", HTTP_ACCEPT=COLUMNAR)
+        self.assertEqual(res.status_code, 406)
+        res = self.client.get(f"/api/transactions/transactions/{Transaction.objects.first().id}/", {"format": "columnar"})
+        self.assertEqual(res.status_code, 404)
+        res = self.client.get("/api/transactions/transactions/sync/", HTTP_ACCEPT=COLUMNAR)
+        self.assertEqual(json.loads(res.content)["changed"]["length"], 8)
+
+
+class CompressionMiddlewareTests(TransactionTestMixin, TestCase):
+    url = "/api/transactions/transactions/"
+
+    def setUp(self):
+        super().setUp()
+        for day in range(1, 9):
+            self.add_txn(f"2025-01-0{day}", "10")
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(res.content)), json.loads(plain.content))
+
+    def test_brotli_preferred_when_available(self):
+        fake = mock.Mock(compress=lambda data, quality: b"br:" + gzip.compress(data))
+        with mock.patch("mueeniyya.middleware.brotli", fake):
+            res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+            self.assertEqual(res["Content-Encoding"], "br")
+            self.assertTrue(res.content.startswith(b"br:"))
+        res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+
+    def test_q_zero_refuses_an_encoding(self):
+        fake = mock.Mock(compress=lambda data, quality: b"br:" + gzip.compress(data))
+        with mock.patch("mueeniyya.middleware.brotli", fake):
+            res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0.5, br;q=0")
+            self.assertEqual(res["Content-Encoding"], "gzip")
+            res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="br;q=0.8, gzip;q=0")
+            self.assertEqual(res["Content-Encoding"], "br")
+        res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+
+class TransactionQueryCountTests(TransactionTestMixin, TestCase):
+    def list_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params or {})
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.client.force_authenticate(self.staff)
+        get_scope(self.staff)
+        for url, params in (
+            ("/api/transactions/transactions/", None),
+            ("/api/transactions/transactions/", {"page_size": 50}),
+            ("/api/transactions/transactions/ledger/", None),
+        ):
+            Transaction.objects.all().delete()
+            for _ in range(2):
+                self.add_txn("2025-01-10", "10")
+            few = self.list_queries(url, params)
+
+            for _ in range(20):
+                category = Category.objects.create(name=f"Category {Category.objects.count()}")
+                self.add_txn("2025-01-11", "10", category=category)
+            many = self.list_queries(url, params)
+
+            self.assertEqual(few, many, url)
+
+    def test_category_query_count_does_not_grow_with_rows(self):
+        for params in (None, {"details": "false"}):
+            Category.objects.all().delete()
+            Category.objects.create(name="Fees").cash_books.set([self.cash_book])
+            cache.clear()
+            few = self.list_queries("/api/transactions/categories/", params)
+
+            for i in range(10):
+                book, _ = CashBook.objects.get_or_create(name=f"Book {i}", campus=self.other_campus)
+                Category.objects.create(name=f"Category {i}").cash_books.set([self.cash_book, book])
+            cache.clear()
+            many = self.list_queries("/api/transactions/categories/", params)
+
+            self.assertEqual(few, many, params)
+
+        res = self.client.get("/api/transactions/categories/", {"details": "false"})
+        self.assertEqual(set(res.data[0]), {"id", "name", "is_active", "cash_books"})
+        self.assertEqual(len(res.data[0]["cash_books"]), 2)
+
+    def test_report_query_count_does_not_grow_with_rows(self):
+        def report_queries():
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    "/api/transactions/generate_report/", {"format": "excel", "dateFilter": "all"}, format="json"
+                )
+                b"".join(res.streaming_content)
+            return len(queries)
+
+        self.add_txn("2025-01-10", "10")
+        few = report_queries()
+        for _ in range(30):
+            self.add_txn("2025-01-11", "10")
+        self.assertEqual(report_queries(), few)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, PaymentModeViewSet, TransactionViewSet, OpeningBalanceViewSet, CashBookViewSet, generate_report
+from .views import CategoryViewSet, PaymentModeViewSet, TransactionViewSet, OpeningBalanceViewSet, CashBookViewSet, ReportJobViewSet, PartyViewSet, dashboard, generate_report
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
@@ -8,8 +8,12 @@ router.register(r'payment_modes', PaymentModeViewSet, basename='payment_mode')
 router.register(r'transactions', TransactionViewSet, basename='transaction')
 router.register(r'opening_balances', OpeningBalanceViewSet, basename='opening_balance')
 router.register(r'cash_books', CashBookViewSet, basename='cash_book')
+router.register(r'report_jobs', ReportJobViewSet, basename='report_job')
+router.register(r'parties', PartyViewSet, basename='party')
 
 urlpatterns = [
     path('', include(router.urls)),
     path("generate_report/", generate_report, name="generate_report"),
+    path("dashboard/", dashboard, name="dashboard"),
+    path("summary/", TransactionViewSet.as_view({"get": "summary"}), name="transaction_summary"),
 ]
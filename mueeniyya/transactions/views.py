@@ -1,57 +1,108 @@
-from rest_framework import viewsets, permissions, filters, status
-from .models import Category, PaymentMode, Transaction, OpeningBalance, CashBook
-from .serializers import CategorySerializer, PaymentModeSerializer, TransactionSerializer, OpeningBalanceSerializer, CashBookSerializer
+from rest_framework import viewsets, mixins, permissions, filters, status
+from .models import Category, PaymentMode, Transaction, OpeningBalance, CashBook, ReportJob
+from .serializers import CategorySerializer, CategoryIdsSerializer, PaymentModeSerializer, TransactionSerializer, OpeningBalanceSerializer, CashBookSerializer, LedgerEntrySerializer, ReportJobSerializer, PartySerializer
+from .pagination import LedgerPagination, TransactionCursorPagination
+from .renderers import ColumnarJSONRenderer
+from .filters import CategoryFilter, TransactionFilter, TransactionSearchFilter
+from . import bulk, imports, kpis, ledger, parties, reports, report_jobs, sync
 from django_filters.rest_framework import DjangoFilterBackend
-from io import BytesIO
-import pandas as pd
-from xhtml2pdf import pisa
-from django.template.loader import render_to_string
-from django.db.models import Q
-import datetime
-from rest_framework.decorators import api_view, action
+from django.db.models import Prefetch, Q
+import csv
+import zipfile
+from rest_framework.decorators import api_view, action, permission_classes
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.exceptions import PermissionDenied
+from accounts.fields import SparseFieldsMixin
+from accounts.response_cache import CachedResponseMixin
+from accounts.scope import get_scope
 from rest_framework.response import Response
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all().order_by('name')
+from django.http import FileResponse
+class CategoryViewSet(CachedResponseMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    """
+    Categories with their cash books. `?details=false` returns only the
+    cash book ids, for clients that just need the mapping, and
+    `?cash_book=<id>` only the categories usable in that cash book.
+    """
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CategoryFilter
+    cache_namespace = "categories"
+    cache_per_scope = False
 
-class PaymentModeViewSet(viewsets.ModelViewSet):
+    def ids_only(self):
+        return self.action in ("list", "retrieve") and self.request.query_params.get("details") == "false"
+
+    def get_queryset(self):
+        if self.ids_only():
+            cash_books = CashBook.objects.only('id')
+        else:
+            # cash_books_details reads campus.name
+            cash_books = CashBook.objects.select_related('campus')
+        return Category.objects.prefetch_related(Prefetch('cash_books', queryset=cash_books)).order_by('name')
+
+    def get_serializer_class(self):
+        if self.ids_only():
+            return CategoryIdsSerializer
+        return CategorySerializer
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
+    def cash_book_map(self, request):
+        """
+        Category ids usable in each cash book, as
+        `{"cash_books": {"<cash book id>": [category ids]}, "unrestricted": [category ids]}`;
+        unrestricted categories apply to every cash book. Two queries,
+        cached until a category or cash book changes.
+        """
+        return self.cached_response(request, lambda: Response(category_cash_book_map()))
+
+def category_cash_book_map():
+    through = Category.cash_books.through
+    cash_books = {}
+    limited = set()
+    for cash_book_id, category_id in through.objects.order_by("category__name").values_list(
+        "cashbook_id", "category_id"
+    ):
+        cash_books.setdefault(str(cash_book_id), []).append(category_id)
+        limited.add(category_id)
+    unrestricted = [
+        category_id for category_id in Category.objects.order_by("name").values_list("id", flat=True)
+        if category_id not in limited
+    ]
+    return {"cash_books": cash_books, "unrestricted": unrestricted}
+
+class PaymentModeViewSet(CachedResponseMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = PaymentMode.objects.all().order_by('name')
     serializer_class = PaymentModeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_namespace = "payment_modes"
+    cache_per_scope = False
 
-class CashBookViewSet(viewsets.ModelViewSet):
+class CashBookViewSet(CachedResponseMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = CashBookSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_namespace = "cash_books"
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['campus', 'is_active']
     search_fields = ['name']
     ordering_fields = ['name', 'created_at']
 
     def get_queryset(self):
-        user = self.request.user
+        user_scope = get_scope(self.request.user)
 
         # Admin → full access
-        if user.is_superuser or (user.role and user.role.name.lower() == "admin"):
+        if user_scope.is_admin:
             return CashBook.objects.all().order_by('name')
 
         # Staff → only their assigned campuses
-        return CashBook.objects.filter(campus__in=user.off_campuses.all()).order_by('name')
+        return CashBook.objects.filter(campus_id__in=user_scope.campus_ids).order_by('name')
 
     def perform_create(self, serializer):
-        user = self.request.user
         campus = serializer.validated_data.get("campus")
 
         # Staff → only allowed to create CashBooks within their campuses
-        if not (user.is_superuser or (user.role and user.role.name.lower() == "admin")):
-            if campus not in user.off_campuses.all():
-                return Response(
-                    {"error": "You are not allowed to add CashBooks for this campus."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not get_scope(self.request.user).allows_campus(campus.id if campus else None):
+            raise PermissionDenied("You are not allowed to add CashBooks for this campus.")
 
         serializer.save()
 
@@ -72,50 +123,55 @@ class CashBookViewSet(viewsets.ModelViewSet):
             )
 
         # Staff → ensure only within assigned campuses
-        user = request.user
-        if not (user.is_superuser or (user.role and user.role.name.lower() == "admin")):
-            if instance.campus not in user.off_campuses.all():
-                return Response(
-                    {"error": "You are not allowed to delete this CashBook."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not get_scope(request.user).allows_campus(instance.campus_id):
+            return Response(
+                {"error": "You are not allowed to delete this CashBook."},
+                status=status.HTTP_403_FORBIDDEN
+            )
 
         instance.delete()
         return Response({"success": "Cash Book deleted successfully"}, status=status.HTTP_200_OK)
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = [
-        'transaction_type', 'category', 'payment_mode', 'cash_book', 'user', 'date'
-    ]
-    search_fields = ['remarks']
+    pagination_class = TransactionCursorPagination
+    filter_backends = [DjangoFilterBackend, TransactionSearchFilter, filters.OrderingFilter]
+    filterset_class = TransactionFilter
     ordering_fields = ['date', 'amount']
+    # the actions that return row lists
+    columnar_actions = {"list", "ledger", "sync"}
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if getattr(self, "action", None) in self.columnar_actions:
+            renderers.append(ColumnarJSONRenderer())
+        return renderers
 
     def get_queryset(self):
-        user = self.request.user
+        user_scope = get_scope(self.request.user)
+
+        # Name lookups in TransactionSerializer read these relations
+        queryset = Transaction.objects.select_related('user', 'category', 'payment_mode', 'cash_book')
 
         # Admin → full access
-        if user.is_superuser or (user.role and user.role.name.lower() == "admin"):
-            return Transaction.objects.all().order_by('-date', '-time')
+        if user_scope.is_admin:
+            return queryset.order_by('-date', '-time')
 
-        # Staff → filter transactions by assigned campuses
-        return Transaction.objects.filter(
-            cash_book__campus__in=user.off_campuses.all()
+        # Staff → filter transactions by the cash books of assigned campuses
+        return queryset.filter(
+            cash_book_id__in=user_scope.cash_book_ids
         ).order_by('-date', '-time')
 
     def perform_create(self, serializer):
-        import datetime
-        from rest_framework.exceptions import PermissionDenied
-
         user = self.request.user
         cash_book = serializer.validated_data.get("cash_book")
         date = serializer.validated_data.get("date")
 
-        if not (user.is_superuser or (user.role and user.role.name.lower() == "admin")):
+        user_scope = get_scope(user)
+        if not user_scope.is_admin:
             # Check campus access
-            if not cash_book or cash_book.campus not in user.off_campuses.all():
+            if not cash_book or not user_scope.allows_cash_book(cash_book.id):
                 raise PermissionDenied("You are not allowed to add transactions for this campus.")
 
             # Prevent staff from adding past transactions
@@ -131,221 +187,359 @@ class TransactionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
     def parties(self, request):
         """
-        Returns distinct party names and mobile numbers for dropdowns.
+        Returns distinct party names and mobile numbers for dropdowns, read
+        from the Party directory rather than the transaction history.
         """
-        user = request.user
-        queryset = self.get_queryset()
-
-        names = (
-            queryset.exclude(party_name__isnull=True)
-            .exclude(party_name__exact="")
-            .values_list("party_name", flat=True)
-            .distinct()
-        )
-        mobiles = (
-            queryset.exclude(party_mobile_number__isnull=True)
-            .exclude(party_mobile_number__exact="")
-            .values_list("party_mobile_number", flat=True)
-            .distinct()
-        )
+        visible = parties.autocomplete(get_scope(request.user))
+        names = {row["name"] for row in visible if row["name"]}
+        mobiles = {row["mobile_number"] for row in visible if row["mobile_number"]}
 
         return Response({
-            "names": sorted(list(names)),
-            "mobiles": sorted(list(mobiles)),
+            "names": sorted(names),
+            "mobiles": sorted(mobiles),
         })
-        
-class OpeningBalanceViewSet(viewsets.ModelViewSet):
-    queryset = OpeningBalance.objects.all().order_by('-date')
+
+    @action(detail=False, methods=["post"], url_path="import", permission_classes=[permissions.IsAuthenticated],
+            parser_classes=[MultiPartParser, JSONParser])
+    def bulk_import(self, request):
+        """
+        Imports many transactions at once from an uploaded `file` (CSV, XLSX
+        or JSON array) or a JSON array body.
+
+        Columns: date, time, transaction_type (IN/OUT), amount, category,
+        payment_mode, cash_book (ids or names), remarks, party_name,
+        party_mobile_number. Valid rows are inserted, invalid ones are listed
+        in `errors` by row number (1 = first data row). Pass `?dry_run=true`
+        to only validate.
+        """
+        dry_run = request.query_params.get("dry_run", "").lower() == "true"
+
+        if isinstance(request.data, list):
+            rows = request.data
+        else:
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"error": "Upload a file or send a JSON array."}, status=status.HTTP_400_BAD_REQUEST)
+            format_ = request.data.get("format") or imports.detect_format(upload.name, upload.content_type)
+            if format_ not in imports.IMPORT_FORMATS:
+                return Response({"error": "Unsupported file type. Use CSV, XLSX or JSON."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            rows = imports.read_rows(upload, format_)
+
+        importer = imports.TransactionImporter(request.user, get_scope(request.user))
+        try:
+            report = importer.run(rows, dry_run=dry_run)
+        except (ValueError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile) as exc:
+            return Response({"error": f"Could not read the file: {exc}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK)
+
+    def _bulk_target(self, request):
+        """
+        Resolves the rows a bulk action applies to from `ids` (a list) or
+        `filters` (the list endpoint's query params), limited to the user's
+        campuses. Returns (queryset, error_response).
+        """
+        ids = request.data.get("ids")
+        filter_params = request.data.get("filters")
+        visible = self.get_queryset()
+
+        if ids is not None:
+            if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+                return None, Response({"error": "ids must be a non-empty list of integers."},
+                                      status=status.HTTP_400_BAD_REQUEST)
+            queryset = visible.filter(id__in=ids)
+            # One query checks existence and campus access for every id
+            if queryset.count() != len(set(ids)):
+                return None, Response(
+                    {"error": "Some transactions do not exist or are outside your campuses."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            return queryset, None
+
+        if isinstance(filter_params, dict) and filter_params:
+            filterset = TransactionFilter(filter_params, queryset=visible, request=request)
+            if not filterset.is_valid():
+                return None, Response({"error": filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+            return filterset.qs, None
+
+        return None, Response({"error": "Send ids or filters."}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    def bulk_update(self, request):
+        """
+        Sets the same `changes` on many transactions in one UPDATE.
+
+        Body: `ids` or `filters`, plus `changes` with any of
+        transaction_type, category, payment_mode, cash_book, date, time,
+        remarks, party_name, party_mobile_number.
+        """
+        changes = request.data.get("changes")
+        if not isinstance(changes, dict) or not changes:
+            return Response({"error": "Send the fields to change in changes."}, status=status.HTTP_400_BAD_REQUEST)
+        unknown = set(changes) - set(bulk.UPDATABLE_FIELDS)
+        if unknown:
+            return Response({"error": f"These fields cannot be bulk updated: {', '.join(sorted(unknown))}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=changes, partial=True)
+        serializer.is_valid(raise_exception=True)
+        validated = {field: value for field, value in serializer.validated_data.items() if field in changes}
+
+        cash_book = validated.get("cash_book")
+        if cash_book and not get_scope(request.user).allows_cash_book(cash_book.id):
+            raise PermissionDenied("You are not allowed to move transactions to this cash book.")
+
+        queryset, error = self._bulk_target(request)
+        if error:
+            return error
+        return Response({"updated": bulk.update_transactions(queryset, validated)})
+
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    def bulk_delete(self, request):
+        """
+        Deletes many transactions at once. Body: `ids` or `filters`.
+        """
+        queryset, error = self._bulk_target(request)
+        if error:
+            return error
+        return Response({"deleted": bulk.delete_transactions(queryset)})
+
+    def _filtered_by_date(self, request):
+        """
+        Visible transactions with the list filters (TransactionFilter, which
+        includes the date range) applied. Returns (queryset, date_from, date_to).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        date_from, date_to = ledger.resolve_date_range(request.query_params)
+        return queryset, date_from, date_to
+
+    def _ledger_cash_book_ids(self, request, user_scope):
+        """
+        Cash books whose opening balance is carried into the ledger: the
+        requested `cash_book` / `cash_book__in` / `campus`, limited to the
+        user's scope (None means every cash book). Staff asking for a cash
+        book outside their campuses get a 403. The filters have already
+        validated the ids.
+        """
+        params = request.query_params
+        cash_book_ids = None
+        if params.get("cash_book"):
+            cash_book_ids = {int(params["cash_book"])}
+        elif params.get("cash_book__in"):
+            cash_book_ids = {int(value) for value in params["cash_book__in"].split(",") if value}
+
+        if cash_book_ids is not None:
+            if not all(user_scope.allows_cash_book(cash_book_id) for cash_book_id in cash_book_ids):
+                raise PermissionDenied("You are not allowed to view this cash book.")
+        elif not user_scope.is_admin:
+            cash_book_ids = set(user_scope.cash_book_ids)
+
+        if params.get("campus"):
+            campus_books = set(CashBook.objects.filter(campus_id=params["campus"]).values_list("id", flat=True))
+            cash_book_ids = campus_books if cash_book_ids is None else cash_book_ids & campus_books
+        return cash_book_ids
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
+    def ledger(self, request):
+        """
+        Returns one page of filtered transactions (latest first) with the
+        running balance computed in the database.
+
+        Query params: the usual list filters plus `date_range`
+        (today, yesterday, this_month, last_month) or `date_from` / `date_to`,
+        `include_ob` (default true), `page` and `page_size`.
+        """
+        user_scope = get_scope(request.user)
+        queryset, date_from, _ = self._filtered_by_date(request)
+
+        opening = ledger.ZERO
+        if request.query_params.get("include_ob", "true").lower() != "false":
+            opening = ledger.opening_balance(self._ledger_cash_book_ids(request, user_scope), before=date_from)
+
+        rows = ledger.with_running_balance(queryset, opening)
+
+        paginator = LedgerPagination()
+        projection = self.projection(rows, LedgerEntrySerializer, paginator)
+        if projection is not None:
+            page = paginator.paginate_queryset(projection.queryset, request, view=self)
+            data = projection.represent(page)
+        else:
+            page = paginator.paginate_queryset(rows, request, view=self)
+            data = self.trim_serializer(
+                LedgerEntrySerializer(page, many=True, context=self.get_serializer_context())
+            ).data
+        response = paginator.get_paginated_response(data)
+
+        totals = ledger.totals(queryset)
+        response.data["opening_balance"] = opening
+        response.data["total_in"] = totals["total_in"]
+        response.data["total_out"] = totals["total_out"]
+        response.data["net_balance"] = opening + totals["total_in"] - totals["total_out"]
+        return response
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
+    def summary(self, request):
+        """
+        Totals and counts for the filtered transactions, grouped by
+        `group_by` (comma separated: cash_book, category, payment_mode,
+        user, day). Accepts the same filters as `ledger`.
+        """
+        try:
+            group_by = ledger.parse_group_by(request.query_params.get("group_by"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset, _, _ = self._filtered_by_date(request)
+        return Response(ledger.summary(queryset, group_by))
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
+    def sync(self, request):
+        """
+        Change feed for offline clients: transactions created or updated and
+        ids deleted since `since` (the `sync_token` of the previous call;
+        omit it for a full sync). Keep calling with the new token while
+        `has_more` is true. `limit` caps each list (default 500).
+        """
+        try:
+            limit = int(request.query_params.get("limit", sync.SYNC_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, sync.MAX_SYNC_PAGE_SIZE))
+
+        try:
+            page = sync.changes_since(
+                self.get_queryset(), get_scope(request.user), request.query_params.get("since"), limit
+            )
+        except sync.InvalidSyncToken as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        page["changed"] = self.get_serializer(page["changed"], many=True).data
+        return Response(page)
+
+class PartyViewSet(SparseFieldsMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Paginated party autocomplete, most used first.
+
+    Query params: `q` (prefix), `field` (name or mobile, default name),
+    `page` and `page_size`.
+    """
+    serializer_class = PartySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LedgerPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        params = self.request.query_params
+        return parties.autocomplete(get_scope(self.request.user), params.get("q", ""), params.get("field", "name"))
+
+class OpeningBalanceViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = OpeningBalanceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        user_scope = get_scope(self.request.user)
+        queryset = OpeningBalance.objects.all().order_by('-date')
+        if user_scope.is_admin:
+            return queryset
+        return queryset.filter(cash_book_id__in=user_scope.cash_book_ids)
+
     def perform_create(self, serializer):
+        self._check_cash_book(serializer)
         serializer.save(created_by=self.request.user)
 
+    def perform_update(self, serializer):
+        self._check_cash_book(serializer)
+        serializer.save()
+
+    def _check_cash_book(self, serializer):
+        cash_book = serializer.validated_data.get("cash_book", getattr(serializer.instance, "cash_book", None))
+        if not get_scope(self.request.user).allows_cash_book(cash_book.id if cash_book else None):
+            raise PermissionDenied("You are not allowed to set opening balances for this cash book.")
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def dashboard(request):
+    """
+    Dashboard KPIs: today's and this month's Cash In / Cash Out and the
+    balance to date per cash book and campus, plus the month's top
+    categories, read from the rollup tables.
+
+    Query params: `campus` (optional) and `top` (categories, default 5).
+    """
+    try:
+        campus_id = int(request.query_params["campus"]) if request.query_params.get("campus") else None
+        top = int(request.query_params.get("top", kpis.TOP_CATEGORIES))
+    except ValueError:
+        return Response({"error": "campus and top must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+
+    user_scope = get_scope(request.user)
+    if campus_id is not None and not user_scope.allows_campus(campus_id):
+        raise PermissionDenied("You are not allowed to view this campus.")
+    return Response(kpis.dashboard(user_scope, campus_id=campus_id, top=max(1, min(top, 50))))
+
 @api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
 def generate_report(request):
     data = request.data
-    queryset = Transaction.objects.all()
-
-    # --- Filters ---
-    if data.get("campus"):
-        queryset = queryset.filter(cash_book__campus_id=data["campus"])
-    if data.get("cash_book"):
-        queryset = queryset.filter(cash_book_id=data["cash_book"])
-    if data.get("typeFilter") and data["typeFilter"] != "all":
-        queryset = queryset.filter(transaction_type=data["typeFilter"])
-    if data.get("categories"):
-        queryset = queryset.filter(category_id__in=data["categories"])
-    if data.get("modes"):
-        queryset = queryset.filter(payment_mode_id__in=data["modes"])
-    if data.get("users"):
-        queryset = queryset.filter(user_id__in=data["users"])
-
-    # --- Date Filter ---
-    today = datetime.date.today()
-    if data.get("customDateRange"):
-        from_date = data["customDateRange"]["from"]
-        to_date = data["customDateRange"]["to"]
-        queryset = queryset.filter(date__range=[from_date, to_date])
-        date_text = f"{from_date} to {to_date}"
-    else:
-        date_filter = data.get("dateFilter", "today")
-        if date_filter == "today":
-            queryset = queryset.filter(date=today)
-            date_text = "Today"
-        elif date_filter == "yesterday":
-            yesterday = today - datetime.timedelta(days=1)
-            queryset = queryset.filter(date=yesterday)
-            date_text = "Yesterday"
-        elif date_filter == "this_month":
-            queryset = queryset.filter(date__month=today.month, date__year=today.year)
-            date_text = today.strftime("%B %Y")
-        elif date_filter == "single" and data.get("customDateRange"):
-            queryset = queryset.filter(date=data["customDateRange"]["from"])
-            date_text = data["customDateRange"]["from"]
-        else:
-            date_text = "All Dates"
-
-    serializer = TransactionSerializer(queryset.order_by("date", "time"), many=True)
-    df = pd.DataFrame(serializer.data)
-
-    # Calculate totals and running balance
-    total_in = sum([t['amount'] for t in serializer.data if t['transaction_type'] == 'IN'])
-    total_out = sum([t['amount'] for t in serializer.data if t['transaction_type'] == 'OUT'])
-    net_balance = total_in - total_out
-
-    # Compute running balance
-    running_balance = []
-    balance = 0
-    for t in serializer.data:
-        if t['transaction_type'] == 'IN':
-            balance += t['amount']
-        else:
-            balance -= t['amount']
-        running_balance.append(balance)
-
-    df['running_balance'] = running_balance
+    format_ = data.get("format", "excel")
+    user_scope = get_scope(request.user)
+    reports.check_scope(data, user_scope)
 
-    # Get Campus & CashBook names
-    cash_book_obj = None
-    if data.get("cash_book"):
+    # --- SUMMARY (JSON totals only, no rows) ---
+    if format_ == "summary":
         try:
-            cash_book_obj = CashBook.objects.get(id=data["cash_book"])
-        except CashBook.DoesNotExist:
-            pass
+            group_by = ledger.parse_group_by(data.get("group_by"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        queryset, date_text = reports.filter_report_queryset(data, user_scope=user_scope)
+        return Response({"date_text": date_text, **ledger.summary(queryset, group_by)})
+
+    if format_ not in reports.REPORT_FORMATS:
+        return Response({"error": "Invalid format"}, status=400)
+
+    extension, content_type = reports.REPORT_FORMATS[format_]
+    file = reports.report_file(data, user_scope=user_scope)
+    return FileResponse(
+        file,
+        as_attachment=format_ == "excel",
+        filename=f"report{extension}",
+        content_type=content_type,
+    )
+
+class ReportJobViewSet(SparseFieldsMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Queues report renders for the background worker (run_report_worker),
+    which must share REPORT_ARTIFACT_DIR with the web process. POST takes
+    the same payload as generate_report, which stays available for clients
+    that cannot wait for a worker.
+    """
+    serializer_class = ReportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
 
-    format_ = data.get("format", "excel")
+    def get_queryset(self):
+        return ReportJob.objects.filter(created_by_id=self.request.user.pk)
 
-    # --- EXCEL ---
-    if format_ == "excel":
-        output = BytesIO()
-        writer = pd.ExcelWriter(output, engine='openpyxl')
-
-        wb = writer.book
-        ws = wb.active
-        ws.title = "Report"
-
-        # Header rows
-        ws.append([
-            f"Campus: {cash_book_obj.campus.name if cash_book_obj else ''}",
-            f"Cash Book: {cash_book_obj.name if cash_book_obj else ''}"
-        ])
-        ws.append([f"Date: {date_text}"])
-        ws.append([f"Total In: {total_in}", f"Total Out: {total_out}", f"Net Balance: {net_balance}"])
-        ws.append([])
-
-        # Desired columns
-        headers = [
-            "Date",
-            "Time",
-            "Remarks",
-            "Entered By",
-            "Party Name",
-            "Mobile Number",
-            "Category",
-            "Mode",
-            "Cash In",
-            "Cash Out",
-            "Balance"
-        ]
-        ws.append(headers)
-
-        # Fill rows
-        for i, row in enumerate(serializer.data):
-            amount = row.get("amount") or 0
-
-            cash_in = amount if row.get("transaction_type") == "IN" else ""
-            cash_out = amount if row.get("transaction_type") == "OUT" else ""
-
-            ws.append([
-                row.get("date"),
-                row.get("time"),
-                row.get("remarks") or "",
-                row.get("user_name") or "",            # Entered by
-                row.get("party_name") or "",
-                row.get("party_mobile_number") or "",
-                row.get("category_name") or "",
-                row.get("payment_mode_name") or "",
-                cash_in,
-                cash_out,
-                row.get("running_balance") or 0
-            ])
-
-        writer.save()
-        output.seek(0)
-        response = HttpResponse(
-            output,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    def create(self, request, *args, **kwargs):
+        if request.data.get("format", "excel") not in reports.REPORT_FORMATS:
+            return Response({"error": "Invalid format"}, status=status.HTTP_400_BAD_REQUEST)
+        reports.check_scope(request.data, get_scope(request.user))
+
+        job, created = report_jobs.request_report(request.user, request.data)
+        return Response(
+            self.get_serializer(job).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
         )
-        response['Content-Disposition'] = 'attachment; filename=report.xlsx'
-        return response
 
-    # --- PDF ---
-    elif format_ == "pdf":
-        buffer = BytesIO()
-        pdf = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-        y = height - 30
-
-        # Title rows
-        pdf.setFont("Helvetica-Bold", 14)
-        pdf.drawString(30, y, f"Campus: {cash_book_obj.campus.name if cash_book_obj else ''}")
-        pdf.drawString(300, y, f"Cash Book: {cash_book_obj.name if cash_book_obj else ''}")
-        y -= 20
-        pdf.setFont("Helvetica", 12)
-        pdf.drawString(30, y, f"Date: {date_text}")
-        y -= 20
-        pdf.drawString(30, y, f"Total In: {total_in}   Total Out: {total_out}   Net Balance: {net_balance}")
-        y -= 30
-
-        # Table headers
-        pdf.setFont("Helvetica-Bold", 10)
-        headers = ["Sl. No.", "Date & Time", "Remarks", "Party", "Category",
-                   "Mode", "User", "Amount", "Balance"]
-        x_positions = [30, 80, 150, 250, 350, 410, 470, 520, 580]
-
-        for i, h in enumerate(headers):
-            pdf.drawString(x_positions[i], y, h)
-        y -= 15
-        pdf.setFont("Helvetica", 10)
-
-        for i, row in enumerate(serializer.data, 1):
-            if y < 50:  # new page
-                pdf.showPage()
-                y = height - 30
-            pdf.drawString(x_positions[0], y, str(i))
-            pdf.drawString(x_positions[1], y, f"{row['date']} {row['time']}")
-            pdf.drawString(x_positions[2], y, row.get("remarks") or "")
-            pdf.drawString(x_positions[3], y, f"{row.get('party_name') or ''} {row.get('party_mobile_number') or ''}")
-            pdf.drawString(x_positions[4], y, row.get("category_name") or "")
-            pdf.drawString(x_positions[5], y, row.get("payment_mode_name") or "")
-            pdf.drawString(x_positions[6], y, row.get("user_name") or "")
-            pdf.drawString(x_positions[7], y, str(row.get("amount") or 0))
-            pdf.drawString(x_positions[8], y, str(row.get("running_balance") or 0))
-            y -= 15
-
-        pdf.save()
-        buffer.seek(0)
-        return HttpResponse(buffer, content_type='application/pdf')
-
-    return Response({"error": "Invalid format"}, status=400)
\ No newline at end of file
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ReportJob.STATUS_DONE:
+            return Response({"error": "Report is not ready.", "status": job.status}, status=status.HTTP_409_CONFLICT)
+
+        extension, content_type = reports.REPORT_FORMATS[job.format]
+        try:
+            file = open(report_jobs.artifact_path(job), "rb")
+        except FileNotFoundError:
+            return Response({"error": "Report file has expired."}, status=status.HTTP_410_GONE)
+        return FileResponse(file, as_attachment=True, filename=f"report{extension}", content_type=content_type)